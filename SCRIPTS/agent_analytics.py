@@ -1,8 +1,34 @@
-import pandas as pd
-import numpy as np
+import argparse
 
-# Load cleaned data
-df = pd.read_csv('data/processed/cleaned_data.csv')
+from agents import agent_summary, load_agents
+from backends import add_backend_argument
+from instrumentation import trace_run
+from partitioned import add_partition_arguments
+from report_aggregates import load_report_aggregates
+from streaming_stats import Comoments, Histogram, MedianSketch, Moments, stream_statistics
+
+parser = argparse.ArgumentParser(description='Agent performance analytics.')
+add_partition_arguments(parser)
+add_backend_argument(parser)
+args = parser.parse_args()
+trace_run(__file__)
+parallel = {'workers': args.workers, 'partition_by': args.partition_by}
+
+# Rating summary, streamed over the store in bounded-memory batches
+ratings = stream_statistics({
+    'moments': (['Agent_Rating'], Moments()),
+    'quantiles': (['Agent_Rating'], MedianSketch()),
+    # Half-star bands from 1 to 5
+    'bands': (['Agent_Rating'], Histogram.uniform(1, 5, 8)),
+    'delivery': (['Agent_Rating', 'Delivery_Time'], Comoments()),
+}, **parallel)
+
+# Grouped aggregates shared by all analytics and report scripts
+aggregates = load_report_aggregates(backend=args.backend, **parallel)
+by_rating = aggregates['rating']
+
+# One row per agent, with per-agent order and delivery statistics
+agents = agent_summary(load_agents())
 
 print("="*60)
 print("AGENT PERFORMANCE ANALYTICS")
@@ -10,72 +36,76 @@ print("="*60)
 
 # 1. Agent Rating Distribution
 print("\n1. AGENT RATING DISTRIBUTION:")
-print(f"   Average Rating: {df['Agent_Rating'].mean():.2f}")
-print(f"   Median Rating: {df['Agent_Rating'].median():.2f}")
-print(f"   Highest Rating: {df['Agent_Rating'].max()}")
-print(f"   Lowest Rating: {df['Agent_Rating'].min()}")
+print(f"   Average Rating: {ratings['moments'].mean:.2f}")
+print(f"   Median Rating: {ratings['quantiles'].median():.2f}")
+print(f"   Highest Rating: {ratings['moments'].max:.1f}")
+print(f"   Lowest Rating: {ratings['moments'].min:.1f}")
 print("\n   Rating Distribution:")
-rating_dist = df['Agent_Rating'].value_counts().sort_index()
+rating_dist = by_rating['Orders']
 for rating, count in rating_dist.items():
-    print(f"   {rating}: {count} agents ({count/len(df)*100:.1f}%)")
+    print(f"   {rating:.1f}: {count} agents ({count/ratings['moments'].count*100:.1f}%)")
+print("\n   Rating Bands:")
+bands = ratings['bands']
+for lo, hi, count in zip(bands.edges[:-1], bands.edges[1:], bands.counts):
+    print(f"   {lo:.1f}-{hi:.1f}: {count} orders ({count/bands.count*100:.1f}%)")
+if bands.below or bands.above:
+    print(f"   Outside 1-5: {bands.below + bands.above} orders")
 
 # 2. Age Groups Analysis
 print("\n2. AGENT PERFORMANCE BY AGE GROUP:")
-# Create age groups
-df['Age_Group'] = pd.cut(df['Agent_Age'], 
-                          bins=[15, 25, 35, 45, 50], 
-                          labels=['15-25', '26-35', '36-45', '46-50'])
-
-age_performance = df.groupby('Age_Group').agg({
-    'Agent_Rating': 'mean',
-    'Delivery_Time': 'mean',
-    'Order_ID': 'count'
-}).round(2)
+age_performance = aggregates['age_group'][['Agent_Rating_mean', 'Delivery_Time_mean', 'Orders']].round(2)
 age_performance.columns = ['Avg_Rating', 'Avg_Delivery_Time', 'Total_Orders']
 print(age_performance)
 
 # 3. Rating vs Delivery Time Correlation
 print("\n3. RATING vs DELIVERY TIME:")
-rating_delivery = df.groupby('Agent_Rating')['Delivery_Time'].mean().round(2)
+rating_delivery = by_rating['Delivery_Time_mean'].rename('Delivery_Time').round(2)
 print(rating_delivery)
-print(f"\n   Correlation: {df['Agent_Rating'].corr(df['Delivery_Time']):.4f}")
-if df['Agent_Rating'].corr(df['Delivery_Time']) < 0:
+print(f"\n   Correlation: {ratings['delivery'].corr:.4f}")
+if ratings['delivery'].corr < 0:
     print("   → Higher ratings = Faster deliveries ✅")
 else:
     print("   → Higher ratings = Slower deliveries ⚠️")
 
 # 4. Best Performing Agents (by rating groups)
 print("\n4. HIGH vs LOW RATED AGENTS COMPARISON:")
-high_rated = df[df['Agent_Rating'] >= 4.5]
-low_rated = df[df['Agent_Rating'] < 4.0]
+# Rating groups are combined from the per-rating sums and counts
+high_rated = by_rating[by_rating.index >= 4.5].sum()
+low_rated = by_rating[by_rating.index < 4.0].sum()
 
 print(f"\n   High Rated Agents (≥4.5):")
-print(f"   - Count: {len(high_rated)}")
-print(f"   - Avg Delivery Time: {high_rated['Delivery_Time'].mean():.2f} min")
-print(f"   - Avg Age: {high_rated['Agent_Age'].mean():.1f} years")
+print(f"   - Agents: {(agents['Agent_Rating'] >= 4.5).sum()}")
+print(f"   - Orders: {int(high_rated['Orders'])}")
+print(f"   - Avg Delivery Time: {high_rated['Delivery_Time_sum'] / high_rated['Delivery_Time_count']:.2f} min")
+print(f"   - Avg Age: {high_rated['Agent_Age_sum'] / high_rated['Agent_Age_count']:.1f} years")
 
 print(f"\n   Low Rated Agents (<4.0):")
-print(f"   - Count: {len(low_rated)}")
-print(f"   - Avg Delivery Time: {low_rated['Delivery_Time'].mean():.2f} min")
-print(f"   - Avg Age: {low_rated['Agent_Age'].mean():.1f} years")
+print(f"   - Agents: {(agents['Agent_Rating'] < 4.0).sum()}")
+print(f"   - Orders: {int(low_rated['Orders'])}")
+print(f"   - Avg Delivery Time: {low_rated['Delivery_Time_sum'] / low_rated['Delivery_Time_count']:.2f} min")
+print(f"   - Avg Age: {low_rated['Agent_Age_sum'] / low_rated['Agent_Age_count']:.1f} years")
 
 # 5. Agent Performance by Vehicle
 print("\n5. AGENT RATINGS BY VEHICLE TYPE:")
-vehicle_ratings = df.groupby('Vehicle')['Agent_Rating'].agg([
-    ('Avg_Rating', 'mean'),
-    ('Count', 'count')
-]).round(2)
+vehicle_ratings = aggregates['vehicle'][['Agent_Rating_mean', 'Orders']].round(2)
+vehicle_ratings.columns = ['Avg_Rating', 'Count']
 print(vehicle_ratings)
 
 # 6. Weather Impact on Agent Performance
 print("\n6. AGENT PERFORMANCE IN DIFFERENT WEATHER:")
-weather_agent = df.groupby('Weather').agg({
-    'Agent_Rating': 'mean',
-    'Delivery_Time': 'mean'
-}).round(2)
+weather_agent = aggregates['weather'][['Agent_Rating_mean', 'Delivery_Time_mean']].round(2)
 weather_agent.columns = ['Avg_Rating', 'Avg_Delivery_Time']
 print(weather_agent)
 
+# 7. Agent Leaderboard
+print("\n7. AGENT LEADERBOARD:")
+print(f"   Total Agents: {len(agents)}")
+print(f"   Orders per Agent: {agents['Orders'].mean():.1f}")
+leaderboard = agents[agents['Orders'] >= 5].sort_values('Avg_Delivery')
+print("\n   Fastest Agents (5+ orders):")
+print(leaderboard[['Agent_Age', 'Agent_Rating', 'Store_ID', 'Orders', 'Avg_Delivery']].head(10)
+      .round(2).to_string(index=False))
+
 print("\n" + "="*60)
 print("✅ Agent Analytics Complete!")
 print("="*60)
\ No newline at end of file
@@ -0,0 +1,98 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_store import PROCESSED_DIR, load_data, read_derived, write_derived
+from instrumentation import traced
+
+AGENTS_FILE = 'agents.parquet'
+
+# The source has no agent identifier; an agent is reconstructed as the
+# combination of age, rating and home store
+AGENT_KEY = ['Agent_Age', 'Agent_Rating', 'Store_ID']
+
+# Order columns the agent table is built from
+AGENT_COLUMNS = ['Agent_ID'] + AGENT_KEY + ['Delivery_Time', 'Order_Date']
+
+# Agent table columns grouped by how they combine when tables are merged
+FIRST_COLUMNS = AGENT_KEY
+SUM_COLUMNS = ['Orders', 'Delivery_Time_sum', 'Delivery_Time_sumsq']
+MIN_COLUMNS = ['Delivery_Time_min', 'First_Order_Date']
+MAX_COLUMNS = ['Delivery_Time_max', 'Last_Order_Date']
+
+
+def agent_ids(df):
+    """Stable 64-bit Agent_ID per row, hashed from the agent key columns."""
+    key = df[AGENT_KEY].astype({'Agent_Age': 'int64', 'Agent_Rating': 'float64', 'Store_ID': 'int64'})
+    return pd.util.hash_pandas_object(key, index=False).to_numpy().view(np.int64)
+
+
+@traced('agents.build')
+def build_agents(df):
+    """
+    Aggregate order rows to one row per agent in a single hashed group-by.
+
+    Each agent keeps its key attributes, order count, the sum, sum of squares,
+    min and max of its delivery times and its first and last order dates,
+    so tables built from separate batches of orders can be merged.
+    """
+    frame = df[AGENT_COLUMNS].assign(Delivery_Time_sq=df['Delivery_Time'].astype('float64') ** 2)
+    agents = frame.groupby('Agent_ID', sort=False).agg(
+        Agent_Age=('Agent_Age', 'first'),
+        Agent_Rating=('Agent_Rating', 'first'),
+        Store_ID=('Store_ID', 'first'),
+        Orders=('Delivery_Time', 'size'),
+        Delivery_Time_sum=('Delivery_Time', 'sum'),
+        Delivery_Time_sumsq=('Delivery_Time_sq', 'sum'),
+        Delivery_Time_min=('Delivery_Time', 'min'),
+        Delivery_Time_max=('Delivery_Time', 'max'),
+        First_Order_Date=('Order_Date', 'min'),
+        Last_Order_Date=('Order_Date', 'max'),
+    )
+    return agents.reset_index()
+
+
+def merge_agents(agents, delta):
+    """Fold an agent table built from newly ingested rows into an existing one."""
+    aggregations = {col: 'first' for col in FIRST_COLUMNS}
+    aggregations.update({col: 'sum' for col in SUM_COLUMNS})
+    aggregations.update({col: 'min' for col in MIN_COLUMNS})
+    aggregations.update({col: 'max' for col in MAX_COLUMNS})
+
+    combined = pd.concat([agents, delta], ignore_index=True)
+    merged = combined.groupby('Agent_ID', sort=False).agg(aggregations).reset_index()
+    return merged[agents.columns]
+
+
+def agent_summary(agents):
+    """Agent table with average and standard deviation of delivery time added."""
+    n = agents['Orders'].astype('float64')
+    total = agents['Delivery_Time_sum']
+    variance = (agents['Delivery_Time_sumsq'] - total ** 2 / n) / (n - 1)
+    return agents.assign(Avg_Delivery=total / n, Std_Delivery=np.sqrt(variance.clip(lower=0)))
+
+
+def write_agents(agents, processed_dir=PROCESSED_DIR):
+    """Write the agent table, stamped with the current data version."""
+    return write_derived(agents, os.path.join(processed_dir, AGENTS_FILE), processed_dir)
+
+
+def read_agents(processed_dir=PROCESSED_DIR):
+    """The agent table if it matches the store on disk, else None."""
+    return read_derived(os.path.join(processed_dir, AGENTS_FILE), processed_dir)
+
+
+def load_agents(processed_dir=PROCESSED_DIR):
+    """
+    Read the agent table, building it from the processed store if missing.
+
+    A table written at another data version is rebuilt and written back.
+    """
+    agents = read_agents(processed_dir)
+    if agents is not None:
+        return agents
+    agents = build_agents(load_data(columns=AGENT_COLUMNS, processed_dir=processed_dir))
+    if os.path.exists(os.path.join(processed_dir, AGENTS_FILE)):
+        write_agents(agents, processed_dir)
+    return agents
@@ -0,0 +1,253 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import span
+
+# One grouped aggregate: group by ``dims`` and compute each of ``stats`` for
+# every column in ``measures``. Every result also has an 'Orders' column
+# with the number of rows in each group.
+AggSpec = namedtuple('AggSpec', ['name', 'dims', 'measures', 'stats'])
+
+STATS = ['count', 'sum', 'mean', 'min', 'max', 'std', 'var']
+
+# Mergeable per-group state each statistic is finalized from
+PARTIAL_STATE = {
+    'count': ['count'],
+    'sum': ['count', 'sum'],
+    'mean': ['count', 'sum'],
+    'min': ['count', 'min'],
+    'max': ['count', 'max'],
+    'std': ['count', 'sum', 'sqdev'],
+    'var': ['count', 'sum', 'sqdev'],
+}
+
+# Largest dimension combination space addressed directly by bincount;
+# larger spaces are compacted to the combinations that occur
+DENSE_LIMIT = 1 << 20
+
+
+class AggregationEngine:
+    """
+    Compute many grouped aggregates of one frame over shared integer codes.
+
+    Each dimension is factorized once, each set of dimensions is reduced to
+    one group code per row once, and each measure is reduced per group once
+    per statistic kind, however many specs ask for it. Group order and the
+    dropping of rows with a missing dimension value match
+    ``df.groupby(dims, observed=True)``.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._codes = {}
+        self._values = {}
+        self._groups = {}
+        self._pairs = {}
+        self._reductions = {}
+
+    def _factorize(self, dim):
+        if dim not in self._codes:
+            codes, uniques = pd.factorize(self.df[dim], sort=True)
+            self._codes[dim] = (codes.astype(np.int64, copy=False), uniques)
+        return self._codes[dim]
+
+    def _measure(self, measure):
+        """(float values, null mask or None when no value is null) of a measure."""
+        if measure not in self._values:
+            values = self.df[measure].to_numpy(dtype=np.float64, na_value=np.nan)
+            missing = np.isnan(values)
+            self._values[measure] = (values, missing if missing.any() else None)
+        return self._values[measure]
+
+    def _group(self, dims):
+        """(group code per row, -1 for dropped rows; group sizes; result index)."""
+        dims = tuple(dims)
+        if dims in self._groups:
+            return self._groups[dims]
+
+        codes, uniques = zip(*(self._factorize(dim) for dim in dims))
+        if len(dims) == 1:
+            # Sorted factorize codes are already dense group codes
+            group = codes[0]
+            sizes = np.bincount(group if group.min(initial=0) >= 0 else group[group >= 0],
+                                minlength=len(uniques[0]))
+            index = pd.Index(uniques[0], name=dims[0])
+            self._groups[dims] = (group, sizes, index)
+            return self._groups[dims]
+
+        shape = tuple(max(len(u), 1) for u in uniques)
+        valid = np.logical_and.reduce([c >= 0 for c in codes])
+        complete = valid.all()
+        key = codes[0]
+        for c, size in zip(codes[1:], shape[1:]):
+            key = key * size + c
+        if not complete:
+            key = key[valid]
+
+        if np.prod(shape, dtype=np.float64) <= DENSE_LIMIT:
+            # Combination codes are small enough to count directly
+            sizes = np.bincount(key, minlength=int(np.prod(shape)))
+            keys = np.flatnonzero(sizes)
+            sizes = sizes[keys]
+            lookup = np.empty(int(np.prod(shape)), dtype=np.int64)
+            lookup[keys] = np.arange(len(keys))
+            compact = lookup[key]
+        else:
+            keys, compact, sizes = np.unique(key, return_inverse=True, return_counts=True)
+
+        if complete:
+            group = compact
+        else:
+            group = np.full(len(valid), -1, dtype=np.int64)
+            group[valid] = compact
+
+        levels = np.unravel_index(keys, shape)
+        index = pd.MultiIndex.from_arrays(
+            [u.take(level) for u, level in zip(uniques, levels)], names=list(dims))
+        self._groups[dims] = (group, sizes, index)
+        return self._groups[dims]
+
+    def _pairs_for(self, dims, measure):
+        """Group codes and values of the rows with a group and a non-null measure."""
+        cache_key = (tuple(dims), measure)
+        if cache_key not in self._pairs:
+            group, sizes, _ = self._group(dims)
+            values, missing = self._measure(measure)
+            if sizes.sum() == len(group) and missing is None:
+                self._pairs[cache_key] = (group, values)
+            else:
+                keep = group >= 0 if missing is None else (group >= 0) & ~missing
+                self._pairs[cache_key] = (group[keep], values[keep])
+        return self._pairs[cache_key]
+
+    def _reduce(self, dims, measure, kind):
+        """Per-group 'count', 'sum', 'min', 'max' or 'sqdev' of a measure's non-null values."""
+        cache_key = (tuple(dims), measure, kind)
+        if cache_key in self._reductions:
+            return self._reductions[cache_key]
+
+        group, sizes, _ = self._group(dims)
+        n = len(sizes)
+        g, v = self._pairs_for(dims, measure)
+
+        if kind == 'count':
+            # Every row counts when none were dropped
+            result = sizes if g is group else np.bincount(g, minlength=n)
+        elif kind == 'sum':
+            result = np.bincount(g, weights=v, minlength=n)
+        elif kind == 'min':
+            result = np.full(n, np.inf)
+            np.minimum.at(result, g, v)
+        elif kind == 'max':
+            result = np.full(n, -np.inf)
+            np.maximum.at(result, g, v)
+        else:
+            # Squared deviations from the group mean, for a stable variance
+            mean = self._reduce(dims, measure, 'sum') / self._reduce(dims, measure, 'count')
+            result = np.bincount(g, weights=(v - mean[g]) ** 2, minlength=n)
+
+        self._reductions[cache_key] = result
+        return result
+
+    def partial(self, spec):
+        """
+        Mergeable per-group state for ``spec``: 'Orders' plus the count, sum,
+        min, max and squared deviations its statistics need, per measure.
+        """
+        unknown = set(spec.stats) - set(STATS)
+        if unknown:
+            raise ValueError(f"Unknown statistics {sorted(unknown)} in spec '{spec.name}'")
+
+        _, sizes, index = self._group(spec.dims)
+        kinds = list(dict.fromkeys(kind for stat in spec.stats for kind in PARTIAL_STATE[stat]))
+        columns = {'Orders': sizes}
+        for measure in spec.measures:
+            for kind in kinds:
+                columns[f'{measure}_{kind}'] = self._reduce(spec.dims, measure, kind)
+        partial = pd.DataFrame(columns, index=index)
+        partial.attrs['integer_measures'] = [
+            m for m in spec.measures if pd.api.types.is_integer_dtype(self.df[m].dtype)]
+        return partial
+
+    def aggregate(self, spec):
+        """DataFrame indexed by the spec's dimensions, one column per measure statistic."""
+        with span(f'groupby[{spec.name}]'):
+            return finalize(spec, self.partial(spec))
+
+    def run(self, specs):
+        return {spec.name: self.aggregate(spec) for spec in specs}
+
+
+def merge_partials(spec, partials):
+    """
+    Combine partial states of ``spec`` computed over disjoint sets of rows.
+
+    Counts, sums, minima and maxima combine directly; squared deviations
+    are combined with the parallel (Chan et al.) variance update. Groups
+    come back in sorted order, with categorical dimensions ordered by their
+    sorted categories, as load_data() returns them.
+    """
+    partials = [p for p in partials if len(p)] or partials[:1]
+    frames = [p.reset_index() for p in partials]
+    for dim in spec.dims:
+        if isinstance(frames[0][dim].dtype, pd.CategoricalDtype):
+            categories = sorted(set().union(*(f[dim].cat.categories for f in frames)))
+            for frame in frames:
+                frame[dim] = frame[dim].cat.set_categories(categories)
+    combined = pd.concat(frames, ignore_index=True)
+    keys = [combined[dim] for dim in spec.dims]
+    grouped = combined.groupby(keys, observed=True, sort=True)
+
+    merged = pd.DataFrame({'Orders': grouped['Orders'].sum()})
+    for col in combined.columns.drop(list(spec.dims) + ['Orders']):
+        measure, kind = col.rsplit('_', 1)
+        if kind in ('count', 'sum'):
+            merged[col] = grouped[col].sum()
+        elif kind in ('min', 'max'):
+            merged[col] = grouped[col].agg(kind)
+        else:
+            # Within-part deviations plus each part's offset from the group mean
+            count = combined[f'{measure}_count']
+            with np.errstate(invalid='ignore', divide='ignore'):
+                part_mean = combined[f'{measure}_sum'] / count
+                group_mean = (grouped[f'{measure}_sum'].transform('sum') /
+                              grouped[f'{measure}_count'].transform('sum'))
+            between = (count * (part_mean - group_mean) ** 2).where(count > 0, 0)
+            merged[col] = grouped[col].sum() + between.groupby(keys, observed=True, sort=True).sum()
+
+    merged.attrs['integer_measures'] = partials[0].attrs.get('integer_measures', [])
+    return merged
+
+
+def finalize(spec, partial):
+    """Turn a (possibly merged) partial state into the spec's statistics."""
+    integer_measures = partial.attrs.get('integer_measures', [])
+    columns = {'Orders': partial['Orders'].to_numpy()}
+    for measure in spec.measures:
+        count = partial[f'{measure}_count'].to_numpy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for stat in spec.stats:
+                if stat == 'count':
+                    values = count
+                elif stat == 'sum':
+                    values = partial[f'{measure}_sum'].to_numpy()
+                elif stat == 'mean':
+                    values = np.where(count > 0, partial[f'{measure}_sum'].to_numpy() / count, np.nan)
+                elif stat in ('min', 'max'):
+                    values = np.where(count > 0, partial[f'{measure}_{stat}'].to_numpy(), np.nan)
+                else:
+                    variance = np.where(count > 1, partial[f'{measure}_sqdev'].to_numpy() / (count - 1),
+                                        np.nan)
+                    values = np.sqrt(variance) if stat == 'std' else variance
+                # Keep integer measures integral where pandas would
+                if measure in integer_measures and stat in ('sum', 'min', 'max') and not np.isnan(values).any():
+                    values = values.astype(np.int64)
+                columns[f'{measure}_{stat}'] = values
+    return pd.DataFrame(columns, index=partial.index)
+
+
+def aggregate(df, specs):
+    """Compute every spec over ``df`` in one engine; returns {spec name: DataFrame}."""
+    return AggregationEngine(df).run(specs)
@@ -0,0 +1,185 @@
+import numpy as np
+
+from aggregation_engine import STATS, AggregationEngine, finalize, merge_partials
+from data_store import PROCESSED_DIR, load_data, store_files
+from instrumentation import span
+from partitioned import load_partition, map_partitions
+
+# Query backends for the load -> filter -> aggregate pipeline. Each takes
+# a list of AggSpecs, optional filters ({column: value}, 'All' or None =
+# no filter) and derived columns ({name: (source, pandas function, SQL
+# expression)}), and returns {spec name: DataFrame} shaped like the
+# aggregation engine's results.
+BACKENDS = ['pandas', 'duckdb']
+
+SQL_STATS = {
+    'count': 'COUNT({m})',
+    'sum': 'SUM({m})',
+    'mean': 'AVG({m})',
+    'min': 'MIN({m})',
+    'max': 'MAX({m})',
+    'std': 'STDDEV_SAMP({m})',
+    'var': 'VAR_SAMP({m})',
+}
+INTEGER_TYPES = {'TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'UTINYINT', 'USMALLINT', 'UINTEGER', 'UBIGINT'}
+
+
+def spec_columns(specs, derived=None, filters=None):
+    """Stored columns needed to compute ``specs`` (and apply ``filters``), in first-seen order."""
+    derived = derived or {}
+    columns = []
+    for spec in specs:
+        for col in list(spec.dims) + list(spec.measures):
+            columns.append(derived[col][0] if col in derived else col)
+    columns.extend(active_filters(filters))
+    return list(dict.fromkeys(columns))
+
+
+def add_derived_columns(df, specs, derived=None):
+    """``df`` with the derived columns the specs group by or measure."""
+    used = {col for spec in specs for col in list(spec.dims) + list(spec.measures)}
+    return df.assign(**{name: derive(df[source])
+                        for name, (source, derive, _) in (derived or {}).items() if name in used})
+
+
+def active_filters(filters):
+    return {col: value for col, value in (filters or {}).items() if value is not None and value != 'All'}
+
+
+def _partition_partials(partition, specs, derived, filters, processed_dir):
+    df = load_partition(spec_columns(specs, derived, filters), partition, processed_dir)
+    engine = AggregationEngine(add_derived_columns(_apply_filters(df, filters), specs, derived))
+    return [engine.partial(spec) for spec in specs]
+
+
+def _apply_filters(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for col, value in active_filters(filters).items():
+        mask &= (df[col] == value).to_numpy()
+    return df if mask.all() else df[mask]
+
+
+class PandasBackend:
+    """
+    The default backend: pandas loading and the NumPy aggregation engine.
+
+    With ``workers`` above 1 the store is split by ``partition_by`` and the
+    partitions are aggregated in a process pool.
+    """
+
+    name = 'pandas'
+
+    def __init__(self, processed_dir=PROCESSED_DIR, workers=1, partition_by='month'):
+        self.processed_dir = processed_dir
+        self.workers = workers
+        self.partition_by = partition_by
+
+    def load(self, columns=None, filters=None):
+        needed = None if columns is None else list(dict.fromkeys(list(columns) + list(active_filters(filters))))
+        df = _apply_filters(load_data(columns=needed, processed_dir=self.processed_dir), filters)
+        return df if columns is None else df[columns]
+
+    def aggregate(self, specs, filters=None, derived=None):
+        if self.workers > 1:
+            partials = map_partitions(_partition_partials, (specs, derived, filters, self.processed_dir),
+                                      self.workers, self.partition_by, self.processed_dir)
+            return {
+                spec.name: finalize(spec, merge_partials(spec, [parts[i] for parts in partials]))
+                for i, spec in enumerate(specs)
+            }
+
+        df = self.load(spec_columns(specs, derived), filters)
+        engine = AggregationEngine(add_derived_columns(df, specs, derived))
+        return engine.run(specs)
+
+
+class DuckDBBackend:
+    """
+    Embedded DuckDB over the Parquet store: lazy, multi-threaded SQL.
+
+    Filters and column projection are pushed into the Parquet scan, and
+    each spec is one GROUP BY query. Group order and the dropping of rows
+    with a missing dimension value match the pandas backend. Categorical
+    dimensions come back as plain strings. Needs the optional ``duckdb``
+    package.
+    """
+
+    name = 'duckdb'
+
+    def __init__(self, processed_dir=PROCESSED_DIR, threads=None):
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("The duckdb backend needs the 'duckdb' package: pip install duckdb") from e
+
+        self.processed_dir = processed_dir
+        self.connection = duckdb.connect()
+        if threads:
+            self.connection.execute(f'SET threads = {int(threads)}')
+
+        files = store_files(processed_dir)
+        if files:
+            # The paths go to DuckDB as a list rather than SQL text, so quotes in them are safe
+            self.connection.read_parquet(files).create_view('orders_parquet')
+            self.source = 'orders_parquet'
+        else:
+            # No Parquet store yet: query the CSV export through pandas
+            self.connection.register('orders_csv', load_data(processed_dir=processed_dir))
+            self.source = 'orders_csv'
+
+    def _where(self, filters):
+        filters = active_filters(filters)
+        clause = ' AND '.join(f'"{col}" = ?' for col in filters)
+        return (f'WHERE {clause}' if clause else ''), list(filters.values())
+
+    def load(self, columns=None, filters=None):
+        select = ', '.join(f'"{col}"' for col in columns) if columns else '*'
+        where, params = self._where(filters)
+        return self.connection.execute(f'SELECT {select} FROM {self.source} {where}', params).df()
+
+    def _query(self, spec, filters, derived):
+        derived = derived or {}
+        unknown = set(spec.stats) - set(STATS)
+        if unknown:
+            raise ValueError(f"Unknown statistics {sorted(unknown)} in spec '{spec.name}'")
+
+        used = [col for col in list(spec.dims) + list(spec.measures) if col in derived]
+        extra = ''.join(f', {derived[col][2]} AS "{col}"' for col in used)
+        where, params = self._where(filters)
+        rows = f'SELECT *{extra} FROM {self.source} {where}'
+
+        # Integer sums stay integers, as in the engine (DuckDB widens them to
+        # HUGEINT, which reaches pandas as float)
+        types = {row[0]: row[1] for row in self.connection.execute(f'DESCRIBE {rows}', params).fetchall()}
+        aggregates = ['COUNT(*) AS "Orders"']
+        for measure in spec.measures:
+            for stat in spec.stats:
+                expression = SQL_STATS[stat].format(m=f'"{measure}"')
+                if stat == 'sum' and types[measure] in INTEGER_TYPES:
+                    expression = f'CAST({expression} AS BIGINT)'
+                aggregates.append(f'{expression} AS "{measure}_{stat}"')
+
+        dims = ', '.join(f'"{dim}"' for dim in spec.dims)
+        present = ' AND '.join(f'"{dim}" IS NOT NULL' for dim in spec.dims)
+        sql = (f'SELECT {dims}, {", ".join(aggregates)} FROM ({rows}) '
+               f'WHERE {present} GROUP BY {dims} ORDER BY {dims}')
+        with span(f'duckdb[{spec.name}]'):
+            return self.connection.execute(sql, params).df().set_index(list(spec.dims))
+
+    def aggregate(self, specs, filters=None, derived=None):
+        return {spec.name: self._query(spec, filters, derived) for spec in specs}
+
+
+def make_backend(name='pandas', processed_dir=PROCESSED_DIR, workers=1, partition_by='month'):
+    """Backend by name; ``workers``/``partition_by`` apply to the pandas backend only."""
+    if name == 'pandas':
+        return PandasBackend(processed_dir, workers, partition_by)
+    if name == 'duckdb':
+        return DuckDBBackend(processed_dir, threads=workers if workers > 1 else None)
+    raise ValueError(f"Unknown backend '{name}'; expected one of {BACKENDS}")
+
+
+def add_backend_argument(parser):
+    parser.add_argument('--backend', choices=BACKENDS, default='pandas',
+                        help='query backend for the grouped aggregates (default: pandas; '
+                             'duckdb needs the duckdb package)')
@@ -0,0 +1,25 @@
+from agents import AGENT_COLUMNS, AGENT_KEY, build_agents, write_agents
+from data_store import load_data
+from instrumentation import trace_run
+
+trace_run(__file__)
+
+# Load only the columns the agent table is built from
+df = load_data(columns=AGENT_COLUMNS)
+
+print("="*60)
+print("BUILDING AGENT TABLE")
+print("="*60)
+
+agents = build_agents(df)
+
+print(f"\n   Orders aggregated: {len(df):,}")
+print(f"   Agents: {len(agents):,}")
+print(f"   Agent key: {', '.join(AGENT_KEY)}")
+print(f"   Orders per agent: {agents['Orders'].mean():.1f} on average, {agents['Orders'].max():,} at most")
+
+path = write_agents(agents)
+
+print("\n" + "="*60)
+print(f"✅ Agent table saved to: {path}")
+print("="*60)
@@ -0,0 +1,25 @@
+from cube import DIMENSIONS, MEASURES, build_cube, write_cube
+from data_store import load_data
+from instrumentation import trace_run
+
+trace_run(__file__)
+
+# Load only the cube dimensions and measures from the processed store
+df = load_data(columns=DIMENSIONS + MEASURES)
+
+print("="*60)
+print("BUILDING DELIVERY CUBE")
+print("="*60)
+
+cube = build_cube(df)
+
+print(f"\n   Orders aggregated: {len(df):,}")
+print(f"   Cube cells: {len(cube):,}")
+print(f"   Dimensions: {', '.join(DIMENSIONS)}")
+print(f"   Measures: {', '.join(MEASURES)}")
+
+path = write_cube(cube)
+
+print("\n" + "="*60)
+print(f"✅ Cube saved to: {path}")
+print("="*60)
@@ -1,54 +1,207 @@
+import argparse
+import json
+import os
+import shutil
+
 import pandas as pd
 import numpy as np
 
-# Load data
-df = pd.read_csv('data/amazon_delivery.csv')
+from agents import agent_ids
+from data_store import CSV_FILE, PARQUET_FILE, PARTITIONS_DIR, PROCESSED_DIR, StoreWriter
+from distance import distance_column
+from instrumentation import trace_run, traced
+from schema import apply_schema, column_memory, memory_report
+from spatial_index import stream_spatial_index, write_spatial_index
+from stores import StoreTable, count_store_pairs, write_stores
+from streaming_stats import MedianSketch, ModeCounter
+
+RAW_FILE = 'data/amazon_delivery.csv'
+OUTPUT_FILE = os.path.join(PROCESSED_DIR, CSV_FILE)
+
+# Running fill statistics and ingested raw files, read by ingest_orders.py
+STATE_FILE = os.path.join(PROCESSED_DIR, 'ingest_state.json')
+
+# Rows per chunk; peak memory is bounded by this, not by the file size
+CHUNK_SIZE = 100_000
+
+STRIP_COLUMNS = ['Traffic', 'Vehicle', 'Weather', 'Order_Time', 'Pickup_Time']
+NAN_STRING_COLUMNS = ['Traffic', 'Order_Time', 'Pickup_Time']
+
+
+def new_fill_stats():
+    return {
+        'Agent_Rating': MedianSketch(),
+        'Weather': ModeCounter(),
+        'Traffic': ModeCounter(),
+        'Order_Time': ModeCounter(),
+    }
+
+
+def fill_values(stats):
+    """Values used to fill gaps: the rating median and the modal weather, traffic and time."""
+    return {
+        col: sketch.median() if isinstance(sketch, MedianSketch) else sketch.mode()
+        for col, sketch in stats.items()
+    }
+
+
+def save_state(stats, ingested_files, path=STATE_FILE):
+    state = {
+        'fill_stats': {col: sketch.to_dict() for col, sketch in stats.items()},
+        'ingested_files': ingested_files,
+        # Size of the CSV export holding exactly these files; anything past it
+        # was appended by an interrupted ingest and is truncated on resume
+        'csv_bytes': os.path.getsize(OUTPUT_FILE) if os.path.exists(OUTPUT_FILE) else 0,
+    }
+    with open(path, 'w') as f:
+        json.dump(state, f, indent=2)
+
+
+def load_state(path=STATE_FILE):
+    with open(path) as f:
+        state = json.load(f)
+    stats = {
+        col: (MedianSketch if col == 'Agent_Rating' else ModeCounter).from_dict(sketch)
+        for col, sketch in state['fill_stats'].items()
+    }
+    return stats, state['ingested_files'], state.get('csv_bytes')
+
+
+def normalize_chunk(df):
+    """Strip whitespace and turn 'NaN' strings into real missing values."""
+    # 1. Remove extra spaces from categorical columns
+    for col in STRIP_COLUMNS:
+        df[col] = df[col].str.strip()
+
+    # 2. Replace 'NaN' string with actual NaN
+    for col in NAN_STRING_COLUMNS:
+        df[col] = df[col].replace('NaN', np.nan)
+    return df
+
+
+@traced('clean.fill_stats')
+def collect_fill_stats(path, chunksize, stats):
+    """
+    First pass: update ``stats`` from a raw file.
+
+    Returns its row count, missing-value counts and the orders per distinct
+    store coordinate pair.
+    """
+    rows = 0
+    missing = None
+    store_pairs = None
+
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        rows += len(chunk)
+        nulls = chunk.isnull().sum()
+        missing = nulls if missing is None else missing + nulls
+
+        store_pairs = count_store_pairs(chunk, store_pairs)
+
+        chunk = normalize_chunk(chunk)
+        for col, sketch in stats.items():
+            sketch.update(chunk[col])
+
+    return rows, missing, store_pairs
+
+
+@traced('clean.chunk')
+def clean_chunk(df, fills, stores):
+    """Second pass: normalize one raw chunk, fill gaps and derive date/time columns."""
+    df = normalize_chunk(df)
+
+    # 3. Fill missing Agent_Rating with median
+    # 4-6. Fill missing Weather, Traffic and Order_Time with mode (most common)
+    for col in ['Agent_Rating', 'Weather', 'Traffic', 'Order_Time']:
+        df[col] = df[col].fillna(fills[col])
+
+    # 7. Convert date column
+    df['Order_Date'] = pd.to_datetime(df['Order_Date'])
+
+    # 8. Create new useful columns
+    df['Order_Day'] = df['Order_Date'].dt.day_name()
+    df['Order_Month'] = df['Order_Date'].dt.month_name()
+    df['Order_Hour'] = df['Order_Time'].str.split(':').str[0].astype(int)
+
+    # 9. Store-to-drop great-circle distance in km
+    df['Distance'] = distance_column(df).round(3)
+
+    # 10. Integer store key from the snapped store coordinates
+    df['Store_ID'] = stores.lookup(df['Store_Latitude'].to_numpy(), df['Store_Longitude'].to_numpy())
+
+    # 11. Agent key, unless the source already carries one
+    if 'Agent_ID' not in df.columns:
+        df['Agent_ID'] = agent_ids(df)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Clean the raw delivery export in chunks.')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE,
+                        help=f'rows per chunk (default: {CHUNK_SIZE:,})')
+    args = parser.parse_args()
+    trace_run(__file__)
+
+    # Pass 1: fill statistics
+    stats = new_fill_stats()
+    rows, missing, store_pairs = collect_fill_stats(RAW_FILE, args.chunksize, stats)
+    fills = fill_values(stats)
+    stores = StoreTable.empty().extend(store_pairs)
+
+    print("BEFORE CLEANING:")
+    print(f"Total rows: {rows}")
+    print(f"Missing values:\n{missing}\n")
 
-print("BEFORE CLEANING:")
-print(f"Total rows: {len(df)}")
-print(f"Missing values:\n{df.isnull().sum()}\n")
+    # Pass 2: clean each chunk and append it to the CSV export and the columnar store
+    rows = 0
+    missing = None
+    seen = {col: None for col in ['Traffic', 'Vehicle', 'Weather']}
+    store = StoreWriter(os.path.join(PROCESSED_DIR, PARQUET_FILE))
+    cleaned_bytes = compact_bytes = None
 
-# 1. Remove extra spaces from categorical columns
-df['Traffic'] = df['Traffic'].str.strip()
-df['Vehicle'] = df['Vehicle'].str.strip()
-df['Weather'] = df['Weather'].str.strip()
-df['Order_Time'] = df['Order_Time'].str.strip()
-df['Pickup_Time'] = df['Pickup_Time'].str.strip()
+    # A full rebuild replaces anything appended by ingest_orders.py
+    shutil.rmtree(os.path.join(PROCESSED_DIR, PARTITIONS_DIR), ignore_errors=True)
 
-# 2. Replace 'NaN' string with actual NaN
-df['Traffic'] = df['Traffic'].replace('NaN', np.nan)
-df['Order_Time'] = df['Order_Time'].replace('NaN', np.nan)
-df['Pickup_Time'] = df['Pickup_Time'].replace('NaN', np.nan)
+    for i, chunk in enumerate(pd.read_csv(RAW_FILE, chunksize=args.chunksize)):
+        chunk = clean_chunk(chunk, fills, stores)
+        chunk.to_csv(OUTPUT_FILE, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        compact = apply_schema(chunk)
+        store.write(compact)
+        cleaned_bytes = column_memory(chunk) + (0 if cleaned_bytes is None else cleaned_bytes)
+        compact_bytes = column_memory(compact) + (0 if compact_bytes is None else compact_bytes)
 
-# 3. Fill missing Agent_Rating with median
-df['Agent_Rating'] = df['Agent_Rating'].fillna(df['Agent_Rating'].median())
+        rows += len(chunk)
+        nulls = chunk.isnull().sum()
+        missing = nulls if missing is None else missing + nulls
+        for col, values in seen.items():
+            chunk_values = pd.Series(chunk[col].unique())
+            seen[col] = chunk_values if values is None else pd.concat([values, chunk_values])
 
-# 4. Fill missing Weather with mode (most common)
-df['Weather'] = df['Weather'].fillna(df['Weather'].mode()[0])
+    store.close()
+    save_state(stats, [os.path.basename(RAW_FILE)])
+    stores_path = write_stores(stores)
 
-# 5. Fill missing Traffic with mode
-df['Traffic'] = df['Traffic'].fillna(df['Traffic'].mode()[0])
+    # Spatial grid over store and drop locations, in store row order, read
+    # back from the store a chunk at a time so memory stays bounded
+    spatial_path = write_spatial_index(stream_spatial_index(batch_rows=args.chunksize))
 
-# 6. Fill missing Order_Time with mode (most common time)
-df['Order_Time'] = df['Order_Time'].fillna(df['Order_Time'].mode()[0])
+    print("\nAFTER CLEANING:")
+    print(f"Total rows: {rows}")
+    print(f"Missing values:\n{missing}\n")
 
-# 7. Convert date column
-df['Order_Date'] = pd.to_datetime(df['Order_Date'])
+    print("\nCleaned categorical values:")
+    print(f"Traffic: {seen['Traffic'].unique()}")
+    print(f"Vehicle: {seen['Vehicle'].unique()}")
+    print(f"Weather: {seen['Weather'].unique()}")
 
-# 8. Create new useful columns
-df['Order_Day'] = df['Order_Date'].dt.day_name()
-df['Order_Month'] = df['Order_Date'].dt.month_name()
-df['Order_Hour'] = df['Order_Time'].str.split(':').str[0].astype(int)
+    print("\nIn-memory size, cleaned dtypes vs compact schema (bytes):")
+    print(memory_report((chunk.dtypes, cleaned_bytes), (compact.dtypes, compact_bytes)).to_string())
 
-print("\nAFTER CLEANING:")
-print(f"Total rows: {len(df)}")
-print(f"Missing values:\n{df.isnull().sum()}\n")
+    print(f"\n✅ Cleaned data saved to: {OUTPUT_FILE}")
+    print(f"✅ Columnar store saved to: {store.path}")
+    print(f"✅ Spatial index saved to: {spatial_path}")
+    print(f"✅ Store table saved to: {stores_path} ({len(stores):,} stores)")
 
-print("\nCleaned categorical values:")
-print(f"Traffic: {df['Traffic'].unique()}")
-print(f"Vehicle: {df['Vehicle'].unique()}")
-print(f"Weather: {df['Weather'].unique()}")
 
-# Save cleaned data
-df.to_csv('data/processed/cleaned_data.csv', index=False)
-print("\n✅ Cleaned data saved to: data/processed/cleaned_data.csv")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
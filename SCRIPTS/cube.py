@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_store import PROCESSED_DIR, load_data, read_derived, write_derived
+from instrumentation import traced
+from schema import CATEGORICAL_COLUMNS
+
+CUBE_FILE = 'delivery_cube.parquet'
+
+# Cube grain: every filter dimension plus the chart dimensions
+DIMENSIONS = ['Area', 'Vehicle', 'Weather', 'Traffic', 'Order_Hour', 'Category']
+MEASURES = ['Delivery_Time', 'Agent_Rating']
+
+# Cell columns grouped by how they combine when cells are merged
+SUM_COLUMNS = ['Orders'] + [f'{m}_{s}' for m in MEASURES for s in ('sum', 'sumsq')]
+MIN_COLUMNS = [f'{m}_min' for m in MEASURES]
+MAX_COLUMNS = [f'{m}_max' for m in MEASURES]
+
+
+@traced('cube.build')
+def build_cube(df):
+    """
+    Aggregate order rows to one cell per dimension combination.
+
+    Each cell stores the order count and the sum, sum of squares, min and
+    max of every measure, which is enough to roll up counts, means and
+    standard deviations over any subset of the dimensions.
+    """
+    # Measures are widened first: the store's float32/int16 columns would
+    # otherwise be summed in their own precision
+    measures = {m: df[m].astype('float64' if pd.api.types.is_float_dtype(df[m]) else 'int64')
+                for m in MEASURES}
+    squares = {f'{m}_sq': measures[m].astype('float64') ** 2 for m in MEASURES}
+    frame = df[DIMENSIONS].assign(**measures, **squares)
+
+    aggregations = {'Orders': (MEASURES[0], 'size')}
+    for m in MEASURES:
+        aggregations[f'{m}_sum'] = (m, 'sum')
+        aggregations[f'{m}_sumsq'] = (f'{m}_sq', 'sum')
+        aggregations[f'{m}_min'] = (m, 'min')
+        aggregations[f'{m}_max'] = (m, 'max')
+
+    return frame.groupby(DIMENSIONS, observed=True).agg(**aggregations).reset_index()
+
+
+def merge_cubes(cube, delta):
+    """Fold a cube built from newly ingested rows into an existing cube."""
+    aggregations = {col: 'sum' for col in SUM_COLUMNS}
+    aggregations.update({col: 'min' for col in MIN_COLUMNS})
+    aggregations.update({col: 'max' for col in MAX_COLUMNS})
+
+    combined = pd.concat([cube, delta], ignore_index=True)
+    for col in DIMENSIONS:
+        if col in CATEGORICAL_COLUMNS:
+            combined[col] = combined[col].astype('category')
+    merged = combined.groupby(DIMENSIONS, observed=True).agg(aggregations).reset_index()
+    return merged[cube.columns]
+
+
+def write_cube(cube, processed_dir=PROCESSED_DIR):
+    """Write the cube, stamped with the current data version."""
+    return write_derived(cube, os.path.join(processed_dir, CUBE_FILE), processed_dir)
+
+
+def read_cube(processed_dir=PROCESSED_DIR):
+    """The materialized cube if it matches the store on disk, else None."""
+    return read_derived(os.path.join(processed_dir, CUBE_FILE), processed_dir)
+
+
+def load_cube(processed_dir=PROCESSED_DIR):
+    """
+    Read the materialized cube, building it from the processed store if missing.
+
+    A cube written at another data version (e.g. before clean_data.py
+    rewrote the store) is rebuilt and written back.
+    """
+    cube = read_cube(processed_dir)
+    if cube is not None:
+        return cube
+    cube = build_cube(load_data(columns=DIMENSIONS + MEASURES, processed_dir=processed_dir))
+    if os.path.exists(os.path.join(processed_dir, CUBE_FILE)):
+        write_cube(cube, processed_dir)
+    return cube
+
+
+@traced('cube.slice')
+def slice_cube(cube, selections):
+    """Keep the cube cells matching ``selections`` (column -> value, 'All' = no filter)."""
+    mask = np.ones(len(cube), dtype=bool)
+    for col, value in selections.items():
+        if value is None or value == 'All':
+            continue
+        mask &= (cube[col] == value).to_numpy()
+    return cube[mask]
+
+
+@traced('cube.rollup')
+def rollup(cube, by=None):
+    """
+    Roll the cube up to the ``by`` dimension(s), or to a single total row.
+
+    Returns order counts plus mean, std, min and max for every measure.
+    """
+    if by is None:
+        cells = pd.concat([
+            cube[SUM_COLUMNS].sum(), cube[MIN_COLUMNS].min(), cube[MAX_COLUMNS].max(),
+        ]).to_frame().T
+    else:
+        grouped = cube.groupby(by, observed=True)
+        cells = pd.concat([
+            grouped[SUM_COLUMNS].sum(), grouped[MIN_COLUMNS].min(), grouped[MAX_COLUMNS].max(),
+        ], axis=1)
+        cells = cells[cells['Orders'] > 0]
+
+    result = pd.DataFrame({'Orders': cells['Orders'].astype('int64')}, index=cells.index)
+    n = cells['Orders'].astype('float64')
+    for m in MEASURES:
+        total = cells[f'{m}_sum']
+        result[f'{m}_mean'] = total / n
+        variance = (cells[f'{m}_sumsq'] - total ** 2 / n) / (n - 1)
+        result[f'{m}_std'] = np.sqrt(variance.clip(lower=0))
+        result[f'{m}_min'] = cells[f'{m}_min']
+        result[f'{m}_max'] = cells[f'{m}_max']
+
+    if by is None:
+        return result.iloc[0]
+    return result
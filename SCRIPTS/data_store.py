@@ -0,0 +1,224 @@
+import glob
+import hashlib
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from instrumentation import traced
+from schema import apply_schema
+
+# Location of the processed dataset written by clean_data.py
+PROCESSED_DIR = 'data/processed'
+CSV_FILE = 'cleaned_data.csv'
+PARQUET_FILE = 'cleaned_data.parquet'
+
+# Uncompressed Arrow IPC (Feather v2) copy of the whole store, for fast
+# memory-mapped loads at dashboard start-up (see build_snapshot.py)
+SNAPSHOT_FILE = 'cleaned_data.arrow'
+
+# Incrementally ingested rows, one directory per Order_Date
+PARTITIONS_DIR = 'partitions'
+
+# Rows per batch when streaming the store
+BATCH_ROWS = 100_000
+
+
+def to_store_frame(df):
+    """Convert a cleaned frame to the compact dtypes used by the columnar store (see schema.py)."""
+    return apply_schema(df)
+
+
+class StoreWriter:
+    """
+    Append cleaned chunks to the Parquet store.
+
+    The schema is fixed by the first chunk, with categorical indices widened
+    to int32 so chunks with differently sized dictionaries stay compatible.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.schema = None
+        self.writer = None
+
+    @traced('store.write')
+    def write(self, df):
+        table = pa.Table.from_pandas(to_store_frame(df), preserve_index=False)
+        if self.writer is None:
+            self.schema = pa.schema([
+                field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+                if pa.types.is_dictionary(field.type) else field
+                for field in table.schema
+            ], metadata=table.schema.metadata)
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(table.cast(self.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def write_store(df, processed_dir=PROCESSED_DIR):
+    """Write the cleaned frame to the Parquet store and return its path."""
+    path = os.path.join(processed_dir, PARQUET_FILE)
+    writer = StoreWriter(path)
+    writer.write(df)
+    writer.close()
+    return path
+
+
+def write_partitions(df, name, processed_dir=PROCESSED_DIR):
+    """
+    Append cleaned rows to the store as one new file per Order_Date partition.
+
+    Returns the written paths. ``name`` identifies the batch, so a partition
+    directory collects one file per ingested batch for that date.
+    """
+    paths = []
+    dates = pd.to_datetime(df['Order_Date']).dt.strftime('%Y-%m-%d')
+    for date, rows in df.groupby(dates, sort=True):
+        partition = os.path.join(processed_dir, PARTITIONS_DIR, f'Order_Date={date}')
+        os.makedirs(partition, exist_ok=True)
+        writer = StoreWriter(os.path.join(partition, f'{name}.parquet'))
+        writer.write(rows)
+        writer.close()
+        paths.append(writer.path)
+    return paths
+
+
+def store_files(processed_dir=PROCESSED_DIR):
+    """Parquet files making up the store: the base file followed by ingested partitions."""
+    base = os.path.join(processed_dir, PARQUET_FILE)
+    if not os.path.exists(base):
+        return []
+    pattern = os.path.join(processed_dir, PARTITIONS_DIR, '*', '*.parquet')
+    return [base] + sorted(glob.glob(pattern))
+
+
+@traced('load_data')
+def load_data(columns=None, processed_dir=PROCESSED_DIR):
+    """
+    Load the processed dataset, reading only the requested columns.
+
+    Reads the Parquet store when it exists (column projection means
+    unrequested columns are never decoded), including any partitions added
+    by ingest_orders.py, and falls back to the CSV export otherwise. Either
+    way the columns come back with the compact dtypes of schema.py, so a
+    store written before the schema changed is converted on load.
+    """
+    files = store_files(processed_dir)
+    if len(files) == 1:
+        return to_store_frame(pd.read_parquet(files[0], columns=columns))
+    if files:
+        return to_store_frame(ds.dataset(files, format='parquet').to_table(columns=columns).to_pandas())
+
+    df = pd.read_csv(os.path.join(processed_dir, CSV_FILE), usecols=columns)
+    return to_store_frame(df)
+
+
+def write_snapshot(df, processed_dir=PROCESSED_DIR):
+    """
+    Write ``df`` (the full processed dataset) as the Arrow snapshot and return its path.
+
+    The snapshot records the data version it was taken at, so load_snapshot()
+    ignores it once the store changes. It is a single record batch, so each
+    column is one contiguous buffer that can be mapped without copying. It
+    is written to a temporary file and renamed, so readers that have the
+    old snapshot mapped keep a valid file.
+    """
+    path = os.path.join(processed_dir, SNAPSHOT_FILE)
+    table = pa.Table.from_pandas(to_store_frame(df), preserve_index=False).combine_chunks()
+    table = table.replace_schema_metadata({**table.schema.metadata,
+                                           b'data_version': data_version(processed_dir).encode()})
+    with pa.OSFile(path + '.tmp', 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def write_derived(df, path, processed_dir=PROCESSED_DIR):
+    """
+    Write a table built from the store (cube, agent table) to Parquet at ``path``.
+
+    The file records the data version it was built at, like the snapshot, so
+    read_derived() can tell when the store has changed underneath it. It is
+    written to a temporary file and renamed, so readers never see half of it.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata,
+                                           b'data_version': data_version(processed_dir).encode()})
+    pq.write_table(table, path + '.tmp')
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def read_derived(path, processed_dir=PROCESSED_DIR):
+    """The table written by write_derived() at ``path``, or None if it is missing or predates the store."""
+    if not os.path.exists(path):
+        return None
+    if (pq.read_schema(path).metadata or {}).get(b'data_version') != data_version(processed_dir).encode():
+        return None
+    return pd.read_parquet(path)
+
+
+@traced('load_snapshot')
+def load_snapshot(columns=None, processed_dir=PROCESSED_DIR):
+    """
+    Load the processed dataset from the Arrow snapshot, if it is current.
+
+    The snapshot is memory-mapped and uncompressed, so nothing is parsed or
+    decoded and only the pages of the requested columns are read. Numeric
+    and categorical columns without missing values come back as read-only
+    views on the mapping rather than copies, so every process that loads
+    the snapshot shares one copy of them through the OS page cache. Falls
+    back to load_data() when there is no snapshot or it predates the store.
+    """
+    path = os.path.join(processed_dir, SNAPSHOT_FILE)
+    if os.path.exists(path):
+        reader = pa.ipc.open_file(pa.memory_map(path))
+        if (reader.schema.metadata or {}).get(b'data_version') == data_version(processed_dir).encode():
+            table = reader.read_all()
+            table = table if columns is None else table.select(columns)
+            return to_store_frame(table.to_pandas(split_blocks=True))
+    return load_data(columns, processed_dir)
+
+
+def iter_batches(columns=None, batch_rows=BATCH_ROWS, processed_dir=PROCESSED_DIR):
+    """
+    Yield the processed dataset as frames of at most ``batch_rows`` rows.
+
+    Same sources and dtypes as load_data(), but only one batch is held in
+    memory at a time.
+    """
+    files = store_files(processed_dir)
+    if files:
+        dataset = ds.dataset(files, format='parquet')
+        for batch in dataset.to_batches(columns=columns, batch_size=batch_rows):
+            yield to_store_frame(batch.to_pandas())
+        return
+
+    for chunk in pd.read_csv(os.path.join(processed_dir, CSV_FILE), usecols=columns,
+                             chunksize=batch_rows):
+        yield to_store_frame(chunk)
+
+
+def data_version(processed_dir=PROCESSED_DIR):
+    """
+    Short fingerprint of the processed dataset on disk.
+
+    Built from the names, sizes and modification times of the files that
+    load_data() would read, so it changes whenever clean_data.py or
+    ingest_orders.py rewrites or extends the store. Names are taken relative
+    to ``processed_dir``, so the version does not depend on how the
+    directory is spelled.
+    """
+    files = store_files(processed_dir) or [os.path.join(processed_dir, CSV_FILE)]
+    h = hashlib.sha1()
+    for path in files:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            h.update(f'{os.path.relpath(path, processed_dir)}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+    return h.hexdigest()[:12]
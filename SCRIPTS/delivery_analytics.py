@@ -1,8 +1,26 @@
-import pandas as pd
-import numpy as np
+import argparse
 
-# Load cleaned data
-df = pd.read_csv('data/processed/cleaned_data.csv')
+from backends import add_backend_argument
+from instrumentation import trace_run
+from partitioned import add_partition_arguments
+from report_aggregates import load_report_aggregates
+from streaming_stats import MedianSketch, Moments, stream_statistics
+
+parser = argparse.ArgumentParser(description='Delivery performance analytics.')
+add_partition_arguments(parser)
+add_backend_argument(parser)
+args = parser.parse_args()
+trace_run(__file__)
+parallel = {'workers': args.workers, 'partition_by': args.partition_by}
+
+# Delivery time summary, streamed over the store in bounded-memory batches
+delivery = stream_statistics({
+    'moments': (['Delivery_Time'], Moments()),
+    'quantiles': (['Delivery_Time'], MedianSketch()),
+}, **parallel)
+
+# Grouped aggregates shared by all analytics and report scripts
+aggregates = load_report_aggregates(backend=args.backend, **parallel)
 
 print("="*60)
 print("DELIVERY PERFORMANCE ANALYTICS")
@@ -10,52 +28,45 @@ print("="*60)
 
 # 1. Overall Delivery Metrics
 print("\n1. OVERALL DELIVERY METRICS:")
-print(f"   Total Orders: {len(df):,}")
-print(f"   Average Delivery Time: {df['Delivery_Time'].mean():.2f} minutes")
-print(f"   Median Delivery Time: {df['Delivery_Time'].median():.2f} minutes")
-print(f"   Min Delivery Time: {df['Delivery_Time'].min()} minutes")
-print(f"   Max Delivery Time: {df['Delivery_Time'].max()} minutes")
-print(f"   Std Deviation: {df['Delivery_Time'].std():.2f} minutes")
+moments = delivery['moments']
+print(f"   Total Orders: {moments.count:,}")
+print(f"   Average Delivery Time: {moments.mean:.2f} minutes")
+print(f"   Median Delivery Time: {delivery['quantiles'].median():.2f} minutes")
+print(f"   Min Delivery Time: {moments.min:.0f} minutes")
+print(f"   Max Delivery Time: {moments.max:.0f} minutes")
+print(f"   Std Deviation: {moments.std:.2f} minutes")
 
 # 2. Delivery Time by Vehicle Type
 print("\n2. DELIVERY TIME BY VEHICLE TYPE:")
-vehicle_analysis = df.groupby('Vehicle')['Delivery_Time'].agg([
-    ('Count', 'count'),
-    ('Avg_Time', 'mean'),
-    ('Min_Time', 'min'),
-    ('Max_Time', 'max')
-]).round(2)
+vehicle_analysis = aggregates['vehicle'][['Orders', 'Delivery_Time_mean', 'Delivery_Time_min',
+                                           'Delivery_Time_max']].round(2)
+vehicle_analysis.columns = ['Count', 'Avg_Time', 'Min_Time', 'Max_Time']
 print(vehicle_analysis)
 
 # 3. Delivery Time by Weather Condition
 print("\n3. DELIVERY TIME BY WEATHER CONDITION:")
-weather_analysis = df.groupby('Weather')['Delivery_Time'].agg([
-    ('Count', 'count'),
-    ('Avg_Time', 'mean')
-]).sort_values('Avg_Time', ascending=False).round(2)
+weather_analysis = aggregates['weather'][['Orders', 'Delivery_Time_mean']]
+weather_analysis.columns = ['Count', 'Avg_Time']
+weather_analysis = weather_analysis.sort_values('Avg_Time', ascending=False).round(2)
 print(weather_analysis)
 
 # 4. Delivery Time by Traffic Condition
 print("\n4. DELIVERY TIME BY TRAFFIC CONDITION:")
-traffic_analysis = df.groupby('Traffic')['Delivery_Time'].agg([
-    ('Count', 'count'),
-    ('Avg_Time', 'mean')
-]).sort_values('Avg_Time', ascending=False).round(2)
+traffic_analysis = aggregates['traffic'][['Orders', 'Delivery_Time_mean']]
+traffic_analysis.columns = ['Count', 'Avg_Time']
+traffic_analysis = traffic_analysis.sort_values('Avg_Time', ascending=False).round(2)
 print(traffic_analysis)
 
 # 5. Delivery Time by Area
 print("\n5. DELIVERY TIME BY AREA:")
-area_analysis = df.groupby('Area')['Delivery_Time'].agg([
-    ('Count', 'count'),
-    ('Avg_Time', 'mean'),
-    ('Min_Time', 'min'),
-    ('Max_Time', 'max')
-]).round(2)
+area_analysis = aggregates['area'][['Orders', 'Delivery_Time_mean', 'Delivery_Time_min',
+                                     'Delivery_Time_max']].round(2)
+area_analysis.columns = ['Count', 'Avg_Time', 'Min_Time', 'Max_Time']
 print(area_analysis)
 
 # 6. Delivery Time by Product Category
 print("\n6. TOP 5 FASTEST & SLOWEST CATEGORIES:")
-category_analysis = df.groupby('Category')['Delivery_Time'].mean().round(2)
+category_analysis = aggregates['category']['Delivery_Time_mean'].rename('Delivery_Time').round(2)
 print("\nFastest Deliveries:")
 print(category_analysis.nsmallest(5))
 print("\nSlowest Deliveries:")
@@ -63,7 +74,7 @@ print(category_analysis.nlargest(5))
 
 # 7. Peak Delivery Hours
 print("\n7. BUSIEST DELIVERY HOURS:")
-hour_analysis = df.groupby('Order_Hour')['Order_ID'].count().sort_values(ascending=False).head(5)
+hour_analysis = aggregates['hour']['Orders'].rename('Order_ID').sort_values(ascending=False).head(5)
 print(hour_analysis)
 
 print("\n" + "="*60)
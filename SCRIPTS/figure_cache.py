@@ -0,0 +1,71 @@
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+
+from instrumentation import span
+
+# Savefig settings matching what st.pyplot uses, so cached images look the same
+SAVEFIG_PARAMS = {'format': 'png', 'dpi': 200, 'bbox_inches': 'tight'}
+
+
+class FigureCache:
+    """
+    Least-recently-used cache of rendered chart images.
+
+    Entries are PNG bytes keyed by whatever identifies a chart's content,
+    typically (chart id, filter selections, data version). The cache is
+    bounded both by entry count and by total image size; the least recently
+    used images are evicted first. Safe to share between dashboard sessions.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get_or_render(self, key, build_figure):
+        """
+        Return the PNG bytes for ``key``, rendering them on a miss.
+
+        ``build_figure`` is only called on a miss and must return a matplotlib
+        figure; it is closed once saved.
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        with span('figure.build'):
+            fig = build_figure()
+        with span('savefig'):
+            buf = io.BytesIO()
+            fig.savefig(buf, **SAVEFIG_PARAMS)
+            plt.close(fig)
+        image = buf.getvalue()
+
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = image
+                self.size += len(image)
+            while self.entries and (len(self.entries) > self.max_entries or self.size > self.max_bytes):
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+        return image
+
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'entries': len(self.entries), 'bytes': self.size}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import traced
+
+# Columns exposed as sidebar filters in the dashboard
+FILTER_COLUMNS = ['Area', 'Vehicle', 'Weather', 'Traffic']
+
+
+class FilterIndex:
+    """
+    Inverted index over the dashboard filter columns.
+
+    Holds one packed row-position bitmap per (column, value) pair, built in a
+    single pass when the dataset is loaded. A filter selection resolves by
+    AND-ing the selected bitmaps, so a rerun never rescans or copies the frame.
+    """
+
+    @traced('filter.index')
+    def __init__(self, df, columns=FILTER_COLUMNS):
+        self.n_rows = len(df)
+        self.bitmaps = {}
+        for col in columns:
+            codes, uniques = pd.factorize(df[col], sort=True)
+            self.bitmaps[col] = {
+                value: np.packbits(codes == code)
+                for code, value in enumerate(uniques)
+            }
+
+    def values(self, column):
+        """Sorted distinct values of a filter column."""
+        return list(self.bitmaps[column])
+
+    @traced('filter.positions')
+    def positions(self, selections):
+        """
+        Row positions matching every selection, or None when nothing is filtered.
+
+        ``selections`` maps column -> value; ``'All'`` or None leaves the
+        column unfiltered.
+        """
+        mask = None
+        for col, value in selections.items():
+            if value is None or value == 'All':
+                continue
+            bitmap = self.bitmaps[col].get(value)
+            if bitmap is None:
+                return np.empty(0, dtype=np.int64)
+            mask = bitmap if mask is None else np.bitwise_and(mask, bitmap)
+        if mask is None:
+            return None
+        return np.flatnonzero(np.unpackbits(mask, count=self.n_rows))
+
+    def apply(self, df, selections):
+        """Return the rows of ``df`` matching ``selections`` without copying when unfiltered."""
+        positions = self.positions(selections)
+        if positions is None:
+            return df
+        return df.take(positions)
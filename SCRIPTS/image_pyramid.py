@@ -0,0 +1,38 @@
+import os
+
+# Downscaled copies live next to each chart, one subdirectory per level
+PYRAMID_DIR = '_pyramid'
+
+# Longest side in pixels of each derived level. The 'print' level is the
+# original full-resolution PNG written by the report scripts.
+LEVELS = {'thumb': 480, 'screen': 1600}
+PRINT_LEVEL = 'print'
+
+
+def level_path(chart_path, level):
+    """Path of ``chart_path`` at the given pyramid level."""
+    if level == PRINT_LEVEL:
+        return chart_path
+    directory, name = os.path.split(chart_path)
+    return os.path.join(directory, PYRAMID_DIR, level, name)
+
+
+def has_pyramid(chart_path):
+    return all(os.path.exists(level_path(chart_path, level)) for level in LEVELS)
+
+
+def write_pyramid(chart_path):
+    """Write the downscaled levels of a chart PNG and return their paths."""
+    # Imported here so the dashboard, which only reads the levels, never loads PIL
+    from PIL import Image
+    paths = []
+    with Image.open(chart_path) as img:
+        img.load()
+        for level, size in LEVELS.items():
+            path = level_path(chart_path, level)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            scaled = img.copy()
+            scaled.thumbnail((size, size), Image.LANCZOS)
+            scaled.save(path, optimize=True)
+            paths.append(path)
+    return paths
@@ -0,0 +1,157 @@
+import argparse
+import glob
+import os
+import re
+import sys
+
+import pandas as pd
+
+from agents import AGENTS_FILE, build_agents, merge_agents, read_agents, write_agents
+from clean_data import (CHUNK_SIZE, OUTPUT_FILE, STATE_FILE, clean_chunk,
+                        collect_fill_stats, fill_values, load_state, save_state)
+from cube import CUBE_FILE, build_cube, merge_cubes, read_cube, write_cube
+from data_store import (PARTITIONS_DIR, PROCESSED_DIR, SNAPSHOT_FILE, load_data, to_store_frame,
+                        write_partitions, write_snapshot)
+from instrumentation import trace_run
+from spatial_index import stream_spatial_index, write_spatial_index
+from stores import load_stores, write_stores
+
+# Newly arrived raw order files (same layout as amazon_delivery.csv)
+INCOMING_DIR = 'data/incoming'
+
+
+def remove_file_partitions(stem, processed_dir=PROCESSED_DIR):
+    """
+    Delete the partition files written for raw file ``stem`` (``<stem>-<chunk>.parquet``).
+
+    Used before a file is ingested, so partitions left by an interrupted run
+    are replaced rather than duplicated, whatever chunk size either run used.
+    Returns the number of files removed.
+    """
+    name = re.compile(re.escape(stem) + r'-\d+\.parquet')
+    removed = 0
+    for path in glob.glob(os.path.join(processed_dir, PARTITIONS_DIR, '*', '*.parquet')):
+        if name.fullmatch(os.path.basename(path)):
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def ingest_file(path, stats, chunksize):
+    """
+    Clean one raw file and append it to the store as Order_Date partitions.
+
+    The running fill statistics are updated with the file first, so its
+    gaps are filled from the same history a full rebuild would use, and
+    store locations not yet in the store table are added to it. Returns
+    the row count, the partitions touched, and a cube and agent table built
+    from the new rows.
+    """
+    rows, _, store_pairs = collect_fill_stats(path, chunksize, stats)
+    fills = fill_values(stats)
+    stores = load_stores().extend(store_pairs)
+    write_stores(stores)
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    partitions = set()
+    delta = None
+    agents = None
+    for i, chunk in enumerate(pd.read_csv(path, chunksize=chunksize)):
+        chunk = clean_chunk(chunk, fills, stores)
+        chunk.to_csv(OUTPUT_FILE, mode='a', header=False, index=False)
+        chunk = to_store_frame(chunk)
+        for partition in write_partitions(chunk, f'{stem}-{i:04d}'):
+            partitions.add(os.path.dirname(partition))
+        chunk_cube = build_cube(chunk)
+        delta = chunk_cube if delta is None else merge_cubes(delta, chunk_cube)
+        chunk_agents = build_agents(chunk)
+        agents = chunk_agents if agents is None else merge_agents(agents, chunk_agents)
+    return rows, sorted(partitions), delta, agents
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Append newly arrived raw order files to the processed store.')
+    parser.add_argument('files', nargs='*',
+                        help=f'raw CSV files to ingest (default: every new file in {INCOMING_DIR})')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE,
+                        help=f'rows per chunk (default: {CHUNK_SIZE:,})')
+    args = parser.parse_args()
+    trace_run(__file__)
+
+    if not os.path.exists(STATE_FILE):
+        sys.exit(f"❌ {STATE_FILE} not found. Run clean_data.py once before ingesting.")
+
+    stats, ingested, csv_bytes = load_state()
+
+    # Drop CSV rows appended by a run interrupted part-way through a file;
+    # that file is not marked ingested, so it is appended again below
+    if csv_bytes is not None and os.path.exists(OUTPUT_FILE) and os.path.getsize(OUTPUT_FILE) > csv_bytes:
+        with open(OUTPUT_FILE, 'r+b') as f:
+            f.truncate(csv_bytes)
+    files = args.files or sorted(glob.glob(os.path.join(INCOMING_DIR, '*.csv')))
+    new_files = [f for f in files if os.path.basename(f) not in ingested]
+
+    print("="*60)
+    print("INCREMENTAL ORDER INGEST")
+    print("="*60)
+    print(f"\n   Files found: {len(files)}")
+    print(f"   Already ingested: {len(files) - len(new_files)}")
+
+    cube_path = os.path.join(PROCESSED_DIR, CUBE_FILE)
+    agents_path = os.path.join(PROCESSED_DIR, AGENTS_FILE)
+    total_rows = 0
+    for path in new_files:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        leftovers = remove_file_partitions(stem)
+        if leftovers:
+            print(f"\n   ⚠️ Removed {leftovers} partition file(s) of an interrupted {os.path.basename(path)} ingest")
+
+        # Only a cube and agent table matching the store before this file can
+        # take its rows; stale ones are rebuilt by load_cube()/load_agents() instead.
+        # If an interrupted run already merged this file, removing its partitions
+        # above has changed the store version, so the merge is not repeated
+        cube = read_cube()
+        agents = read_agents()
+        rows, partitions, file_cube, file_agents = ingest_file(path, stats, args.chunksize)
+        total_rows += rows
+        print(f"\n   ✅ {os.path.basename(path)}: {rows:,} orders -> {len(partitions)} date partition(s)")
+
+        # Downstream aggregates are updated from the file's rows alone and
+        # stamped with the new store version before the file is marked ingested
+        if file_cube is not None and cube is not None:
+            write_cube(merge_cubes(cube, file_cube))
+            print(f"   ✅ Cube updated: {cube_path}")
+        elif os.path.exists(cube_path):
+            print(f"   ⚠️ Cube out of date; rebuilt on next load: {cube_path}")
+        if file_agents is not None and agents is not None:
+            write_agents(merge_agents(agents, file_agents))
+            print(f"   ✅ Agent table updated: {agents_path}")
+        elif os.path.exists(agents_path):
+            print(f"   ⚠️ Agent table out of date; rebuilt on next load: {agents_path}")
+
+        # Record progress per file so an interrupted run resumes from the next one
+        ingested.append(os.path.basename(path))
+        save_state(stats, ingested)
+
+    # New partitions interleave with existing ones by date, shifting store
+    # row positions, so the spatial index is rebuilt from the coordinates
+    if new_files:
+        spatial_path = write_spatial_index(stream_spatial_index(batch_rows=args.chunksize))
+        print(f"\n   ✅ Spatial index rebuilt: {spatial_path}")
+
+        # A snapshot taken before this ingest no longer matches the store
+        if os.path.exists(os.path.join(PROCESSED_DIR, SNAPSHOT_FILE)):
+            print(f"   ✅ Snapshot refreshed: {write_snapshot(load_data())}")
+
+    fills = fill_values(stats)
+    print("\n   Running fill values:")
+    for col, value in fills.items():
+        print(f"   - {col}: {value}")
+
+    print("\n" + "="*60)
+    print(f"✅ Ingested {total_rows:,} new orders from {len(new_files)} file(s)")
+    print("="*60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+import atexit
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+import pandas as pd
+
+# Tracing is off unless this is set (to anything but '' or '0'); spans then
+# cost a flag check. SUPPLY_CHAIN_PROFILE additionally runs cProfile.
+TRACE_ENV = 'SUPPLY_CHAIN_TRACE'
+PROFILE_ENV = 'SUPPLY_CHAIN_PROFILE'
+
+# Where batch scripts write <script>.trace.json and <script>.prof
+TRACE_DIR = os.path.join('reports', 'traces')
+
+_DISABLED = nullcontext()
+
+
+def _flag(name):
+    return os.environ.get(name, '') not in ('', '0')
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'attrs', 'start')
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.tracer._stack().append(self.name)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        stack = self.tracer._stack()
+        stack.pop()
+        self.tracer._records().append((self.name, self.start, end - self.start, tuple(stack), self.attrs))
+        return False
+
+
+class Tracer:
+    """
+    Nested timing spans, recorded per thread.
+
+    Each thread (a batch script, or one Streamlit rerun) sees only its own
+    spans, so concurrent dashboard sessions do not mix their timings. When
+    disabled, ``span()`` returns a shared no-op context manager and
+    ``traced`` functions just call through.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.local = threading.local()
+
+    def _records(self):
+        if not hasattr(self.local, 'records'):
+            self.local.records = []
+        return self.local.records
+
+    def _stack(self):
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        return self.local.stack
+
+    def span(self, name, **attrs):
+        """Context manager timing the enclosed block as ``name``."""
+        if not self.enabled:
+            return _DISABLED
+        return _Span(self, name, attrs)
+
+    def traced(self, name=None):
+        """Decorator timing every call of a function as one span (default name: its qualified name)."""
+        def decorate(func):
+            label = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, label, {}):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        """Forget the current thread's spans (e.g. at the start of a dashboard rerun)."""
+        self._records().clear()
+
+    def records(self):
+        """The current thread's spans as (name, start_ns, duration_ns, parents, attrs), in end order."""
+        return list(self._records())
+
+    def table(self):
+        """
+        Calls and total/mean/max milliseconds per span, in first-start order.
+
+        Spans with the same name under the same parents share a row, indented
+        by nesting depth.
+        """
+        rows = {}
+        for name, start, duration, parents, _ in sorted(self._records(), key=lambda r: r[1]):
+            row = rows.setdefault(parents + (name,), {'Span': '  ' * len(parents) + name, 'Calls': 0,
+                                                      'Total_ms': 0.0, 'Max_ms': 0.0})
+            row['Calls'] += 1
+            row['Total_ms'] += duration / 1e6
+            row['Max_ms'] = max(row['Max_ms'], duration / 1e6)
+        table = pd.DataFrame(list(rows.values()), columns=['Span', 'Calls', 'Total_ms', 'Max_ms'])
+        table.insert(3, 'Mean_ms', table['Total_ms'] / table['Calls'].clip(lower=1))
+        return table.round(2)
+
+    def write_trace(self, path, metadata=None):
+        """
+        Write the current thread's spans as a Chrome trace-event JSON file.
+
+        The file opens in chrome://tracing, Perfetto and speedscope (which
+        also reads py-spy's output); ``summary`` holds the table() rows.
+        """
+        pid = os.getpid()
+        tid = threading.get_ident()
+        events = [
+            {'name': name, 'ph': 'X', 'ts': start / 1e3, 'dur': duration / 1e3,
+             'pid': pid, 'tid': tid, 'args': {k: str(v) for k, v in attrs.items()}}
+            for name, start, duration, _, attrs in sorted(self._records(), key=lambda r: r[1])
+        ]
+        trace = {'traceEvents': events, 'displayTimeUnit': 'ms', 'metadata': metadata or {},
+                 'summary': self.table().to_dict(orient='records')}
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(trace, f, indent=1)
+        return path
+
+
+TRACER = Tracer(enabled=_flag(TRACE_ENV) or _flag(PROFILE_ENV))
+span = TRACER.span
+traced = TRACER.traced
+
+
+def trace_run(script, trace_dir=TRACE_DIR):
+    """
+    Record a batch script run when tracing is enabled.
+
+    Call at the start of the script. On exit the spans are written to
+    ``<trace_dir>/<script>.trace.json`` and, with SUPPLY_CHAIN_PROFILE set,
+    the cProfile stats to ``<script>.prof`` (readable with pstats or
+    snakeviz). Does nothing when tracing is off.
+    """
+    if not TRACER.enabled:
+        return
+    name = os.path.splitext(os.path.basename(script))[0]
+    profiler = None
+    if _flag(PROFILE_ENV):
+        profiler = cProfile.Profile()
+        profiler.enable()
+    run = TRACER.span(name, argv=' '.join(sys.argv[1:]))
+    run.__enter__()
+
+    def finish():
+        run.__exit__(None, None, None)
+        path = TRACER.write_trace(os.path.join(trace_dir, f'{name}.trace.json'),
+                                  {'script': name, 'argv': sys.argv[1:]})
+        print(f"\n⏱️ Trace saved to: {path}", file=sys.stderr)
+        print(TRACER.table().to_string(index=False), file=sys.stderr)
+        if profiler is not None:
+            profiler.disable()
+            prof_path = os.path.join(trace_dir, f'{name}.prof')
+            profiler.dump_stats(prof_path)
+            print(f"⏱️ Profile saved to: {prof_path}", file=sys.stderr)
+
+    atexit.register(finish)
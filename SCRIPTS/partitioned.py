@@ -0,0 +1,87 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from data_store import BATCH_ROWS, PROCESSED_DIR, store_files, to_store_frame
+from instrumentation import traced
+
+# Columns the store can be split on
+PARTITION_KEYS = ['month', 'Area']
+
+
+def add_partition_arguments(parser):
+    """Add the --workers/--partition-by options shared by the analytics scripts."""
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes; above 1 the store is split into partitions '
+                             'processed in parallel (default: 1)')
+    parser.add_argument('--partition-by', choices=PARTITION_KEYS, default='month',
+                        help="how to split the store for --workers: by Order_Date 'month' "
+                             "or by 'Area' (default: month)")
+
+
+def _dataset(processed_dir):
+    files = store_files(processed_dir)
+    if not files:
+        raise FileNotFoundError(
+            f"Partitioned execution needs the Parquet store in {processed_dir}; run clean_data.py")
+    return ds.dataset(files, format='parquet')
+
+
+def list_partitions(partition_by, processed_dir=PROCESSED_DIR):
+    """
+    Row filters splitting the store into disjoint partitions.
+
+    'month' gives one filter per calendar month of ``Order_Date``, 'Area'
+    one per area; rows with no value form a partition of their own.
+    """
+    if partition_by == 'month':
+        field = ds.field('Order_Date')
+        dates = _dataset(processed_dir).to_table(columns=['Order_Date']).column('Order_Date')
+        months = pd.Series(dates.to_pandas()).dropna().dt.to_period('M').unique()
+        filters = [(field >= month.start_time) & (field < (month + 1).start_time)
+                   for month in sorted(months)]
+    elif partition_by == 'Area':
+        field = ds.field('Area')
+        values = pc.unique(_dataset(processed_dir).to_table(columns=['Area']).column('Area'))
+        filters = [field == value for value in sorted(v for v in values.to_pylist() if v is not None)]
+    else:
+        raise ValueError(f"Unknown partition key '{partition_by}'; expected one of {PARTITION_KEYS}")
+    return filters + [field.is_null()]
+
+
+@traced('load_partition')
+def load_partition(columns, partition, processed_dir=PROCESSED_DIR):
+    """Rows of one partition, with the dtypes load_data() returns."""
+    table = _dataset(processed_dir).to_table(columns=columns, filter=partition)
+    return to_store_frame(table.to_pandas())
+
+
+def iter_partition_batches(columns, partition, batch_rows=BATCH_ROWS, processed_dir=PROCESSED_DIR):
+    """Rows of one partition as frames of at most ``batch_rows`` rows."""
+    batches = _dataset(processed_dir).to_batches(columns=columns, filter=partition, batch_size=batch_rows)
+    for batch in batches:
+        yield to_store_frame(batch.to_pandas())
+
+
+@traced('map_partitions')
+def map_partitions(func, args=(), workers=None, partition_by='month', processed_dir=PROCESSED_DIR):
+    """
+    Call ``func(partition, *args)`` for every partition across a process pool.
+
+    Returns the results in partition order. Workers are forked where the
+    platform allows it, as in build_reports.py, so ``func`` and ``args``
+    need not be importable from the calling script.
+    """
+    partitions = list_partitions(partition_by, processed_dir)
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=context) as pool:
+        futures = [pool.submit(func, partition, *args) for partition in partitions]
+        return [future.result() for future in futures]
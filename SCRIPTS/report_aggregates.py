@@ -0,0 +1,107 @@
+import json
+import os
+
+import pandas as pd
+
+from aggregation_engine import AggSpec, aggregate
+from backends import add_derived_columns, make_backend
+from data_store import PROCESSED_DIR, data_version
+from instrumentation import traced
+
+# Computed aggregates, one Parquet file per spec, tagged with the data version
+AGGREGATES_DIR = 'aggregates'
+VERSION_FILE = 'version.json'
+
+AGE_BINS = [15, 25, 35, 45, 50]
+AGE_LABELS = ['15-25', '26-35', '36-45', '46-50']
+
+
+def age_group(ages):
+    return pd.cut(ages, bins=AGE_BINS, labels=AGE_LABELS)
+
+
+def month_number(dates):
+    return dates.dt.month
+
+
+# Same bins as age_group(): right-closed, ages outside them have no group
+AGE_GROUP_SQL = 'CASE {} END'.format(' '.join(
+    f"""WHEN "Agent_Age" > {low} AND "Agent_Age" <= {high} THEN '{label}'"""
+    for low, high, label in zip(AGE_BINS, AGE_BINS[1:], AGE_LABELS)))
+
+# Columns derived from stored columns before aggregating:
+# name -> (source, pandas derive, SQL expression for the duckdb backend)
+DERIVED_COLUMNS = {
+    'Age_Group': ('Agent_Age', age_group, AGE_GROUP_SQL),
+    'Order_Month_Number': ('Order_Date', month_number, 'month("Order_Date")'),
+}
+
+# Every grouped aggregate read by the analytics and visualization scripts
+REPORT_SPECS = [
+    AggSpec('vehicle', ['Vehicle'], ['Delivery_Time', 'Agent_Rating', 'Distance'], ['mean', 'min', 'max']),
+    AggSpec('weather', ['Weather'], ['Delivery_Time', 'Agent_Rating'], ['mean']),
+    AggSpec('traffic', ['Traffic'], ['Delivery_Time'], ['mean']),
+    AggSpec('area', ['Area'], ['Delivery_Time', 'Agent_Rating'], ['mean', 'min', 'max']),
+    AggSpec('category', ['Category'], ['Delivery_Time'], ['mean']),
+    AggSpec('hour', ['Order_Hour'], ['Delivery_Time'], ['mean']),
+    AggSpec('day', ['Order_Day'], ['Delivery_Time'], ['mean']),
+    AggSpec('month', ['Order_Month'], [], []),
+    AggSpec('month_number', ['Order_Month_Number'], [], []),
+    AggSpec('weather_traffic', ['Weather', 'Traffic'], ['Delivery_Time'], ['mean']),
+    AggSpec('area_category', ['Area', 'Category'], [], []),
+    AggSpec('store', ['Store_ID'], ['Delivery_Time', 'Agent_Rating'], ['mean']),
+    AggSpec('age', ['Agent_Age'], ['Agent_Rating'], ['mean']),
+    AggSpec('age_group', ['Age_Group'], ['Agent_Rating', 'Delivery_Time'], ['mean']),
+    AggSpec('rating', ['Agent_Rating'], ['Delivery_Time', 'Agent_Age'], ['count', 'sum', 'mean']),
+]
+
+
+def compute_report_aggregates(df, specs=REPORT_SPECS):
+    return aggregate(add_derived_columns(df, specs, DERIVED_COLUMNS), specs)
+
+
+def compute_with_backend(specs=REPORT_SPECS, backend='pandas', filters=None, processed_dir=PROCESSED_DIR,
+                         workers=1, partition_by='month'):
+    """Compute ``specs`` over the store with the named query backend (see backends.py)."""
+    engine = make_backend(backend, processed_dir, workers, partition_by)
+    return engine.aggregate(specs, filters, DERIVED_COLUMNS)
+
+
+def _signature(processed_dir, specs):
+    return {'data_version': data_version(processed_dir), 'specs': [list(spec) for spec in specs]}
+
+
+def write_report_aggregates(results, signature, processed_dir=PROCESSED_DIR):
+    directory = os.path.join(processed_dir, AGGREGATES_DIR)
+    os.makedirs(directory, exist_ok=True)
+    for name, frame in results.items():
+        frame.to_parquet(os.path.join(directory, f'{name}.parquet'))
+    with open(os.path.join(directory, VERSION_FILE), 'w') as f:
+        json.dump(signature, f, indent=2)
+    return directory
+
+
+@traced('load_report_aggregates')
+def load_report_aggregates(processed_dir=PROCESSED_DIR, specs=REPORT_SPECS,
+                           workers=1, partition_by='month', backend='pandas'):
+    """
+    The report aggregate bundle: {spec name: DataFrame}.
+
+    Read from disk when it was computed from the current processed data and
+    specs; otherwise computed with ``backend`` and saved, so the next script
+    reuses it. With the pandas backend and ``workers`` above 1 the
+    computation runs per ``partition_by`` partition in parallel.
+    """
+    directory = os.path.join(processed_dir, AGGREGATES_DIR)
+    signature = _signature(processed_dir, specs)
+    version_path = os.path.join(directory, VERSION_FILE)
+    if os.path.exists(version_path):
+        with open(version_path) as f:
+            if json.load(f) == signature:
+                return {spec.name: pd.read_parquet(os.path.join(directory, f'{spec.name}.parquet'))
+                        for spec in specs}
+
+    results = compute_with_backend(specs, backend, processed_dir=processed_dir,
+                                   workers=workers, partition_by=partition_by)
+    write_report_aggregates(results, signature, processed_dir)
+    return results
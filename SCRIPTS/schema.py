@@ -0,0 +1,73 @@
+import pandas as pd
+
+# Compact dtypes of the processed dataset, shared by the cleaner, the
+# columnar store and every loader. Value ranges: ages 15-50, hours 0-23,
+# delivery times in minutes (<= 32,767); coordinates and ratings need no
+# more than float32's ~7 significant digits.
+CATEGORICAL_COLUMNS = ['Weather', 'Traffic', 'Vehicle', 'Area', 'Category', 'Order_Day', 'Order_Month']
+
+# Clock times stored as minutes since midnight (nullable: Pickup_Time can be missing)
+TIME_COLUMNS = ['Order_Time', 'Pickup_Time']
+
+DTYPES = {
+    **{col: 'category' for col in CATEGORICAL_COLUMNS},
+    **{col: 'Int16' for col in TIME_COLUMNS},
+    'Agent_Age': 'int8',
+    'Order_Hour': 'int8',
+    'Delivery_Time': 'int16',
+    'Agent_Rating': 'float32',
+    'Store_Latitude': 'float32',
+    'Store_Longitude': 'float32',
+    'Drop_Latitude': 'float32',
+    'Drop_Longitude': 'float32',
+    'Store_ID': 'int32',
+    'Agent_ID': 'int64',
+}
+
+
+def to_minutes(times):
+    """'HH:MM:SS' strings as minutes since midnight; numeric input is taken as minutes already."""
+    if pd.api.types.is_numeric_dtype(times.dtype):
+        return times.astype('Int16')
+    delta = pd.to_timedelta(times, errors='coerce')
+    return (delta.dt.total_seconds() // 60).astype('Int16')
+
+
+def apply_schema(df):
+    """``df`` with the compact dtypes for whichever schema columns it has; columns already converted are left alone."""
+    converted = {}
+    for col, dtype in DTYPES.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        converted[col] = to_minutes(df[col]) if col in TIME_COLUMNS else df[col].astype(dtype)
+    if 'Order_Date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['Order_Date'].dtype):
+        converted['Order_Date'] = pd.to_datetime(df['Order_Date'])
+    return df.assign(**converted) if converted else df
+
+
+def column_memory(df):
+    """Deep in-memory bytes per column."""
+    return df.memory_usage(deep=True, index=False)
+
+
+def memory_report(before, after):
+    """
+    Per-column dtypes and bytes of two versions of a frame, with a total row.
+
+    ``before`` and ``after`` are frames, or (dtypes, column_memory()) pairs
+    when the bytes were summed over chunks.
+    """
+    before_dtypes, before_bytes = (before.dtypes, column_memory(before)) if isinstance(before, pd.DataFrame) else before
+    after_dtypes, after_bytes = (after.dtypes, column_memory(after)) if isinstance(after, pd.DataFrame) else after
+
+    report = pd.DataFrame({
+        'Before_Dtype': before_dtypes.astype(str),
+        'Before_Bytes': before_bytes,
+        'After_Dtype': after_dtypes.astype(str),
+        'After_Bytes': after_bytes,
+    })
+    report.loc['Total'] = ['', before_bytes.sum(), '', after_bytes.sum()]
+    report[['Before_Bytes', 'After_Bytes']] = report[['Before_Bytes', 'After_Bytes']].astype('int64')
+    report['Saved'] = (1 - report['After_Bytes'] / report['Before_Bytes']).map('{:.0%}'.format)
+    return report
+
@@ -0,0 +1,205 @@
+import os
+
+import numpy as np
+
+from data_store import BATCH_ROWS, PROCESSED_DIR, iter_batches, load_data
+from distance import COORDINATE_COLUMNS, EARTH_RADIUS_KM, haversine_km
+
+SPATIAL_INDEX_FILE = 'spatial_index.npz'
+
+# Grid cell edge in degrees (about 5.5 km of latitude)
+CELL_SIZE = 0.05
+
+KM_PER_DEGREE = 2 * np.pi * EARTH_RADIUS_KM / 360
+
+# Indexed point sets and their coordinate columns
+POINTS = {
+    'Store': ('Store_Latitude', 'Store_Longitude'),
+    'Drop': ('Drop_Latitude', 'Drop_Longitude'),
+}
+
+
+def _grid_columns(cell_size):
+    return int(np.ceil(360 / cell_size))
+
+
+def cell_ids(lat, lon, cell_size=CELL_SIZE):
+    """Row-major id of the grid cell containing each point."""
+    n_cols = _grid_columns(cell_size)
+    row = np.floor((np.asarray(lat, dtype=np.float64) + 90) / cell_size).astype(np.int64)
+    col = np.floor((np.asarray(lon, dtype=np.float64) + 180) / cell_size).astype(np.int64)
+    return row * n_cols + np.clip(col, 0, n_cols - 1)
+
+
+class GridIndex:
+    """
+    Uniform latitude/longitude grid over one set of points.
+
+    Points are sorted by cell: ``cells`` lists the occupied cell ids in
+    order, and ``offsets[i]:offsets[i + 1]`` is the slice of the sorted
+    ``lat``/``lon``/``rows`` arrays that falls in ``cells[i]``. ``rows`` maps
+    each sorted point back to its row position in the processed store.
+    Cell ids are row-major, so the cells of one grid row that overlap a query
+    box form a single contiguous slice.
+    """
+
+    FIELDS = ['cells', 'offsets', 'rows', 'lat', 'lon']
+
+    def __init__(self, cells, offsets, rows, lat, lon, cell_size=CELL_SIZE):
+        self.cells = cells
+        self.offsets = offsets
+        self.rows = rows
+        self.lat = lat
+        self.lon = lon
+        self.cell_size = float(cell_size)
+
+    @classmethod
+    def from_points(cls, lat, lon, cell_size=CELL_SIZE):
+        lat = np.asarray(lat, dtype=np.float32)
+        lon = np.asarray(lon, dtype=np.float32)
+
+        # Points without coordinates can never match a spatial query
+        positions = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+        ids = cell_ids(lat[positions], lon[positions], cell_size)
+        order = np.argsort(ids, kind='stable')
+
+        cells, starts = np.unique(ids[order], return_index=True)
+        offsets = np.append(starts, len(order))
+        row_dtype = np.int32 if len(lat) < 2**31 else np.int64
+        rows = positions[order].astype(row_dtype)
+        return cls(cells, offsets, rows, lat[rows], lon[rows], cell_size)
+
+    @classmethod
+    def from_batches(cls, batches, cell_size=CELL_SIZE):
+        """
+        The index from_points() builds over the concatenated batches, in two passes.
+
+        ``batches`` is a callable returning an iterable of (lat, lon) arrays
+        in row order. The first pass counts the points per cell; the second
+        writes each point straight into its slot of the sorted arrays, so
+        only the finished index and one batch are held in memory.
+        """
+        cells = np.empty(0, dtype=np.int64)
+        sizes = np.empty(0, dtype=np.int64)
+        total_rows = 0
+        for lat, lon in batches():
+            lat = np.asarray(lat, dtype=np.float32)
+            lon = np.asarray(lon, dtype=np.float32)
+            finite = np.isfinite(lat) & np.isfinite(lon)
+            ids, counts = np.unique(cell_ids(lat[finite], lon[finite], cell_size), return_counts=True)
+            cells, inverse = np.unique(np.concatenate([cells, ids]), return_inverse=True)
+            sizes = np.bincount(inverse, weights=np.concatenate([sizes, counts]),
+                                minlength=len(cells)).astype(np.int64)
+            total_rows += len(lat)
+
+        offsets = np.append(0, np.cumsum(sizes))
+        row_dtype = np.int32 if total_rows < 2**31 else np.int64
+        rows = np.empty(offsets[-1], dtype=row_dtype)
+        lat_sorted = np.empty(offsets[-1], dtype=np.float32)
+        lon_sorted = np.empty(offsets[-1], dtype=np.float32)
+        filled = np.zeros(len(cells), dtype=np.int64)
+        start = 0
+        for lat, lon in batches():
+            lat = np.asarray(lat, dtype=np.float32)
+            lon = np.asarray(lon, dtype=np.float32)
+            positions = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+            ids = cell_ids(lat[positions], lon[positions], cell_size)
+            order = np.argsort(ids, kind='stable')
+            positions = positions[order]
+            cell = np.searchsorted(cells, ids[order])
+
+            # Points of a cell keep their row order, after those of earlier batches
+            firsts = np.flatnonzero(np.diff(cell, prepend=-1))
+            counts = np.diff(np.append(firsts, len(cell)))
+            rank = np.arange(len(cell)) - np.repeat(firsts, counts)
+            slots = offsets[cell] + filled[cell] + rank
+            rows[slots] = positions + start
+            lat_sorted[slots] = lat[positions]
+            lon_sorted[slots] = lon[positions]
+            filled[cell[firsts]] += counts
+            start += len(lat)
+        return cls(cells, offsets, rows, lat_sorted, lon_sorted, cell_size)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _candidates(self, min_lat, min_lon, max_lat, max_lon):
+        """Positions in the sorted arrays of every point in cells overlapping the box."""
+        n_cols = _grid_columns(self.cell_size)
+        first, last = cell_ids([min_lat, max_lat], [min_lon, max_lon], self.cell_size)
+        grid_rows = np.arange(first // n_cols, last // n_cols + 1)
+
+        lo = np.searchsorted(self.cells, grid_rows * n_cols + first % n_cols, side='left')
+        hi = np.searchsorted(self.cells, grid_rows * n_cols + last % n_cols, side='right')
+        spans = [(self.offsets[a], self.offsets[b]) for a, b in zip(lo, hi) if a < b]
+        if not spans:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(start, stop) for start, stop in spans])
+
+    def bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """Sorted row positions of the points inside the box (edges included)."""
+        candidates = self._candidates(min_lat, min_lon, max_lat, max_lon)
+        lat = self.lat[candidates]
+        lon = self.lon[candidates]
+        keep = (lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)
+        return np.sort(self.rows[candidates[keep]])
+
+    def radius(self, lat, lon, km):
+        """Sorted row positions of the points within ``km`` great-circle km of (lat, lon)."""
+        dlat = km / KM_PER_DEGREE
+        dlon = min(180.0, dlat / max(np.cos(np.radians(lat)), 1e-6))
+        candidates = self._candidates(lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+
+        n = len(candidates)
+        distance = haversine_km(np.full(n, lat), np.full(n, lon),
+                                self.lat[candidates], self.lon[candidates])
+        return np.sort(self.rows[candidates[distance <= km]])
+
+    def densest_cell_center(self):
+        """(lat, lon) of the centre of the cell holding the most points."""
+        n_cols = _grid_columns(self.cell_size)
+        grid_row, grid_col = divmod(int(self.cells[np.argmax(np.diff(self.offsets))]), n_cols)
+        return ((grid_row + 0.5) * self.cell_size - 90,
+                (grid_col + 0.5) * self.cell_size - 180)
+
+
+def build_spatial_index(df, cell_size=CELL_SIZE):
+    """Grid indexes over the store and drop locations, keyed by 'Store'/'Drop'."""
+    return {
+        kind: GridIndex.from_points(df[lat].to_numpy(), df[lon].to_numpy(), cell_size)
+        for kind, (lat, lon) in POINTS.items()
+    }
+
+
+def stream_spatial_index(batch_rows=BATCH_ROWS, processed_dir=PROCESSED_DIR, cell_size=CELL_SIZE):
+    """build_spatial_index() over the processed store, reading the coordinates one batch at a time."""
+    def batches(lat, lon):
+        return lambda: ((batch[lat].to_numpy(), batch[lon].to_numpy())
+                        for batch in iter_batches([lat, lon], batch_rows, processed_dir))
+
+    return {kind: GridIndex.from_batches(batches(lat, lon), cell_size) for kind, (lat, lon) in POINTS.items()}
+
+
+def write_spatial_index(indexes, processed_dir=PROCESSED_DIR):
+    path = os.path.join(processed_dir, SPATIAL_INDEX_FILE)
+    arrays = {}
+    for kind, index in indexes.items():
+        for field in GridIndex.FIELDS:
+            arrays[f'{kind}_{field}'] = getattr(index, field)
+        arrays[f'{kind}_cell_size'] = np.float64(index.cell_size)
+    np.savez(path, **arrays)
+    return path
+
+
+def load_spatial_index(processed_dir=PROCESSED_DIR):
+    """Read the saved spatial index, building it from the processed store if missing."""
+    path = os.path.join(processed_dir, SPATIAL_INDEX_FILE)
+    if not os.path.exists(path):
+        return build_spatial_index(load_data(columns=COORDINATE_COLUMNS, processed_dir=processed_dir))
+
+    with np.load(path) as data:
+        return {
+            kind: GridIndex(*(data[f'{kind}_{field}'] for field in GridIndex.FIELDS),
+                            cell_size=data[f'{kind}_cell_size'].item())
+            for kind in POINTS
+        }
@@ -0,0 +1,112 @@
+import os
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from data_store import PROCESSED_DIR
+from distance import EARTH_RADIUS_KM
+
+STORES_FILE = 'stores.parquet'
+
+# Store coordinates closer than this are treated as the same store
+SNAP_TOLERANCE_KM = 0.1
+
+STORE_COLUMNS = ['Store_ID', 'Store_Latitude', 'Store_Longitude']
+
+
+def to_xyz(lat, lon):
+    """Points on a sphere of Earth's radius, so chord length ~ great-circle km at short range."""
+    phi = np.radians(np.asarray(lat, dtype=np.float64))
+    lam = np.radians(np.asarray(lon, dtype=np.float64))
+    return EARTH_RADIUS_KM * np.column_stack([
+        np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi),
+    ])
+
+
+def count_store_pairs(df, counts=None):
+    """Add the orders per distinct store coordinate pair in ``df`` to ``counts``."""
+    pairs = df.groupby(['Store_Latitude', 'Store_Longitude']).size()
+    return pairs if counts is None else counts.add(pairs, fill_value=0)
+
+
+class StoreTable:
+    """
+    Store dimension derived from the order coordinates.
+
+    Each store has an int32 ``Store_ID`` and a canonical location (the most
+    frequent coordinate pair among those snapped to it). Lookups snap a
+    coordinate to the nearest store through a KD-tree, built (and scipy
+    imported) on the first lookup, so readers of ``stores`` alone skip both.
+    """
+
+    def __init__(self, stores, tolerance_km=SNAP_TOLERANCE_KM):
+        self.stores = stores.reset_index(drop=True)[STORE_COLUMNS]
+        self.tolerance_km = tolerance_km
+
+    @cached_property
+    def tree(self):
+        from scipy.spatial import cKDTree
+        return cKDTree(to_xyz(self.stores['Store_Latitude'], self.stores['Store_Longitude']))
+
+    @classmethod
+    def empty(cls, tolerance_km=SNAP_TOLERANCE_KM):
+        stores = pd.DataFrame({'Store_ID': pd.Series(dtype='int32'),
+                               'Store_Latitude': pd.Series(dtype='float64'),
+                               'Store_Longitude': pd.Series(dtype='float64')})
+        return cls(stores, tolerance_km)
+
+    def __len__(self):
+        return len(self.stores)
+
+    def lookup(self, lat, lon):
+        """Store_ID of the nearest store within tolerance of each point, -1 if none."""
+        ids = np.full(len(lat), -1, dtype=np.int32)
+        if len(self.stores):
+            distance, nearest = self.tree.query(to_xyz(lat, lon), distance_upper_bound=self.tolerance_km)
+            found = np.isfinite(distance)
+            ids[found] = self.stores['Store_ID'].to_numpy()[nearest[found]]
+        return ids
+
+    def extend(self, pair_counts):
+        """
+        Return a table with stores added for the coordinate pairs that match none.
+
+        ``pair_counts`` is a Series of order counts indexed by (lat, lon), as
+        built by count_store_pairs(). Unmatched pairs are visited from most to
+        least frequent; each opens a new store that absorbs every other
+        unmatched pair within tolerance.
+        """
+        pairs = pair_counts.sort_values(ascending=False, kind='stable')
+        lat = pairs.index.get_level_values(0).to_numpy(dtype=np.float64)
+        lon = pairs.index.get_level_values(1).to_numpy(dtype=np.float64)
+        new = np.flatnonzero(self.lookup(lat, lon) < 0)
+        if not len(new):
+            return self
+
+        from scipy.spatial import cKDTree
+        points = to_xyz(lat[new], lon[new])
+        tree = cKDTree(points)
+        assigned = np.zeros(len(new), dtype=bool)
+        next_id = int(self.stores['Store_ID'].max()) + 1 if len(self.stores) else 0
+        added = []
+        for i in range(len(new)):
+            if assigned[i]:
+                continue
+            neighbours = tree.query_ball_point(points[i], self.tolerance_km)
+            assigned[neighbours] = True
+            added.append((next_id, lat[new[i]], lon[new[i]]))
+            next_id += 1
+
+        added = pd.DataFrame(added, columns=STORE_COLUMNS).astype({'Store_ID': 'int32'})
+        return StoreTable(pd.concat([self.stores, added], ignore_index=True), self.tolerance_km)
+
+
+def write_stores(table, processed_dir=PROCESSED_DIR):
+    path = os.path.join(processed_dir, STORES_FILE)
+    table.stores.to_parquet(path, index=False)
+    return path
+
+
+def load_stores(processed_dir=PROCESSED_DIR):
+    return StoreTable(pd.read_parquet(os.path.join(processed_dir, STORES_FILE)))
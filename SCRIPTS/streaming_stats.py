@@ -0,0 +1,462 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from data_store import BATCH_ROWS, PROCESSED_DIR, iter_batches
+from instrumentation import traced
+from partitioned import iter_partition_batches, map_partitions
+
+# Every accumulator here is fed batches with ``update(values)`` and combined
+# with ``merge(other)``, so the same statistic can be computed in one pass
+# over a stream, per partition in parallel, or incrementally as data
+# arrives. Merging is exact except where noted.
+
+
+def _finite(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values[np.isfinite(values)]
+
+
+class Moments:
+    """
+    Count, mean, variance, min and max of a stream.
+
+    Each batch is reduced with NumPy and folded in with the Chan et al.
+    update of Welford's algorithm, which stays accurate for long streams
+    and makes merging two accumulators exact. Missing values are skipped.
+    With no values seen, mean, min and max are NaN, like pandas.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = np.nan
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+
+    def _combine(self, count, mean, m2, lo, hi):
+        if count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.min, self.max = count, mean, m2, lo, hi
+            return self
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.min = min(self.min, lo)
+        self.max = max(self.max, hi)
+        return self
+
+    def update(self, values):
+        values = _finite(values)
+        if len(values):
+            mean = values.mean()
+            self._combine(len(values), mean, ((values - mean) ** 2).sum(), values.min(), values.max())
+        return self
+
+    def merge(self, other):
+        return self._combine(other.count, other.mean, other.m2, other.min, other.max)
+
+    @property
+    def var(self):
+        """Sample variance (ddof=1, like pandas)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, state):
+        moments = cls()
+        moments.__dict__.update(state)
+        return moments
+
+
+class Comoments:
+    """Streaming Pearson correlation of two measures over rows where both are present."""
+
+    def __init__(self):
+        self.x = Moments()
+        self.y = Moments()
+        self.c = 0.0
+
+    def _combine(self, x, y, c):
+        if x.count == 0:
+            return self
+        n_a, n_b = self.x.count, x.count
+        if n_a:
+            dx, dy = x.mean - self.x.mean, y.mean - self.y.mean
+            c += dx * dy * n_a * n_b / (n_a + n_b)
+        self.c += c
+        self.x.merge(x)
+        self.y.merge(y)
+        return self
+
+    def update(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        both = np.isfinite(x) & np.isfinite(y)
+        x, y = x[both], y[both]
+        if len(x):
+            c = ((x - x.mean()) * (y - y.mean())).sum()
+            self._combine(Moments().update(x), Moments().update(y), c)
+        return self
+
+    def merge(self, other):
+        return self._combine(other.x, other.y, other.c)
+
+    @property
+    def corr(self):
+        return self.c / np.sqrt(self.x.m2 * self.y.m2) if self.x.count > 1 else np.nan
+
+
+class MedianSketch:
+    """
+    Streaming median and quantiles over value counts.
+
+    Counts are exact while the number of distinct values stays under
+    ``max_values`` (always the case for ratings and delivery minutes), so
+    the median matches ``Series.median()``. Past that, values are snapped to
+    a grid whose spacing doubles as needed, bounding the error by half the
+    spacing.
+    """
+
+    def __init__(self, max_values=10_000):
+        self.max_values = max_values
+        self.spacing = None
+        self.counts = Counter()
+
+    def _snap(self, values):
+        return np.round(values / self.spacing) * self.spacing
+
+    def _add(self, counts):
+        self.counts.update(counts)
+        while len(self.counts) > self.max_values:
+            keys = np.fromiter(self.counts, dtype='float64')
+            if self.spacing is None:
+                self.spacing = (keys.max() - keys.min()) / self.max_values
+            else:
+                self.spacing *= 2
+            snapped = Counter()
+            for key, count in zip(self._snap(keys), self.counts.values()):
+                snapped[key] += count
+            self.counts = snapped
+        return self
+
+    def update(self, values):
+        values = pd.Series(values, dtype='float64').dropna()
+        if self.spacing is not None:
+            values = self._snap(values)
+        return self._add(values.value_counts().to_dict())
+
+    def merge(self, other):
+        """
+        Fold in another sketch's counts.
+
+        If either side has snapped, both are snapped to the coarser grid, so
+        the error bound becomes that spacing rather than half of it.
+        """
+        counts = other.counts
+        spacings = [s for s in (self.spacing, other.spacing) if s is not None]
+        if spacings:
+            spacing = max(spacings)
+            if self.spacing != spacing:
+                self.counts = self._resnap(self.counts, spacing)
+            if other.spacing != spacing:
+                counts = self._resnap(counts, spacing)
+            self.spacing = spacing
+        return self._add(counts)
+
+    def _resnap(self, counts, spacing):
+        snapped = Counter()
+        for key, count in counts.items():
+            snapped[float(np.round(key / spacing) * spacing)] += count
+        return snapped
+
+    @property
+    def count(self):
+        return sum(self.counts.values())
+
+    def median(self):
+        total = self.count
+        if total == 0:
+            return np.nan
+        # Average the two middle values for even totals, like pandas
+        lower_rank, upper_rank = (total - 1) // 2, total // 2
+        seen = 0
+        lower = None
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if lower is None and seen > lower_rank:
+                lower = value
+            if seen > upper_rank:
+                return (lower + value) / 2
+
+    def quantile(self, q):
+        """``q`` quantile with linear interpolation between ranks, like ``Series.quantile()``."""
+        values = np.array(sorted(self.counts), dtype='float64')
+        if not len(values):
+            return np.nan
+        ends = np.cumsum([self.counts[v] for v in values])
+        position = (ends[-1] - 1) * q
+        lower = values[np.searchsorted(ends, np.floor(position), side='right')]
+        upper = values[np.searchsorted(ends, np.ceil(position), side='right')]
+        return lower + (upper - lower) * (position - np.floor(position))
+
+    def to_dict(self):
+        return {
+            'max_values': self.max_values,
+            'spacing': self.spacing,
+            'counts': [[float(value), int(count)] for value, count in sorted(self.counts.items())],
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(max_values=state['max_values'])
+        sketch.spacing = state['spacing']
+        sketch.counts = Counter({value: count for value, count in state['counts']})
+        return sketch
+
+
+class ModeCounter:
+    """Exact streaming mode; ties resolve to the smallest value like ``Series.mode()[0]``."""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def update(self, values):
+        self.counts.update(pd.Series(values).dropna().value_counts().to_dict())
+        return self
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        return self
+
+    def mode(self):
+        top = max(self.counts.values())
+        return min(value for value, count in self.counts.items() if count == top)
+
+    def to_dict(self):
+        return {'counts': [[value, int(count)] for value, count in sorted(self.counts.items())]}
+
+    @classmethod
+    def from_dict(cls, state):
+        counter = cls()
+        counter.counts = Counter({value: count for value, count in state['counts']})
+        return counter
+
+
+class Histogram:
+    """
+    Counts over fixed bin edges, plus the values falling below or above them.
+
+    Bins are half-open except the last, which includes its right edge, as in
+    ``np.histogram``. Two histograms merge exactly when their edges match.
+    Quantiles interpolate within a bin, so their error is at most the width
+    of the bin they fall in.
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.below = 0
+        self.above = 0
+
+    @classmethod
+    def uniform(cls, lo, hi, bins):
+        return cls(np.linspace(lo, hi, bins + 1))
+
+    def update(self, values):
+        values = _finite(values)
+        bins = np.searchsorted(self.edges, values, side='right') - 1
+        bins[values == self.edges[-1]] = len(self.counts) - 1
+        inside = (bins >= 0) & (bins < len(self.counts))
+        self.counts += np.bincount(bins[inside], minlength=len(self.counts))
+        self.below += int((bins < 0).sum())
+        self.above += int((bins >= len(self.counts)).sum())
+        return self
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Histograms with different bin edges cannot be merged")
+        self.counts += other.counts
+        self.below += other.below
+        self.above += other.above
+        return self
+
+    @property
+    def count(self):
+        return int(self.counts.sum()) + self.below + self.above
+
+    def quantile(self, q):
+        """``q`` quantile of the values inside the edges."""
+        ends = np.cumsum(self.counts)
+        if not len(ends) or ends[-1] == 0:
+            return np.nan
+        target = q * ends[-1]
+        i = min(int(np.searchsorted(ends, target, side='left')), len(ends) - 1)
+        start = ends[i - 1] if i else 0
+        fraction = (target - start) / self.counts[i] if self.counts[i] else 0.0
+        return self.edges[i] + fraction * (self.edges[i + 1] - self.edges[i])
+
+    def to_dict(self):
+        return {'edges': self.edges.tolist(), 'counts': self.counts.tolist(),
+                'below': self.below, 'above': self.above}
+
+    @classmethod
+    def from_dict(cls, state):
+        histogram = cls(state['edges'])
+        histogram.counts = np.asarray(state['counts'], dtype=np.int64)
+        histogram.below = state['below']
+        histogram.above = state['above']
+        return histogram
+
+
+class KLLSketch:
+    """
+    Approximate quantiles of a continuous measure in bounded memory.
+
+    A KLL-style stack of compactors: level ``h`` holds items standing for
+    ``2**h`` values each. When a level outgrows its capacity (``k`` at the
+    top, shrinking by 2/3 per level below, at least 2) it is sorted and
+    every other item, starting at a random offset, is promoted a level up.
+    The sketch keeps O(k log(n / k)) items, so memory grows only
+    logarithmically with the stream.
+
+    Error bound: each compaction at level ``h`` shifts any rank by at most
+    ``2**h``, so a returned quantile's true rank is within ``rank_error()``
+    of ``q * count``. This bound is deterministic and computed from the
+    compactions actually performed (about 4% of ``count`` for k=200). With
+    random offsets the errors mostly cancel, and the typical error is under
+    1% of ``count`` for k=200.
+    Merging sketches with the same ``k`` keeps the same guarantee.
+
+    ``quantile()`` returns a retained item and does not interpolate between
+    items, so the median of [1, 3] is 1.0 rather than 2.0.
+    """
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.compactions = [0]
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, h):
+        depth = len(self.levels) - 1 - h
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            if len(self.levels[h]) > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                    self.compactions.append(0)
+                level = np.sort(self.levels[h])
+                # An odd item out stays behind; the rest pair up
+                odd = len(level) % 2
+                promoted = level[odd + self.rng.integers(2)::2]
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                self.levels[h] = level[:odd]
+                self.compactions[h] += 1
+            h += 1
+        return self
+
+    def update(self, values):
+        values = _finite(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += len(values)
+        return self._compress()
+
+    def merge(self, other):
+        if other.k != self.k:
+            raise ValueError("Sketches with different k cannot be merged")
+        for h in range(len(other.levels)):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+                self.compactions.append(0)
+            self.levels[h] = np.concatenate([self.levels[h], other.levels[h]])
+            self.compactions[h] += other.compactions[h]
+        self.count += other.count
+        return self._compress()
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Smallest retained item whose weighted rank reaches ``q * count``; no interpolation."""
+        items, ends = self._weighted()
+        if not len(items):
+            return np.nan
+        i = min(int(np.searchsorted(ends, q * self.count, side='left')), len(items) - 1)
+        return items[i]
+
+    def rank_error(self):
+        """Worst-case absolute rank error of quantile()."""
+        compaction_error = sum(c * 2 ** h for h, c in enumerate(self.compactions))
+        return compaction_error + 2 ** (len(self.levels) - 1)
+
+    def __len__(self):
+        return sum(len(level) for level in self.levels)
+
+    def to_dict(self):
+        return {'k': self.k, 'levels': [level.tolist() for level in self.levels],
+                'compactions': self.compactions, 'count': self.count,
+                'rng': self.rng.bit_generator.state}
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(k=state['k'])
+        sketch.levels = [np.asarray(level, dtype=np.float64) for level in state['levels']]
+        sketch.compactions = list(state['compactions'])
+        sketch.count = state['count']
+        # Restoring the generator keeps a resumed sketch identical to an uninterrupted one
+        sketch.rng.bit_generator.state = state['rng']
+        return sketch
+
+
+def _feed(accumulators, batches):
+    for batch in batches:
+        for cols, accumulator in accumulators.values():
+            accumulator.update(*(batch[col].to_numpy() for col in cols))
+    return {name: accumulator for name, (_, accumulator) in accumulators.items()}
+
+
+def _stream_partition(partition, accumulators, columns, batch_rows, processed_dir):
+    return _feed(accumulators, iter_partition_batches(columns, partition, batch_rows, processed_dir))
+
+
+@traced('stream_statistics')
+def stream_statistics(accumulators, batch_rows=BATCH_ROWS, processed_dir=PROCESSED_DIR,
+                      workers=1, partition_by='month'):
+    """
+    Feed the processed store to accumulators one batch at a time.
+
+    ``accumulators`` maps a name to (columns, accumulator); each batch calls
+    ``accumulator.update(*columns)``. With ``workers`` above 1, each
+    ``partition_by`` partition is streamed into its own copy of the
+    accumulators in a worker process and the copies are merged.
+    Returns {name: accumulator}.
+    """
+    columns = list(dict.fromkeys(col for cols, _ in accumulators.values() for col in cols))
+    if workers <= 1:
+        return _feed(accumulators, iter_batches(columns, batch_rows, processed_dir))
+
+    partials = map_partitions(_stream_partition, (accumulators, columns, batch_rows, processed_dir),
+                              workers, partition_by, processed_dir)
+    merged = {name: accumulator for name, (_, accumulator) in accumulators.items()}
+    for partial in partials:
+        for name, accumulator in partial.items():
+            merged[name].merge(accumulator)
+    return merged
@@ -0,0 +1,78 @@
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from backends import BACKENDS, PandasBackend
+from filter_index import FILTER_COLUMNS
+from report_aggregates import REPORT_SPECS, compute_with_backend
+
+# Check that a query backend returns the same report aggregates as the
+# pandas backend: the full store, every single dashboard filter value and
+# one combined filter
+parser = argparse.ArgumentParser(description='Validate a query backend against the pandas backend.')
+parser.add_argument('--backend', choices=[b for b in BACKENDS if b != 'pandas'], default='duckdb',
+                    help='backend to validate (default: duckdb)')
+parser.add_argument('--rtol', type=float, default=1e-9,
+                    help='relative tolerance for floating-point statistics (default: 1e-9)')
+args = parser.parse_args()
+
+
+def filter_sets():
+    values = PandasBackend().load(FILTER_COLUMNS)
+    options = {col: sorted(values[col].dropna().unique()) for col in FILTER_COLUMNS}
+    yield {}
+    for col, col_values in options.items():
+        for value in col_values:
+            yield {col: value}
+    yield {col: col_values[0] for col, col_values in options.items() if col_values}
+
+
+def differences(expected, actual, rtol):
+    """Why ``actual`` differs from ``expected``, or None when they match."""
+    expected, actual = expected.reset_index(), actual.reset_index()
+    if list(expected.columns) != list(actual.columns):
+        return f'columns {list(actual.columns)} != {list(expected.columns)}'
+    if len(expected) != len(actual):
+        return f'{len(actual)} groups != {len(expected)}'
+
+    for col in expected.columns:
+        left, right = expected[col], actual[col]
+        if pd.api.types.is_numeric_dtype(left) and pd.api.types.is_numeric_dtype(right):
+            if not np.allclose(left.to_numpy(float), right.to_numpy(float), rtol=rtol, atol=0, equal_nan=True):
+                return f"values differ in '{col}'"
+        elif not (left.astype(str).to_numpy() == right.astype(str).to_numpy()).all():
+            return f"groups differ in '{col}'"
+    return None
+
+
+print("="*60)
+print(f"VALIDATING {args.backend.upper()} BACKEND AGAINST PANDAS")
+print("="*60)
+print()
+
+checked = failed = 0
+for filters in filter_sets():
+    expected = compute_with_backend(REPORT_SPECS, 'pandas', filters)
+    actual = compute_with_backend(REPORT_SPECS, args.backend, filters)
+    label = ', '.join(f'{col}={value}' for col, value in filters.items()) or 'all orders'
+    problems = {}
+    for spec in REPORT_SPECS:
+        problem = differences(expected[spec.name], actual[spec.name], args.rtol)
+        if problem:
+            problems[spec.name] = problem
+    checked += len(REPORT_SPECS)
+    failed += len(problems)
+
+    print(f"   {'✅' if not problems else '❌'} {label}")
+    for name, problem in problems.items():
+        print(f"      {name}: {problem}")
+
+print("\n" + "="*60)
+if failed:
+    print(f"❌ {failed} of {checked} aggregates differ")
+    print("="*60)
+    sys.exit(1)
+print(f"✅ All {checked} aggregates match")
+print("="*60)
@@ -0,0 +1,133 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+# Render off-screen in every worker
+matplotlib.use('Agg')
+
+import agent_visualizations
+import delivery_visualizations
+import geographic_time_visualizations
+from charting import ChartCache, chart_columns, chart_key
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_store import load_data
+from image_pyramid import write_pyramid
+from instrumentation import span, trace_run
+from report_aggregates import load_report_aggregates
+
+REPORTS = [delivery_visualizations, agent_visualizations, geographic_time_visualizations]
+
+# Chart aggregates shared read-only with the workers. Forked workers inherit
+# them copy-on-write; otherwise they are handed over once per worker at start-up.
+_shared_data = None
+
+
+def _init_worker(data):
+    global _shared_data
+    if data is not None:
+        _shared_data = data
+
+
+def _render_chart(task_index, report_index, chart_index):
+    report = REPORTS[report_index]
+    chart = report.CHARTS[chart_index]
+    start = time.perf_counter()
+    path = os.path.join(report.OUTPUT_DIR, chart.file_name)
+    chart.render(_shared_data[task_index], path, **chart.params)
+    write_pyramid(path)
+    return time.perf_counter() - start
+
+
+def report_columns():
+    """Union of the columns every report reads, in first-seen order."""
+    return chart_columns(chart for report in REPORTS for chart in report.CHARTS)
+
+
+def build_reports(workers=None, force=False):
+    """
+    Render every report chart whose aggregate changed, across a process pool.
+
+    Chart data is derived here from the shared aggregate bundle and
+    fingerprinted; charts whose fingerprint matches the cache keep their
+    existing PNG. Returns (path, seconds) per chart, with None for skipped
+    charts.
+    """
+    global _shared_data
+    df = load_data(columns=report_columns())
+    aggregates = load_report_aggregates()
+    cache = ChartCache()
+
+    tasks = []
+    results = {}
+    for r, report in enumerate(REPORTS):
+        os.makedirs(report.OUTPUT_DIR, exist_ok=True)
+        for c, chart in enumerate(report.CHARTS):
+            path = os.path.join(report.OUTPUT_DIR, chart.file_name)
+            with span(f'chart.aggregate[{chart.file_name}]'):
+                data = chart.aggregate(df[chart.columns], aggregates)
+                key = chart_key(chart, data)
+            results[path] = None
+            if force or not cache.is_fresh(path, key):
+                tasks.append((r, c, path, key, data))
+
+    _shared_data = [data for *_, data in tasks]
+
+    if tasks:
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context, initargs = multiprocessing.get_context('fork'), (None,)
+        else:
+            context, initargs = multiprocessing.get_context(), (_shared_data,)
+
+        with span('charts.render_pool'), ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                                             initializer=_init_worker, initargs=initargs) as pool:
+            futures = [pool.submit(_render_chart, i, r, c) for i, (r, c, *_) in enumerate(tasks)]
+            for (_, _, path, key, _), future in zip(tasks, futures):
+                results[path] = future.result()
+                cache.record(path, key)
+
+    cache.save()
+    return list(results.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render every report chart in parallel.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='worker processes (default: number of CPUs)')
+    parser.add_argument('--force', action='store_true',
+                        help='re-render every chart even if its aggregate is unchanged')
+    args = parser.parse_args()
+    trace_run(__file__)
+
+    print("="*60)
+    print(f"BUILDING REPORT CHARTS ({args.workers} workers)")
+    print("="*60)
+
+    start = time.perf_counter()
+    timings = build_reports(args.workers, args.force)
+    elapsed = time.perf_counter() - start
+
+    rendered = [(path, s) for path, s in timings if s is not None]
+
+    print("\n   Per-chart render time:")
+    for path, seconds in timings:
+        status = f"{seconds:6.2f}s" if seconds is not None else " cached"
+        print(f"   {status}  {path}")
+
+    print(f"\n   Charts rendered: {len(rendered)}")
+    print(f"   Charts unchanged (skipped): {len(timings) - len(rendered)}")
+    print(f"   Total render time: {sum(s for _, s in rendered):.2f}s")
+    print(f"   Wall time: {elapsed:.2f}s")
+
+    print("\n" + "="*60)
+    print("✅ All Report Charts Created!")
+    print("="*60)
+
+
+if __name__ == '__main__':
+    main()
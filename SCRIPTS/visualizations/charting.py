@@ -0,0 +1,112 @@
+import hashlib
+import inspect
+import json
+import os
+import sys
+from collections import namedtuple
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from image_pyramid import has_pyramid, write_pyramid
+from instrumentation import span
+
+# Render fingerprints of the PNGs currently on disk
+CACHE_FILE = 'reports/visualizations/.chart_cache.json'
+
+# A report chart: the order columns it reads, how it derives its data from
+# those columns and the shared aggregate bundle (see report_aggregates.py),
+# and how it draws that data. ``aggregate`` is called as
+# ``aggregate(df, aggregates)``; ``params`` are passed to ``render`` as
+# keyword arguments.
+Chart = namedtuple('Chart', ['file_name', 'label', 'columns', 'aggregate', 'render', 'params'])
+
+
+def save_figure(path, dpi):
+    """Save and close the current figure, as every chart's render function ends."""
+    with span('savefig'):
+        plt.savefig(path, dpi=dpi, bbox_inches='tight')
+        plt.close()
+
+
+def chart_columns(charts):
+    """Union of the columns read by ``charts``, in first-seen order."""
+    return list(dict.fromkeys(col for chart in charts for col in chart.columns))
+
+
+def _update_hash(h, obj):
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(repr((type(obj).__name__, obj.shape, str(obj.dtypes))).encode())
+        h.update(repr(list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name).encode())
+        h.update(repr(list(obj.index.names)).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(repr((obj.dtype.str, obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        for key, value in obj.items():
+            _update_hash(h, key)
+            _update_hash(h, value)
+    elif isinstance(obj, (list, tuple)):
+        h.update(f'{type(obj).__name__}:{len(obj)}'.encode())
+        for item in obj:
+            _update_hash(h, item)
+    else:
+        h.update(repr(obj).encode())
+
+
+def chart_key(chart, data):
+    """Fingerprint of a chart's aggregate, render parameters and render code."""
+    h = hashlib.sha256()
+    _update_hash(h, data)
+    _update_hash(h, chart.params)
+    h.update(inspect.getsource(chart.render).encode())
+    return h.hexdigest()
+
+
+class ChartCache:
+    """Maps chart paths to the fingerprint they were last rendered from."""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def is_fresh(self, chart_path, key):
+        return (self.entries.get(chart_path) == key and os.path.exists(chart_path)
+                and has_pyramid(chart_path))
+
+    def record(self, chart_path, key):
+        self.entries[chart_path] = key
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+
+
+def render_report(charts, df, aggregates, output_dir, cache):
+    """
+    Render a report's charts in order, skipping those whose fingerprint is unchanged.
+
+    Each rendered chart also gets its thumbnail and screen-size copies.
+    Yields (index, chart, rendered) as each chart is handled.
+    """
+    for i, chart in enumerate(charts, start=1):
+        path = os.path.join(output_dir, chart.file_name)
+        with span(f'chart[{chart.file_name}]'):
+            with span('chart.aggregate'):
+                data = chart.aggregate(df[chart.columns], aggregates)
+            key = chart_key(chart, data)
+            fresh = cache.is_fresh(path, key)
+            if not fresh:
+                with span('chart.render'):
+                    chart.render(data, path, **chart.params)
+                with span('chart.pyramid'):
+                    write_pyramid(path)
+                cache.record(path, key)
+        yield i, chart, not fresh
@@ -1,179 +1,227 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 import os
+import sys
+
+from charting import Chart, ChartCache, chart_columns, render_report, save_figure
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_store import load_data
+from instrumentation import trace_run
+from report_aggregates import load_report_aggregates
 
 # Set style
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
 
-# Create separate output folder for geographic/time charts
-os.makedirs('reports/visualizations/geographic_time_analysis', exist_ok=True)
+# Separate output folder for geographic/time charts
+OUTPUT_DIR = 'reports/visualizations/geographic_time_analysis'
+
+RENDER_PARAMS = {'dpi': 300}
 
-# Load cleaned data
-df = pd.read_csv('data/processed/cleaned_data.csv')
-df['Order_Date'] = pd.to_datetime(df['Order_Date'])
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
 
-print("Creating Geographic & Time-Based Visualizations...")
 
 # 1. Area-wise Performance Comparison
-plt.figure(figsize=(12, 6))
-area_stats = df.groupby('Area').agg({
-    'Order_ID': 'count',
-    'Delivery_Time': 'mean'
-}).sort_values('Order_ID', ascending=False)
-
-fig, ax1 = plt.subplots(figsize=(12, 6))
-ax2 = ax1.twinx()
-
-x_pos = np.arange(len(area_stats))
-bar1 = ax1.bar(x_pos - 0.2, area_stats['Order_ID'], 0.4, label='Order Count', color='skyblue', alpha=0.8)
-bar2 = ax2.bar(x_pos + 0.2, area_stats['Delivery_Time'], 0.4, label='Avg Delivery Time', color='coral', alpha=0.8)
-
-ax1.set_xlabel('Area', fontsize=12)
-ax1.set_ylabel('Order Count', fontsize=12, color='skyblue')
-ax2.set_ylabel('Average Delivery Time (min)', fontsize=12, color='coral')
-ax1.set_xticks(x_pos)
-ax1.set_xticklabels(area_stats.index)
-ax1.tick_params(axis='y', labelcolor='skyblue')
-ax2.tick_params(axis='y', labelcolor='coral')
-
-plt.title('Area-wise Orders and Delivery Performance', fontsize=16, fontweight='bold')
-fig.legend(loc='upper right', bbox_to_anchor=(0.9, 0.9))
-plt.tight_layout()
-plt.savefig('reports/visualizations/geographic_time_analysis/01_area_performance.png', dpi=300, bbox_inches='tight')
-plt.close()
-print("✅ Chart 1: Area Performance")
+def aggregate_area_performance(df, aggregates):
+    area_stats = aggregates['area'][['Orders', 'Delivery_Time_mean']]
+    area_stats.columns = ['Order_ID', 'Delivery_Time']
+    return area_stats.sort_values('Order_ID', ascending=False)
+
+
+def render_area_performance(area_stats, path, dpi):
+    fig, ax1 = plt.subplots(figsize=(12, 6))
+    ax2 = ax1.twinx()
+
+    x_pos = np.arange(len(area_stats))
+    bar1 = ax1.bar(x_pos - 0.2, area_stats['Order_ID'], 0.4, label='Order Count', color='skyblue', alpha=0.8)
+    bar2 = ax2.bar(x_pos + 0.2, area_stats['Delivery_Time'], 0.4, label='Avg Delivery Time', color='coral', alpha=0.8)
+
+    ax1.set_xlabel('Area', fontsize=12)
+    ax1.set_ylabel('Order Count', fontsize=12, color='skyblue')
+    ax2.set_ylabel('Average Delivery Time (min)', fontsize=12, color='coral')
+    ax1.set_xticks(x_pos)
+    ax1.set_xticklabels(area_stats.index)
+    ax1.tick_params(axis='y', labelcolor='skyblue')
+    ax2.tick_params(axis='y', labelcolor='coral')
+
+    plt.title('Area-wise Orders and Delivery Performance', fontsize=16, fontweight='bold')
+    fig.legend(loc='upper right', bbox_to_anchor=(0.9, 0.9))
+    plt.tight_layout()
+    save_figure(path, dpi)
+
 
 # 2. Day of Week Analysis
-plt.figure(figsize=(12, 6))
-day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-day_stats = df.groupby('Order_Day')['Order_ID'].count().reindex(day_order)
-
-colors_days = plt.cm.viridis(np.linspace(0, 1, len(day_stats)))
-bars = plt.bar(day_stats.index, day_stats.values, color=colors_days, edgecolor='black')
-plt.title('Orders by Day of Week', fontsize=16, fontweight='bold')
-plt.xlabel('Day of Week', fontsize=12)
-plt.ylabel('Number of Orders', fontsize=12)
-plt.xticks(rotation=45)
-for bar in bars:
-    height = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width()/2., height,
-             f'{int(height)}', ha='center', va='bottom', fontweight='bold')
-plt.tight_layout()
-plt.savefig('reports/visualizations/geographic_time_analysis/02_orders_by_day.png', dpi=300, bbox_inches='tight')
-plt.close()
-print("✅ Chart 2: Orders by Day")
+def render_orders_by_day(day_stats, path, dpi):
+    plt.figure(figsize=(12, 6))
+    colors_days = plt.cm.viridis(np.linspace(0, 1, len(day_stats)))
+    bars = plt.bar(day_stats.index, day_stats.values, color=colors_days, edgecolor='black')
+    plt.title('Orders by Day of Week', fontsize=16, fontweight='bold')
+    plt.xlabel('Day of Week', fontsize=12)
+    plt.ylabel('Number of Orders', fontsize=12)
+    plt.xticks(rotation=45)
+    for bar in bars:
+        height = bar.get_height()
+        plt.text(bar.get_x() + bar.get_width()/2., height,
+                 f'{int(height)}', ha='center', va='bottom', fontweight='bold')
+    plt.tight_layout()
+    save_figure(path, dpi)
+
 
 # 3. Average Delivery Time by Day
-plt.figure(figsize=(12, 6))
-day_delivery = df.groupby('Order_Day')['Delivery_Time'].mean().reindex(day_order)
-plt.plot(day_delivery.index, day_delivery.values, marker='o', linewidth=3, markersize=10, color='darkgreen')
-plt.fill_between(range(len(day_delivery)), day_delivery.values, alpha=0.3, color='lightgreen')
-plt.title('Average Delivery Time by Day of Week', fontsize=16, fontweight='bold')
-plt.xlabel('Day of Week', fontsize=12)
-plt.ylabel('Average Delivery Time (minutes)', fontsize=12)
-plt.xticks(rotation=45)
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.savefig('reports/visualizations/geographic_time_analysis/03_delivery_time_by_day.png', dpi=300, bbox_inches='tight')
-plt.close()
-print("✅ Chart 3: Delivery Time by Day")
+def render_delivery_time_by_day(day_delivery, path, dpi):
+    plt.figure(figsize=(12, 6))
+    plt.plot(day_delivery.index, day_delivery.values, marker='o', linewidth=3, markersize=10, color='darkgreen')
+    plt.fill_between(range(len(day_delivery)), day_delivery.values, alpha=0.3, color='lightgreen')
+    plt.title('Average Delivery Time by Day of Week', fontsize=16, fontweight='bold')
+    plt.xlabel('Day of Week', fontsize=12)
+    plt.ylabel('Average Delivery Time (minutes)', fontsize=12)
+    plt.xticks(rotation=45)
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    save_figure(path, dpi)
+
 
 # 4. Hourly Order Volume
-plt.figure(figsize=(14, 6))
-hourly_orders = df.groupby('Order_Hour')['Order_ID'].count().sort_index()
-colors_hour = ['red' if x >= hourly_orders.mean() else 'lightblue' for x in hourly_orders.values]
-plt.bar(hourly_orders.index, hourly_orders.values, color=colors_hour, edgecolor='black')
-plt.axhline(y=hourly_orders.mean(), color='red', linestyle='--', linewidth=2, label=f'Average: {hourly_orders.mean():.0f}')
-plt.title('Order Volume by Hour of Day', fontsize=16, fontweight='bold')
-plt.xlabel('Hour of Day', fontsize=12)
-plt.ylabel('Number of Orders', fontsize=12)
-plt.legend()
-plt.grid(True, alpha=0.3, axis='y')
-plt.tight_layout()
-plt.savefig('reports/visualizations/geographic_time_analysis/04_hourly_order_volume.png', dpi=300, bbox_inches='tight')
-plt.close()
-print("✅ Chart 4: Hourly Order Volume")
+def render_hourly_order_volume(hourly_orders, path, dpi):
+    plt.figure(figsize=(14, 6))
+    colors_hour = ['red' if x >= hourly_orders.mean() else 'lightblue' for x in hourly_orders.values]
+    plt.bar(hourly_orders.index, hourly_orders.values, color=colors_hour, edgecolor='black')
+    plt.axhline(y=hourly_orders.mean(), color='red', linestyle='--', linewidth=2, label=f'Average: {hourly_orders.mean():.0f}')
+    plt.title('Order Volume by Hour of Day', fontsize=16, fontweight='bold')
+    plt.xlabel('Hour of Day', fontsize=12)
+    plt.ylabel('Number of Orders', fontsize=12)
+    plt.legend()
+    plt.grid(True, alpha=0.3, axis='y')
+    plt.tight_layout()
+    save_figure(path, dpi)
+
 
 # 5. Top Categories by Area
-fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-areas = df['Area'].unique()
-
-for idx, area in enumerate(areas):
-    row = idx // 2
-    col = idx % 2
-    area_data = df[df['Area'] == area]
-    top_categories = area_data['Category'].value_counts().head(5)
-    
-    axes[row, col].barh(top_categories.index, top_categories.values, color='teal', alpha=0.7)
-    axes[row, col].set_title(f'Top 5 Categories in {area}', fontsize=14, fontweight='bold')
-    axes[row, col].set_xlabel('Number of Orders', fontsize=11)
-    for i, v in enumerate(top_categories.values):
-        axes[row, col].text(v + 20, i, str(v), va='center')
-
-plt.tight_layout()
-plt.savefig('reports/visualizations/geographic_time_analysis/05_categories_by_area.png', dpi=300, bbox_inches='tight')
-plt.close()
-print("✅ Chart 5: Categories by Area")
+def aggregate_categories_by_area(df, aggregates):
+    area_category = aggregates['area_category']['Orders'].rename('count')
+    return [
+        (area, area_category.xs(area, level='Area').sort_values(ascending=False, kind='stable').head(5))
+        for area in aggregates['area'].index
+    ]
+
+
+def render_categories_by_area(area_top_categories, path, dpi):
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+
+    for idx, (area, top_categories) in enumerate(area_top_categories):
+        row = idx // 2
+        col = idx % 2
+        axes[row, col].barh(top_categories.index, top_categories.values, color='teal', alpha=0.7)
+        axes[row, col].set_title(f'Top 5 Categories in {area}', fontsize=14, fontweight='bold')
+        axes[row, col].set_xlabel('Number of Orders', fontsize=11)
+        for i, v in enumerate(top_categories.values):
+            axes[row, col].text(v + 20, i, str(v), va='center')
+
+    plt.tight_layout()
+    save_figure(path, dpi)
+
 
 # 6. Distance vs Delivery Time
-df['Distance'] = np.sqrt(
-    (df['Drop_Latitude'] - df['Store_Latitude'])**2 + 
-    (df['Drop_Longitude'] - df['Store_Longitude'])**2
-) * 111
-
-plt.figure(figsize=(12, 6))
-plt.hexbin(df['Distance'], df['Delivery_Time'], gridsize=30, cmap='YlOrRd', mincnt=1)
-plt.colorbar(label='Number of Orders')
-plt.title('Distance vs Delivery Time', fontsize=16, fontweight='bold')
-plt.xlabel('Distance (km)', fontsize=12)
-plt.ylabel('Delivery Time (minutes)', fontsize=12)
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.savefig('reports/visualizations/geographic_time_analysis/06_distance_vs_time.png', dpi=300, bbox_inches='tight')
-plt.close()
-print("✅ Chart 6: Distance vs Delivery Time")
+def render_distance_vs_time(distance_delivery, path, dpi):
+    plt.figure(figsize=(12, 6))
+    plt.hexbin(distance_delivery['Distance'], distance_delivery['Delivery_Time'], gridsize=30, cmap='YlOrRd', mincnt=1)
+    plt.colorbar(label='Number of Orders')
+    plt.title('Distance vs Delivery Time', fontsize=16, fontweight='bold')
+    plt.xlabel('Distance (km)', fontsize=12)
+    plt.ylabel('Delivery Time (minutes)', fontsize=12)
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    save_figure(path, dpi)
+
 
 # 7. Vehicle Efficiency
-plt.figure(figsize=(12, 6))
-vehicle_efficiency = df.groupby('Vehicle').agg({
-    'Distance': 'mean',
-    'Delivery_Time': 'mean'
-}).reset_index()
-vehicle_efficiency['Speed_km_h'] = (vehicle_efficiency['Distance'] / vehicle_efficiency['Delivery_Time'] * 60).round(2)
-
-sns.barplot(data=vehicle_efficiency, x='Vehicle', y='Speed_km_h', palette='rocket')
-plt.title('Average Vehicle Speed (km/h)', fontsize=16, fontweight='bold')
-plt.xlabel('Vehicle Type', fontsize=12)
-plt.ylabel('Average Speed (km/h)', fontsize=12)
-for i, row in vehicle_efficiency.iterrows():
-    plt.text(i, row['Speed_km_h'] + 0.5, f"{row['Speed_km_h']:.1f}", ha='center', fontweight='bold')
-plt.tight_layout()
-plt.savefig('reports/visualizations/geographic_time_analysis/07_vehicle_efficiency.png', dpi=300, bbox_inches='tight')
-plt.close()
-print("✅ Chart 7: Vehicle Efficiency")
+def aggregate_vehicle_efficiency(df, aggregates):
+    vehicle_efficiency = aggregates['vehicle'][['Distance_mean', 'Delivery_Time_mean']]
+    vehicle_efficiency.columns = ['Distance', 'Delivery_Time']
+    vehicle_efficiency = vehicle_efficiency.reset_index()
+    vehicle_efficiency['Speed_km_h'] = (vehicle_efficiency['Distance'] / vehicle_efficiency['Delivery_Time'] * 60).round(2)
+    return vehicle_efficiency
+
+
+def render_vehicle_efficiency(vehicle_efficiency, path, dpi):
+    plt.figure(figsize=(12, 6))
+    sns.barplot(data=vehicle_efficiency, x='Vehicle', y='Speed_km_h', palette='rocket')
+    plt.title('Average Vehicle Speed (km/h)', fontsize=16, fontweight='bold')
+    plt.xlabel('Vehicle Type', fontsize=12)
+    plt.ylabel('Average Speed (km/h)', fontsize=12)
+    for i, row in vehicle_efficiency.iterrows():
+        plt.text(i, row['Speed_km_h'] + 0.5, f"{row['Speed_km_h']:.1f}", ha='center', fontweight='bold')
+    plt.tight_layout()
+    save_figure(path, dpi)
+
 
 # 8. Monthly Trend
-plt.figure(figsize=(14, 6))
-df['Month'] = df['Order_Date'].dt.month
-monthly_orders = df.groupby('Month')['Order_ID'].count()
-month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-month_labels = [month_names[i-1] for i in monthly_orders.index]
-
-plt.plot(month_labels, monthly_orders.values, marker='o', linewidth=3, markersize=12, color='purple')
-plt.fill_between(range(len(monthly_orders)), monthly_orders.values, alpha=0.3, color='lavender')
-plt.title('Monthly Order Trends', fontsize=16, fontweight='bold')
-plt.xlabel('Month', fontsize=12)
-plt.ylabel('Number of Orders', fontsize=12)
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.savefig('reports/visualizations/geographic_time_analysis/08_monthly_trends.png', dpi=300, bbox_inches='tight')
-plt.close()
-print("✅ Chart 8: Monthly Trends")
-
-print("\n" + "="*60)
-print("✅ All Geographic & Time Visualizations Created!")
-print("📁 Location: reports/visualizations/geographic_time_analysis/")
-print("="*60)
\ No newline at end of file
+def render_monthly_trends(monthly_orders, path, dpi):
+    plt.figure(figsize=(14, 6))
+    month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+    month_labels = [month_names[i-1] for i in monthly_orders.index]
+
+    plt.plot(month_labels, monthly_orders.values, marker='o', linewidth=3, markersize=12, color='purple')
+    plt.fill_between(range(len(monthly_orders)), monthly_orders.values, alpha=0.3, color='lavender')
+    plt.title('Monthly Order Trends', fontsize=16, fontweight='bold')
+    plt.xlabel('Month', fontsize=12)
+    plt.ylabel('Number of Orders', fontsize=12)
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    save_figure(path, dpi)
+
+
+# Report charts in order: each declares the order columns it reads and how
+# it derives the data it draws from them and the aggregate bundle
+CHARTS = [
+    Chart('01_area_performance.png', 'Area Performance', [],
+          aggregate_area_performance,
+          render_area_performance, RENDER_PARAMS),
+    Chart('02_orders_by_day.png', 'Orders by Day', [],
+          lambda df, agg: agg['day']['Orders'].reindex(DAY_ORDER),
+          render_orders_by_day, RENDER_PARAMS),
+    Chart('03_delivery_time_by_day.png', 'Delivery Time by Day', [],
+          lambda df, agg: agg['day']['Delivery_Time_mean'].reindex(DAY_ORDER),
+          render_delivery_time_by_day, RENDER_PARAMS),
+    Chart('04_hourly_order_volume.png', 'Hourly Order Volume', [],
+          lambda df, agg: agg['hour']['Orders'],
+          render_hourly_order_volume, RENDER_PARAMS),
+    Chart('05_categories_by_area.png', 'Categories by Area', [],
+          aggregate_categories_by_area,
+          render_categories_by_area, RENDER_PARAMS),
+    Chart('06_distance_vs_time.png', 'Distance vs Delivery Time', ['Distance', 'Delivery_Time'],
+          lambda df, agg: df[['Distance', 'Delivery_Time']],
+          render_distance_vs_time, RENDER_PARAMS),
+    Chart('07_vehicle_efficiency.png', 'Vehicle Efficiency', [],
+          aggregate_vehicle_efficiency,
+          render_vehicle_efficiency, RENDER_PARAMS),
+    Chart('08_monthly_trends.png', 'Monthly Trends', [],
+          lambda df, agg: agg['month_number']['Orders'],
+          render_monthly_trends, RENDER_PARAMS),
+]
+
+# Columns the charts above read from the processed store
+COLUMNS = chart_columns(CHARTS)
+
+
+if __name__ == '__main__':
+    trace_run(__file__)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    # Load cleaned data
+    df = load_data(columns=COLUMNS)
+    aggregates = load_report_aggregates()
+
+    print("Creating Geographic & Time-Based Visualizations...")
+
+    cache = ChartCache()
+    for i, chart, rendered in render_report(CHARTS, df, aggregates, OUTPUT_DIR, cache):
+        print(f"✅ Chart {i}: {chart.label}" + ("" if rendered else " (unchanged, skipped)"))
+    cache.save()
+
+    print("\n" + "="*60)
+    print("✅ All Geographic & Time Visualizations Created!")
+    print(f"📁 Location: {OUTPUT_DIR}/")
+    print("="*60)
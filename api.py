@@ -0,0 +1,322 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'SCRIPTS'))
+from cube import DIMENSIONS, MEASURES, build_cube, load_cube, rollup, slice_cube
+from data_store import data_version, load_snapshot
+from filter_index import FILTER_COLUMNS, FilterIndex
+from instrumentation import TRACER
+from spatial_index import POINTS, load_spatial_index
+
+# Same processed data as app.py
+PROCESSED_DIR = 'DATA/processed'
+
+# Sidebar filters as query parameters: ?area=Urban&vehicle=van ('All' or absent = no filter)
+FILTER_PARAMS = {col.lower(): col for col in FILTER_COLUMNS}
+SPATIAL_PARAMS = ['location', 'lat', 'lon', 'radius_km']
+
+# /breakdowns/<name> -> cube dimension
+BREAKDOWNS = {'area': 'Area', 'vehicle': 'Vehicle', 'weather': 'Weather', 'traffic': 'Traffic',
+              'hour': 'Order_Hour', 'category': 'Category'}
+
+# Rendered responses kept per server process
+CACHE_ENTRIES = 512
+
+
+class BadRequest(Exception):
+    pass
+
+
+class Dataset:
+    """The orders, filter index, cube and spatial index of one data version."""
+
+    def __init__(self, version, processed_dir=PROCESSED_DIR):
+        self.version = version
+        # The cube columns are enough to re-aggregate a spatially filtered subset
+        self.df = load_snapshot(columns=DIMENSIONS + MEASURES, processed_dir=processed_dir)
+        self.index = FilterIndex(self.df)
+        # Query values are matched without surrounding spaces ('Urban' selects 'Urban ')
+        self.choices = {col: {value.strip(): value for value in self.index.values(col)}
+                        for col in FILTER_COLUMNS}
+        self.cube = load_cube(processed_dir=processed_dir)
+        self.spatial = load_spatial_index(processed_dir=processed_dir)
+
+
+class ResponseCache:
+    """Least-recently-used cache of JSON response bodies, keyed by data version, path and filters."""
+
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, body):
+        with self.lock:
+            self.entries[key] = body
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
+
+
+_dataset = None
+_dataset_lock = threading.Lock()
+_cache = ResponseCache()
+
+
+def current_dataset():
+    """The loaded dataset, reloaded when the store on disk has changed."""
+    global _dataset
+    version = data_version(PROCESSED_DIR)
+    with _dataset_lock:
+        if _dataset is None or _dataset.version != version:
+            _dataset = Dataset(version)
+        return _dataset
+
+
+def parse_filters(query, dataset):
+    """
+    Validate the query parameters into (selections, spatial).
+
+    ``selections`` maps filter column -> value like the sidebar selectboxes;
+    ``spatial`` is (location, lat, lon, radius_km) or None.
+    """
+    params = {name: values[-1] for name, values in parse_qs(query).items()}
+    unknown = set(params) - set(FILTER_PARAMS) - set(SPATIAL_PARAMS)
+    if unknown:
+        raise BadRequest(f"Unknown parameter(s): {', '.join(sorted(unknown))}")
+
+    selections = {}
+    for name, col in FILTER_PARAMS.items():
+        value = params.get(name, 'All').strip()
+        choices = dataset.choices[col]
+        if value != 'All' and value not in choices:
+            raise BadRequest(f"Unknown {name} {value!r}; expected one of {['All'] + list(choices)}")
+        selections[col] = choices.get(value, value)
+
+    spatial = None
+    given = [name for name in SPATIAL_PARAMS[1:] if name in params]
+    if given:
+        if len(given) < 3:
+            raise BadRequest("A spatial filter needs lat, lon and radius_km")
+        location = params.get('location', 'Store')
+        if location not in POINTS:
+            raise BadRequest(f"Unknown location {location!r}; expected one of {list(POINTS)}")
+        try:
+            lat, lon, radius_km = (float(params[name]) for name in SPATIAL_PARAMS[1:])
+        except ValueError:
+            raise BadRequest("lat, lon and radius_km must be numbers")
+        if not all(math.isfinite(v) for v in (lat, lon, radius_km)):
+            raise BadRequest("lat, lon and radius_km must be finite")
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180 and radius_km > 0):
+            raise BadRequest("lat, lon or radius_km out of range")
+        spatial = (location, lat, lon, radius_km)
+    return selections, spatial
+
+
+def filtered_view(dataset, selections, spatial):
+    """Matching order positions (None = all) and the cube of the matching orders, as app.py computes them."""
+    positions = dataset.index.positions(selections)
+    if spatial is None:
+        return positions, slice_cube(dataset.cube, selections)
+
+    location, lat, lon, radius_km = spatial
+    rows = dataset.spatial[location].radius(lat, lon, radius_km)
+    positions = rows if positions is None else np.intersect1d(positions, rows, assume_unique=True)
+    return positions, build_cube(dataset.df.take(positions))
+
+
+def _number(value, digits=2):
+    """A JSON-safe rounded float, None for NaN."""
+    value = float(value)
+    return None if math.isnan(value) else round(value, digits)
+
+
+def _label(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def kpis(dataset, selections, spatial):
+    """The dashboard's KPI cards and tab metrics for one filter selection."""
+    positions, cube = filtered_view(dataset, selections, spatial)
+    totals = rollup(cube)
+    delivery = dataset.df['Delivery_Time'].to_numpy()
+    if positions is not None:
+        delivery = delivery[positions]
+    orders = int(totals['Orders'])
+    area_counts = rollup(cube, 'Area')['Orders']
+    category_counts = rollup(cube, 'Category')['Orders']
+    hourly_orders = rollup(cube, 'Order_Hour')['Orders']
+    return {
+        'total_orders': orders,
+        'avg_delivery_min': _number(totals['Delivery_Time_mean']),
+        'avg_rating': _number(totals['Agent_Rating_mean']),
+        'areas': len(area_counts),
+        'categories': len(category_counts),
+        'fastest_delivery_min': _number(totals['Delivery_Time_min']) if orders else None,
+        'slowest_delivery_min': _number(totals['Delivery_Time_max']) if orders else None,
+        'median_delivery_min': _number(np.median(delivery)) if orders else None,
+        'peak_hour': _label(hourly_orders.idxmax()) if orders else None,
+        'busiest_area': _label(area_counts.idxmax()) if orders else None,
+        'top_category': _label(category_counts.idxmax()) if orders else None,
+    }
+
+
+def breakdown(dataset, selections, spatial, dimension):
+    """Orders, delivery time and rating per value of one cube dimension."""
+    _, cube = filtered_view(dataset, selections, spatial)
+    stats = rollup(cube, dimension)
+    return [
+        {dimension: _label(value),
+         'orders': int(row['Orders']),
+         'avg_delivery_min': _number(row['Delivery_Time_mean']),
+         'min_delivery_min': _number(row['Delivery_Time_min']),
+         'max_delivery_min': _number(row['Delivery_Time_max']),
+         'avg_rating': _number(row['Agent_Rating_mean'])}
+        for value, row in stats.iterrows()
+    ]
+
+
+def render(path, query, if_none_match=None):
+    """
+    (status, extra headers, JSON body) for a GET request.
+
+    Bodies are cached per data version, path and filters; the ETag is built
+    from the same key, so a client holding a current ETag gets a 304
+    without the aggregates being looked up or recomputed.
+    """
+    dataset = current_dataset()
+    if path == '/':
+        body = {'data_version': dataset.version, 'orders': len(dataset.df),
+                'endpoints': ['/kpis'] + [f'/breakdowns/{name}' for name in BREAKDOWNS],
+                'filters': {name: ['All'] + list(dataset.choices[col]) for name, col in FILTER_PARAMS.items()},
+                'spatial_filter': SPATIAL_PARAMS, 'cache': _cache.stats()}
+        return 200, {}, json.dumps(body).encode()
+
+    name = path[len('/breakdowns/'):] if path.startswith('/breakdowns/') else None
+    if path != '/kpis' and name not in BREAKDOWNS:
+        return 404, {}, json.dumps({'error': f"Not found: {path}"}).encode()
+
+    selections, spatial = parse_filters(query, dataset)
+    key = (dataset.version, path, tuple(selections.items()), spatial)
+    etag = '"{}-{}"'.format(dataset.version, hashlib.sha1(repr(key).encode()).hexdigest()[:16])
+    if if_none_match == etag:
+        return 304, {'etag': etag}, b''
+
+    body = _cache.get(key)
+    cache_status = 'hit' if body is not None else 'miss'
+    if body is None:
+        result = {'data_version': dataset.version,
+                  'filters': {'selections': selections,
+                              'spatial': dict(zip(SPATIAL_PARAMS, spatial)) if spatial else None}}
+        if path == '/kpis':
+            result['kpis'] = kpis(dataset, selections, spatial)
+        else:
+            result['dimension'] = BREAKDOWNS[name]
+            result['rows'] = breakdown(dataset, selections, spatial, BREAKDOWNS[name])
+        body = json.dumps(result).encode()
+        _cache.put(key, body)
+    return 200, {'etag': etag, 'x-cache': cache_status}, body
+
+
+def server_timing(records):
+    """Server-Timing header value: total milliseconds per top-level span."""
+    totals = {}
+    for name, _, duration, parents, _ in records:
+        if not parents:
+            name = re.sub(r'[^\w.-]', '_', name)
+            totals[name] = totals.get(name, 0) + duration / 1e6
+    return ', '.join(f'{name};dur={ms:.2f}' for name, ms in totals.items())
+
+
+def render_traced(path, query, if_none_match=None):
+    """render(), adding a Server-Timing header with its spans when tracing is enabled."""
+    if not TRACER.enabled:
+        return render(path, query, if_none_match)
+    # Spans are recorded per thread and a worker thread serves one request at
+    # a time, so this clears only what the previous request on it left behind
+    TRACER.reset()
+    status, headers, body = render(path, query, if_none_match)
+    timing = server_timing(TRACER.records())
+    if timing:
+        headers['server-timing'] = timing
+    return status, headers, body
+
+
+async def app(scope, receive, send):
+    """
+    ASGI entry point: run with ``uvicorn api:app`` from the repository root.
+
+    GET /kpis and /breakdowns/<area|vehicle|weather|traffic|hour|category>
+    take the sidebar filters as query parameters; GET / describes them.
+    """
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Load the data before the first request rather than during it
+                await asyncio.to_thread(current_dataset)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] != 'http':
+        return
+
+    headers = {'content-type': 'application/json', 'cache-control': 'no-cache'}
+    if scope['method'] not in ('GET', 'HEAD'):
+        status, body = 405, json.dumps({'error': 'Only GET is supported'}).encode()
+        headers['allow'] = 'GET, HEAD'
+    else:
+        try:
+            # Aggregation is CPU-bound pandas work; keep it off the event loop
+            if_none_match = dict(scope['headers']).get(b'if-none-match')
+            status, extra, body = await asyncio.to_thread(
+                render_traced, scope['path'], scope.get('query_string', b'').decode(),
+                if_none_match.decode() if if_none_match else None)
+            headers.update(extra)
+        except BadRequest as e:
+            status, body = 400, json.dumps({'error': str(e)}).encode()
+
+    headers['content-length'] = str(len(body))
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(k.encode(), v.encode()) for k, v in headers.items()]})
+    await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the dashboard KPIs and aggregates as JSON.')
+    parser.add_argument('--host', default='127.0.0.1', help='interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='port to listen on (default: 8000)')
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,24 @@
+import time
+# Taken before the other imports, so the first rerun's render time includes them
+RERUN_START = time.perf_counter()
+
+import json
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
-from PIL import Image
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'SCRIPTS'))
+from agents import agent_summary, load_agents
+from cube import build_cube, load_cube, rollup, slice_cube
+from data_store import data_version, load_snapshot
+from figure_cache import FigureCache
+from filter_index import FilterIndex
+from image_pyramid import PRINT_LEVEL, level_path
+from instrumentation import TRACER, span
+from spatial_index import load_spatial_index
+from stores import load_stores
 
 # Page configuration
 st.set_page_config(
@@ -87,6 +101,12 @@ st.markdown("""
         color: white;
     }
     
+    /* Section picker used by lazy tabs */
+    .stRadio [role="radiogroup"] label {
+        color: white !important;
+        font-weight: 600;
+    }
+    
     /* Selectbox styling */
     .stSelectbox > label {
         color: white !important;
@@ -118,45 +138,617 @@ st.markdown("""
 st.markdown("---")
 
 # Load data
+DASHBOARD_COLUMNS = ['Area', 'Vehicle', 'Weather', 'Traffic', 'Order_Hour', 'Category',
+                     'Store_ID', 'Agent_ID', 'Delivery_Time', 'Agent_Rating', 'Agent_Age']
+PROCESSED_DIR = 'DATA/processed'
+
+# Gallery previews come from the report build's downscaled copies
+PREVIEW_LEVELS = {'thumb': 'Thumbnail', 'screen': 'Screen'}
+
+# Interactive charts: Vega-Lite styled like the matplotlib ones, white on transparent
+CHART_COLOR = '#10b981'
+CHART_HEIGHT = 360
+VEGA_CONFIG = {
+    'background': 'transparent',
+    'view': {'stroke': None},
+    'axis': {'labelColor': 'white', 'titleColor': 'white', 'titleFontSize': 12, 'titleFontWeight': 'bold',
+             'domainColor': 'white', 'tickColor': 'white', 'gridColor': 'white', 'gridOpacity': 0.2},
+    'legend': {'labelColor': 'white', 'titleColor': 'white'},
+    'text': {'color': 'white', 'fontWeight': 'bold'},
+}
+
+# Charts shown and bytes sent to the browser for them in this rerun
+chart_payload = {'charts': 0, 'bytes': 0}
+
+# The loaders take the data version so they reload when the store changes on disk.
+# Orders come from the memory-mapped snapshot when build_snapshot.py has taken one;
+# the frame is a cached resource, so sessions share its (read-only) mapped columns
+# instead of each unpickling a copy. Only the current version is kept, so a refresh
+# releases the previous frame (and its mapping) rather than adding to it.
+@st.cache_resource(max_entries=1)
+def load_data(version):
+    return load_snapshot(columns=DASHBOARD_COLUMNS, processed_dir=PROCESSED_DIR)
+
+@st.cache_resource(max_entries=1)
+def load_filter_index(version):
+    return FilterIndex(load_data(version))
+
+@st.cache_data(max_entries=1)
+def load_delivery_cube(version):
+    return load_cube(processed_dir=PROCESSED_DIR)
+
+@st.cache_resource(max_entries=1)
+def load_spatial(version):
+    return load_spatial_index(processed_dir=PROCESSED_DIR)
+
+@st.cache_data(max_entries=1)
+def load_store_table(version):
+    return load_stores(processed_dir=PROCESSED_DIR).stores.set_index('Store_ID')
+
+@st.cache_data(max_entries=1)
+def load_agent_table(version):
+    return agent_summary(load_agents(processed_dir=PROCESSED_DIR)).set_index('Agent_ID')
+
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+@st.cache_resource
+def startup_timings():
+    # Per server process: filled in by the first rerun that completes
+    return {}
+
+
+def style_axes(ax):
+    """Apply the dashboard's white-on-transparent axis styling."""
+    ax.tick_params(colors='white')
+    ax.spines['bottom'].set_color('white')
+    ax.spines['left'].set_color('white')
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+
+
+def show_chart(chart_id, aggregate, figure, spec):
+    """
+    Display a chart as a cached PNG or, in interactive mode, as Vega-Lite.
+
+    ``aggregate`` computes the chart's (small) data; ``figure`` draws it with
+    matplotlib and ``spec`` turns it into a Vega-Lite spec with the data
+    inline, so the browser only ever receives the aggregate. PNGs come from
+    the shared figure cache, keyed by the chart id, the current filter
+    selections and the data version, so the aggregate and figure are only
+    computed the first time a given view is requested.
+    """
+    with span(f'figure[{chart_id}]'):
+        if interactive_charts:
+            chart = {**spec(aggregate()), 'config': VEGA_CONFIG}
+            chart.setdefault('height', CHART_HEIGHT)
+            chart_payload['bytes'] += len(json.dumps(chart))
+            with span('st.vega_lite_chart'):
+                st.vega_lite_chart(chart, use_container_width=True, theme=None)
+        else:
+            image = figure_cache.get_or_render((chart_id, filter_key, version), lambda: figure(aggregate()))
+            chart_payload['bytes'] += len(image)
+            with span('st.image'):
+                st.image(image, use_container_width=True)
+        chart_payload['charts'] += 1
+
+
+def histogram(values, bins):
+    """Bin counts, bin edges and mean of ``values``, binned on the server with NumPy."""
+    counts, edges = np.histogram(values.dropna().to_numpy(), bins=bins)
+    return counts, edges, values.mean()
+
+
+# Dashboard charts: each takes its aggregate and returns a matplotlib figure
+def vehicle_delivery_chart(vehicle_avg):
+    fig, ax = plt.subplots(figsize=(10, 6), facecolor='none')
+    ax.set_facecolor('none')
+    bars = ax.barh(vehicle_avg.index, vehicle_avg.values, color='#10b981', edgecolor='white', linewidth=2)
+    ax.set_xlabel('Average Delivery Time (min)', fontsize=12, color='white', fontweight='bold')
+    ax.set_ylabel('Vehicle Type', fontsize=12, color='white', fontweight='bold')
+    style_axes(ax)
+
+    for bar in bars:
+        width = bar.get_width()
+        ax.text(width + 1, bar.get_y() + bar.get_height()/2,
+               f'{width:.1f}', ha='left', va='center',
+               color='white', fontweight='bold')
+
+    plt.tight_layout()
+    return fig
+
+
+def weather_impact_chart(weather_avg):
+    fig, ax = plt.subplots(figsize=(10, 6), facecolor='none')
+    ax.set_facecolor('none')
+    bars = ax.bar(weather_avg.index, weather_avg.values, color='#10b981', edgecolor='white', linewidth=2)
+    ax.set_xlabel('Weather Condition', fontsize=12, color='white', fontweight='bold')
+    ax.set_ylabel('Average Delivery Time (min)', fontsize=12, color='white', fontweight='bold')
+    style_axes(ax)
+    plt.xticks(rotation=45, ha='right')
+
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2, height + 1,
+               f'{height:.1f}', ha='center', va='bottom',
+               color='white', fontweight='bold')
+
+    plt.tight_layout()
+    return fig
+
+
+def histogram_chart(hist, xlabel, mean_label, figsize=(10, 6)):
+    counts, edges, mean = hist
+    fig, ax = plt.subplots(figsize=figsize, facecolor='none')
+    ax.set_facecolor('none')
+    ax.hist(edges[:-1], bins=edges, weights=counts, color='#10b981', alpha=0.8, edgecolor='white', linewidth=1.5)
+    ax.set_xlabel(xlabel, fontsize=12, color='white', fontweight='bold')
+    ax.set_ylabel('Frequency', fontsize=12, color='white', fontweight='bold')
+    style_axes(ax)
+
+    ax.axvline(mean, color='#ef4444', linestyle='--', linewidth=2,
+              label=mean_label.format(mean))
+    ax.legend(facecolor='none', edgecolor='white', labelcolor='white', fontsize=11)
+
+    plt.tight_layout()
+    return fig
+
+
+def line_chart(series, xlabel, ylabel, fill=False):
+    fig, ax = plt.subplots(figsize=(14, 6), facecolor='none')
+    ax.set_facecolor('none')
+    ax.plot(series.index, series.values,
+            marker='o', linewidth=3, markersize=10, color='#10b981',
+            markeredgecolor='white', markeredgewidth=2)
+    if fill:
+        ax.fill_between(series.index, series.values, alpha=0.3, color='#10b981')
+    ax.set_xlabel(xlabel, fontsize=12, color='white', fontweight='bold')
+    ax.set_ylabel(ylabel, fontsize=12, color='white', fontweight='bold')
+    ax.grid(True, alpha=0.2, color='white')
+    style_axes(ax)
+
+    plt.tight_layout()
+    return fig
+
+
+def area_pie_chart(area_counts):
+    fig, ax = plt.subplots(figsize=(10, 10), facecolor='none')
+    ax.set_facecolor('none')
+    colors = ['#10b981', '#059669', '#047857', '#065f46']
+    wedges, texts, autotexts = ax.pie(area_counts.values, labels=area_counts.index,
+           autopct='%1.1f%%', startangle=90, colors=colors,
+           textprops={'color': 'white', 'fontweight': 'bold', 'fontsize': 12},
+           wedgeprops={'edgecolor': 'white', 'linewidth': 2})
+
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+
+    plt.tight_layout()
+    return fig
+
+
+def top_categories_chart(top_categories):
+    fig, ax = plt.subplots(figsize=(10, 10), facecolor='none')
+    ax.set_facecolor('none')
+    bars = ax.barh(top_categories.index, top_categories.values, color='#10b981',
+                  edgecolor='white', linewidth=2)
+    ax.set_xlabel('Number of Orders', fontsize=12, color='white', fontweight='bold')
+    ax.set_ylabel('Category', fontsize=12, color='white', fontweight='bold')
+    style_axes(ax)
+
+    for bar in bars:
+        width = bar.get_width()
+        ax.text(width + 20, bar.get_y() + bar.get_height()/2,
+               f'{int(width)}', ha='left', va='center',
+               color='white', fontweight='bold')
+
+    plt.tight_layout()
+    return fig
+
+
+# Interactive counterparts: each takes the same aggregate and returns a Vega-Lite spec
+def series_values(series):
+    """A Series as inline Vega-Lite records, the only data an interactive chart ships."""
+    return [{'key': key, 'value': value} for key, value in zip(series.index.tolist(), series.to_numpy().tolist())]
+
+
+def bar_spec(series, x_title, y_title, horizontal=False, label_format='.1f'):
+    keys = series.index.tolist()
+    # Horizontal bars run bottom-up in data order, as with barh
+    category = {'field': 'key', 'type': 'nominal', 'sort': keys[::-1] if horizontal else keys}
+    value = {'field': 'value', 'type': 'quantitative'}
+    if horizontal:
+        encoding = {'y': {**category, 'title': y_title}, 'x': {**value, 'title': x_title}}
+        label = {'align': 'left', 'dx': 4}
+    else:
+        encoding = {'x': {**category, 'title': x_title, 'axis': {'labelAngle': -45}},
+                    'y': {**value, 'title': y_title}}
+        label = {'baseline': 'bottom', 'dy': -4}
+    return {
+        'data': {'values': series_values(series)},
+        'encoding': encoding,
+        'layer': [
+            {'mark': {'type': 'bar', 'color': CHART_COLOR, 'stroke': 'white', 'strokeWidth': 2}},
+            {'mark': {'type': 'text', **label}, 'encoding': {'text': {'field': 'value', 'format': label_format}}},
+        ],
+    }
+
+
+def histogram_spec(hist, x_title, mean_label):
+    counts, edges, mean = hist
+    bins = [{'start': start, 'end': end, 'count': count}
+            for start, end, count in zip(edges[:-1].tolist(), edges[1:].tolist(), counts.tolist())]
+    return {
+        'layer': [
+            {'data': {'values': bins},
+             'mark': {'type': 'bar', 'color': CHART_COLOR, 'opacity': 0.8, 'stroke': 'white', 'strokeWidth': 1.5},
+             'encoding': {'x': {'field': 'start', 'type': 'quantitative', 'bin': {'binned': True}, 'title': x_title},
+                          'x2': {'field': 'end'},
+                          'y': {'field': 'count', 'type': 'quantitative', 'title': 'Frequency'},
+                          'tooltip': [{'field': 'start', 'format': '.1f'}, {'field': 'end', 'format': '.1f'},
+                                      {'field': 'count'}]}},
+            {'data': {'values': [{'mean': float(mean), 'label': mean_label.format(mean)}]},
+             'encoding': {'x': {'field': 'mean', 'type': 'quantitative'}},
+             'layer': [
+                 {'mark': {'type': 'rule', 'color': '#ef4444', 'strokeDash': [6, 4], 'strokeWidth': 2}},
+                 {'mark': {'type': 'text', 'color': '#ef4444', 'align': 'left', 'baseline': 'top', 'dx': 4, 'y': 4},
+                  'encoding': {'text': {'field': 'label'}}},
+             ]},
+        ],
+    }
+
+
+def line_spec(series, x_title, y_title, fill=False):
+    x = {'field': 'key', 'type': 'quantitative', 'title': x_title, 'scale': {'zero': False}}
+    y = {'field': 'value', 'type': 'quantitative', 'title': y_title, 'scale': {'zero': fill}}
+    layers = [{'mark': {'type': 'line', 'color': CHART_COLOR, 'strokeWidth': 3,
+                        'point': {'filled': True, 'size': 100, 'color': CHART_COLOR,
+                                  'stroke': 'white', 'strokeWidth': 2}}}]
+    if fill:
+        layers.insert(0, {'mark': {'type': 'area', 'color': CHART_COLOR, 'opacity': 0.3}})
+    return {
+        'data': {'values': series_values(series)},
+        'encoding': {'x': x, 'y': y, 'tooltip': [{'field': 'key', 'title': x_title},
+                                                 {'field': 'value', 'title': y_title, 'format': ',.1f'}]},
+        'layer': layers,
+    }
+
+
+def pie_spec(series):
+    return {
+        'data': {'values': series_values(series)},
+        'transform': [{'joinaggregate': [{'op': 'sum', 'field': 'value', 'as': 'total'}]},
+                      {'calculate': 'datum.value / datum.total', 'as': 'share'}],
+        'encoding': {
+            'theta': {'field': 'value', 'type': 'quantitative', 'stack': True},
+            'color': {'field': 'key', 'type': 'nominal', 'sort': series.index.tolist(), 'title': None,
+                      'scale': {'range': ['#10b981', '#059669', '#047857', '#065f46']}},
+            'tooltip': [{'field': 'key', 'title': 'Area'}, {'field': 'value', 'title': 'Orders', 'format': ','},
+                        {'field': 'share', 'title': 'Share', 'format': '.1%'}],
+        },
+        'layer': [
+            {'mark': {'type': 'arc', 'outerRadius': 150, 'stroke': 'white', 'strokeWidth': 2}},
+            {'mark': {'type': 'text', 'radius': 100}, 'encoding': {'text': {'field': 'share', 'format': '.1%'}}},
+        ],
+    }
+
+
+# Dashboard tabs: each computes the aggregates and charts it shows when called
+
+# Tab 1: Delivery Performance
+def delivery_tab(filtered_df, filtered_cube, totals):
+    st.markdown("## Delivery Performance Analysis")
+    st.markdown("")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("#### 🚗 Delivery Time by Vehicle")
+        show_chart('vehicle_delivery',
+                   lambda: rollup(filtered_cube, 'Vehicle')['Delivery_Time_mean'].sort_values(),
+                   vehicle_delivery_chart,
+                   lambda s: bar_spec(s, 'Average Delivery Time (min)', 'Vehicle Type', horizontal=True))
+
+    with col2:
+        st.markdown("#### 🌤️ Weather Impact on Delivery")
+        show_chart('weather_impact',
+                   lambda: rollup(filtered_cube, 'Weather')['Delivery_Time_mean'].sort_values(ascending=False),
+                   weather_impact_chart,
+                   lambda s: bar_spec(s, 'Weather Condition', 'Average Delivery Time (min)'))
+
+    st.markdown("")
+    st.markdown("#### 📊 Delivery Time Distribution")
+    show_chart('delivery_distribution', lambda: histogram(filtered_df['Delivery_Time'], 30),
+               lambda h: histogram_chart(h, 'Delivery Time (minutes)', 'Mean: {:.1f} min', figsize=(14, 6)),
+               lambda h: histogram_spec(h, 'Delivery Time (minutes)', 'Mean: {:.1f} min'))
+
+    # Additional metrics
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        fastest = totals['Delivery_Time_min']
+        st.metric("⚡ Fastest Delivery", f"{fastest:.0f} min")
+    with col2:
+        slowest = totals['Delivery_Time_max']
+        st.metric("🐌 Slowest Delivery", f"{slowest:.0f} min")
+    with col3:
+        median = filtered_df['Delivery_Time'].median()
+        st.metric("📊 Median Time", f"{median:.0f} min")
+
+
+# Tab 2: Agent Analytics
+def agent_tab(filtered_df, agents):
+    st.markdown("## Agent Performance Analysis")
+    st.markdown("")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("#### ⭐ Agent Rating Distribution")
+        show_chart('rating_distribution', lambda: histogram(filtered_df['Agent_Rating'], 20),
+                   lambda h: histogram_chart(h, 'Agent Rating', 'Mean: {:.2f}'),
+                   lambda h: histogram_spec(h, 'Agent Rating', 'Mean: {:.2f}'))
+
+    with col2:
+        st.markdown("#### 👤 Agent Age Distribution")
+        show_chart('age_distribution', lambda: histogram(filtered_df['Agent_Age'], 20),
+                   lambda h: histogram_chart(h, 'Agent Age (years)', 'Mean: {:.1f}'),
+                   lambda h: histogram_spec(h, 'Agent Age (years)', 'Mean: {:.1f}'))
+
+    st.markdown("")
+    st.markdown("#### 📈 Rating vs Delivery Performance")
+    show_chart('rating_vs_delivery', lambda: filtered_df.groupby('Agent_Rating')['Delivery_Time'].mean(),
+               lambda s: line_chart(s, 'Agent Rating', 'Average Delivery Time (min)'),
+               lambda s: line_spec(s, 'Agent Rating', 'Average Delivery Time (min)'))
+
+    # Agent performance metrics, counted over agents rather than orders
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        high_rated = (agents['Agent_Rating'] >= 4.5).sum()
+        st.metric("🌟 High Rated Agents", f"{high_rated:,}")
+    with col2:
+        avg_age = agents['Agent_Age'].mean()
+        st.metric("👤 Average Age", f"{avg_age:.1f} years")
+    with col3:
+        low_rated = (agents['Agent_Rating'] < 4.0).sum()
+        st.metric("⚠️ Low Rated Agents", f"{low_rated:,}")
+
+    st.markdown("")
+    st.markdown("#### 🏅 Agent Leaderboard")
+    st.caption(f"{len(agents):,} agents have orders matching the current filters. "
+               "Fastest agents with 5+ orders, from their all-time statistics:")
+    leaderboard = agents[agents['Orders'] >= 5].nsmallest(10, 'Avg_Delivery')
+    st.dataframe(
+        leaderboard[['Agent_Age', 'Agent_Rating', 'Store_ID', 'Orders', 'Avg_Delivery', 'Last_Order_Date']]
+        .round({'Avg_Delivery': 2}), use_container_width=True, hide_index=True)
+
+
+# Tab 3: Geographic Analysis
+def geographic_tab(filtered_df, filtered_cube, area_counts, category_counts, store_table):
+    st.markdown("## Geographic & Time Analysis")
+    st.markdown("")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("#### 📍 Orders by Area")
+        show_chart('area_pie', lambda: area_counts, area_pie_chart, pie_spec)
+
+    with col2:
+        st.markdown("#### 📦 Top 10 Categories")
+        show_chart('top_categories', lambda: category_counts.head(10), top_categories_chart,
+                   lambda s: bar_spec(s, 'Number of Orders', 'Category', horizontal=True, label_format='d'))
+
+    st.markdown("")
+    st.markdown("#### ⏰ Hourly Order Pattern")
+
+    hourly_orders = rollup(filtered_cube, 'Order_Hour')['Orders']
+    show_chart('hourly_orders', lambda: hourly_orders,
+               lambda s: line_chart(s, 'Hour of Day', 'Number of Orders', fill=True),
+               lambda s: line_spec(s, 'Hour of Day', 'Number of Orders', fill=True))
+
+    # Geographic metrics
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        busiest_area = area_counts.idxmax()
+        st.metric("🏆 Busiest Area", busiest_area)
+    with col2:
+        peak_hour = hourly_orders.idxmax()
+        st.metric("⏰ Peak Hour", f"{peak_hour}:00")
+    with col3:
+        top_category = category_counts.idxmax()
+        st.metric("📦 Top Category", top_category)
+
+    st.markdown("")
+    st.markdown("#### 🏬 Store Drilldown")
+
+    # Per-store aggregates are a group-by on the integer store key
+    store_stats = filtered_df.groupby('Store_ID').agg(
+        Orders=('Delivery_Time', 'size'),
+        Avg_Delivery=('Delivery_Time', 'mean'),
+        Avg_Rating=('Agent_Rating', 'mean'),
+    ).sort_values('Orders', ascending=False)
+    store_stats = store_table.join(store_stats, how='inner')[
+        ['Orders', 'Avg_Delivery', 'Avg_Rating', 'Store_Latitude', 'Store_Longitude']
+    ].sort_values('Orders', ascending=False)
+
+    st.caption(f"{len(store_stats):,} stores match the current filters")
+    st.dataframe(store_stats.head(10).round(2), use_container_width=True)
+
+    store_id = st.selectbox("Store", store_stats.index,
+                            format_func=lambda i: f"Store {i} ({store_stats.at[i, 'Orders']:,} orders)")
+    if store_id is not None:
+        store = store_stats.loc[store_id]
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("📦 Store Orders", f"{int(store['Orders']):,}")
+        with col2:
+            st.metric("⏱️ Store Avg Delivery", f"{store['Avg_Delivery']:.1f} min")
+        with col3:
+            st.metric("⭐ Store Avg Rating", f"{store['Avg_Rating']:.2f}")
+
+        store_orders = filtered_df[filtered_df['Store_ID'].to_numpy() == store_id]
+        show_chart(f'store_hourly:{store_id}', lambda: store_orders.groupby('Order_Hour').size(),
+                   lambda s: line_chart(s, 'Hour of Day', 'Number of Orders', fill=True),
+                   lambda s: line_spec(s, 'Hour of Day', 'Number of Orders', fill=True))
+
+
+# Tab 4: All Visualizations
 @st.cache_data
-def load_data():
-    df = pd.read_csv('DATA/processed/cleaned_data.csv')
-    df['Order_Date'] = pd.to_datetime(df['Order_Date'])
-    return df
+def list_report_images(directory, modified):
+    """Chart PNGs in a report directory; ``modified`` is the directory's mtime."""
+    return sorted(f for f in os.listdir(directory) if f.endswith('.png'))
+
+@st.cache_data(max_entries=128)
+def read_image(path, modified):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def report_image(chart_path, level):
+    """Encoded image bytes of a report chart at one pyramid level."""
+    path = level_path(chart_path, level)
+    if not os.path.exists(path):
+        # Built before the report pyramid existed: only the original is available
+        path = chart_path
+    return read_image(path, os.stat(path).st_mtime_ns)
+
+
+def show_gallery(directory, missing_message):
+    if not os.path.exists(directory):
+        st.warning(missing_message)
+        return
+
+    files = list_report_images(directory, os.stat(directory).st_mtime_ns)
+    preview = st.radio("Preview size", list(PREVIEW_LEVELS), format_func=PREVIEW_LEVELS.get,
+                       horizontal=True, key=f"preview:{directory}")
+
+    for i in range(0, len(files), 2):
+        cols = st.columns(2)
+        for j, col in enumerate(cols):
+            if i + j < len(files):
+                img_file = files[i + j]
+                chart_path = os.path.join(directory, img_file)
+                with col:
+                    full = st.checkbox("🔍 Full resolution", key=f"full:{chart_path}")
+                    st.image(report_image(chart_path, PRINT_LEVEL if full else preview),
+                             use_container_width=True)
+                    st.caption(img_file.replace('_', ' ').replace('.png', '').title())
+
+
+def gallery_tab():
+    st.markdown("## 📊 Pre-Generated Visualizations")
+    st.markdown("View all detailed analysis charts created during the analytics phase")
+    st.markdown("")
+
+    # Create three columns for categories
+    viz_tab1, viz_tab2, viz_tab3 = st.tabs([
+        "📦 Delivery Performance",
+        "👥 Agent Performance", 
+        "🗺️ Geographic Analysis"
+    ])
+
+    with viz_tab1:
+        show_gallery('reports/visualizations/delivery_performance',
+                     "⚠️ Delivery performance visualizations not found!")
+
+    with viz_tab2:
+        show_gallery('reports/visualizations/agent_performance',
+                     "⚠️ Agent performance visualizations not found!")
+
+    with viz_tab3:
+        show_gallery('reports/visualizations/geographic_time_analysis',
+                     "⚠️ Geographic visualizations not found!")
+
+
+def run_tab(name, render_tab):
+    """Render one tab's content and report how long it took to compute."""
+    start = time.perf_counter()
+    with span(f'tab[{name}]'):
+        render_tab()
+    st.caption(f"⏱️ Computed in {(time.perf_counter() - start) * 1000:.0f} ms")
+
 
 try:
-    df = load_data()
+    # Spans are recorded per rerun (see the debug sidebar below)
+    TRACER.reset()
+    with span('load'):
+        version = data_version(PROCESSED_DIR)
+        df = load_data(version)
+        filter_index = load_filter_index(version)
+        cube = load_delivery_cube(version)
+        spatial = load_spatial(version)
+        store_table = load_store_table(version)
+        agent_table = load_agent_table(version)
+        figure_cache = get_figure_cache()
     
     # Sidebar filters
     st.sidebar.markdown("### 🔍 Filters")
     st.sidebar.markdown("")
     
     # Area filter
-    areas = ['All'] + sorted(list(df['Area'].unique()))
+    areas = ['All'] + filter_index.values('Area')
     selected_area = st.sidebar.selectbox("📍 Select Area", areas)
     
     # Vehicle filter
-    vehicles = ['All'] + sorted(list(df['Vehicle'].unique()))
+    vehicles = ['All'] + filter_index.values('Vehicle')
     selected_vehicle = st.sidebar.selectbox("🚗 Select Vehicle", vehicles)
     
     # Weather filter
-    weather_conditions = ['All'] + sorted(list(df['Weather'].unique()))
+    weather_conditions = ['All'] + filter_index.values('Weather')
     selected_weather = st.sidebar.selectbox("🌤️ Select Weather", weather_conditions)
     
     # Traffic filter
-    traffic_conditions = ['All'] + sorted(list(df['Traffic'].unique()))
+    traffic_conditions = ['All'] + filter_index.values('Traffic')
     selected_traffic = st.sidebar.selectbox("🚦 Select Traffic", traffic_conditions)
     
-    # Apply filters
-    filtered_df = df.copy()
-    if selected_area != 'All':
-        filtered_df = filtered_df[filtered_df['Area'] == selected_area]
-    if selected_vehicle != 'All':
-        filtered_df = filtered_df[filtered_df['Vehicle'] == selected_vehicle]
-    if selected_weather != 'All':
-        filtered_df = filtered_df[filtered_df['Weather'] == selected_weather]
-    if selected_traffic != 'All':
-        filtered_df = filtered_df[filtered_df['Traffic'] == selected_traffic]
+    selections = {
+        'Area': selected_area,
+        'Vehicle': selected_vehicle,
+        'Weather': selected_weather,
+        'Traffic': selected_traffic,
+    }
+    
+    # Spatial filter: orders within a radius of a point, answered by the grid index
+    spatial_rows = None
+    spatial_key = None
+    with st.sidebar.expander("🗺️ Spatial Filter"):
+        spatial_on = st.checkbox("Only orders near a location")
+        spatial_kind = st.radio("Match", list(spatial), horizontal=True,
+                                format_func=lambda kind: f"{kind} location")
+        default_lat, default_lon = spatial[spatial_kind].densest_cell_center()
+        center_lat = st.number_input("Latitude", -90.0, 90.0, round(default_lat, 4), format="%.4f")
+        center_lon = st.number_input("Longitude", -180.0, 180.0, round(default_lon, 4), format="%.4f")
+        radius_km = st.slider("Radius (km)", 1, 100, 10)
+        if spatial_on:
+            start = time.perf_counter()
+            spatial_rows = spatial[spatial_kind].radius(center_lat, center_lon, radius_km)
+            st.caption(f"{len(spatial_rows):,} orders found in "
+                       f"{(time.perf_counter() - start) * 1000:.1f} ms")
+            spatial_key = (spatial_kind, center_lat, center_lon, radius_km)
+    filter_key = tuple(selections.items()) + (spatial_key,)
+    
+    st.sidebar.markdown("")
+    lazy_tabs = st.sidebar.toggle("⚡ Lazy tabs", value=True,
+                                  help="Only compute the tab being viewed")
+    interactive_charts = st.sidebar.toggle("📈 Interactive charts", value=False,
+                                           help="Draw charts in the browser from pre-aggregated data "
+                                                "instead of sending server-rendered images")
+    
+    # Apply filters by intersecting the precomputed bitmaps; group-by
+    # aggregates come from rolling up the matching cube cells instead. The
+    # cube has no location dimension, so a spatial filter re-aggregates the
+    # (small) set of matching rows.
+    with span('filter'):
+        positions = filter_index.positions(selections)
+        if spatial_rows is not None:
+            positions = spatial_rows if positions is None else np.intersect1d(positions, spatial_rows, assume_unique=True)
+        filtered_df = df if positions is None else df.take(positions)
+        filtered_cube = slice_cube(cube, selections) if spatial_rows is None else build_cube(filtered_df)
+        totals = rollup(filtered_cube)
+        area_counts = rollup(filtered_cube, 'Area')['Orders'].sort_values(ascending=False)
+        category_counts = rollup(filtered_cube, 'Category')['Orders'].sort_values(ascending=False)
     
     # KPI Metrics Row
     st.markdown("### 📈 Key Performance Indicators")
@@ -167,12 +759,12 @@ try:
     with col1:
         st.metric(
             label="📦 Total Orders",
-            value=f"{len(filtered_df):,}",
+            value=f"{int(totals['Orders']):,}",
             delta=None
         )
     
     with col2:
-        avg_delivery = filtered_df['Delivery_Time'].mean()
+        avg_delivery = totals['Delivery_Time_mean']
         st.metric(
             label="⏱️ Avg Delivery",
             value=f"{avg_delivery:.1f} min",
@@ -180,7 +772,7 @@ try:
         )
     
     with col3:
-        avg_rating = filtered_df['Agent_Rating'].mean()
+        avg_rating = totals['Agent_Rating_mean']
         st.metric(
             label="⭐ Avg Rating",
             value=f"{avg_rating:.2f}",
@@ -188,7 +780,7 @@ try:
         )
     
     with col4:
-        total_areas = filtered_df['Area'].nunique()
+        total_areas = len(area_counts)
         st.metric(
             label="🗺️ Areas",
             value=total_areas,
@@ -196,7 +788,7 @@ try:
         )
     
     with col5:
-        total_categories = filtered_df['Category'].nunique()
+        total_categories = len(category_counts)
         st.metric(
             label="📋 Categories",
             value=total_categories,
@@ -205,347 +797,55 @@ try:
     
     st.markdown("---")
     
-    # Set green color palette for charts
+    # Set green color palette for charts (through matplotlib, so seaborn is never imported)
     green_palette = ['#10b981', '#059669', '#047857', '#065f46', '#064e3b']
-    sns.set_palette(green_palette)
-    
-    # Main content tabs
-    tab1, tab2, tab3, tab4 = st.tabs([
-        "📦 Delivery Performance", 
-        "👥 Agent Analytics", 
-        "🗺️ Geographic Analysis", 
-        "📊 All Visualizations"
-    ])
+    plt.rc('axes', prop_cycle=plt.cycler(color=green_palette))
+    
+    def agents_in_view():
+        # Agent KPIs scan the agent table; filters only decide which agents are in view
+        if positions is None:
+            return agent_table
+        return agent_table[agent_table.index.isin(filtered_df['Agent_ID'].unique())]
+    
+    # Main content tabs. In lazy mode only the selected tab's aggregates and
+    # charts are computed; otherwise every tab runs on each rerun.
+    tabs = {
+        "📦 Delivery Performance": lambda: delivery_tab(filtered_df, filtered_cube, totals),
+        "👥 Agent Analytics": lambda: agent_tab(filtered_df, agents_in_view()),
+        "🗺️ Geographic Analysis": lambda: geographic_tab(filtered_df, filtered_cube, area_counts,
+                                                         category_counts, store_table),
+        "📊 All Visualizations": gallery_tab,
+    }
     
-    # Tab 1: Delivery Performance
-    with tab1:
-        st.markdown("## Delivery Performance Analysis")
-        st.markdown("")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("#### 🚗 Delivery Time by Vehicle")
-            vehicle_avg = filtered_df.groupby('Vehicle')['Delivery_Time'].mean().sort_values()
-            
-            fig, ax = plt.subplots(figsize=(10, 6), facecolor='none')
-            ax.set_facecolor('none')
-            bars = ax.barh(vehicle_avg.index, vehicle_avg.values, color='#10b981', edgecolor='white', linewidth=2)
-            ax.set_xlabel('Average Delivery Time (min)', fontsize=12, color='white', fontweight='bold')
-            ax.set_ylabel('Vehicle Type', fontsize=12, color='white', fontweight='bold')
-            ax.tick_params(colors='white')
-            ax.spines['bottom'].set_color('white')
-            ax.spines['left'].set_color('white')
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            
-            for bar in bars:
-                width = bar.get_width()
-                ax.text(width + 1, bar.get_y() + bar.get_height()/2, 
-                       f'{width:.1f}', ha='left', va='center', 
-                       color='white', fontweight='bold')
-            
-            plt.tight_layout()
-            st.pyplot(fig)
-            plt.close()
-        
-        with col2:
-            st.markdown("#### 🌤️ Weather Impact on Delivery")
-            weather_avg = filtered_df.groupby('Weather')['Delivery_Time'].mean().sort_values(ascending=False)
-            
-            fig, ax = plt.subplots(figsize=(10, 6), facecolor='none')
-            ax.set_facecolor('none')
-            bars = ax.bar(weather_avg.index, weather_avg.values, color='#10b981', edgecolor='white', linewidth=2)
-            ax.set_xlabel('Weather Condition', fontsize=12, color='white', fontweight='bold')
-            ax.set_ylabel('Average Delivery Time (min)', fontsize=12, color='white', fontweight='bold')
-            ax.tick_params(colors='white')
-            ax.spines['bottom'].set_color('white')
-            ax.spines['left'].set_color('white')
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            plt.xticks(rotation=45, ha='right')
-            
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2, height + 1,
-                       f'{height:.1f}', ha='center', va='bottom',
-                       color='white', fontweight='bold')
-            
-            plt.tight_layout()
-            st.pyplot(fig)
-            plt.close()
-        
-        st.markdown("")
-        st.markdown("#### 📊 Delivery Time Distribution")
-        
-        fig, ax = plt.subplots(figsize=(14, 6), facecolor='none')
-        ax.set_facecolor('none')
-        ax.hist(filtered_df['Delivery_Time'], bins=30, color='#10b981', alpha=0.8, edgecolor='white', linewidth=1.5)
-        ax.set_xlabel('Delivery Time (minutes)', fontsize=12, color='white', fontweight='bold')
-        ax.set_ylabel('Frequency', fontsize=12, color='white', fontweight='bold')
-        ax.tick_params(colors='white')
-        ax.spines['bottom'].set_color('white')
-        ax.spines['left'].set_color('white')
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        
-        mean_val = filtered_df['Delivery_Time'].mean()
-        ax.axvline(mean_val, color='#ef4444', linestyle='--', linewidth=2,
-                  label=f'Mean: {mean_val:.1f} min')
-        ax.legend(facecolor='none', edgecolor='white', labelcolor='white', fontsize=11)
-        
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-        
-        # Additional metrics
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            fastest = filtered_df['Delivery_Time'].min()
-            st.metric("⚡ Fastest Delivery", f"{fastest} min")
-        with col2:
-            slowest = filtered_df['Delivery_Time'].max()
-            st.metric("🐌 Slowest Delivery", f"{slowest} min")
-        with col3:
-            median = filtered_df['Delivery_Time'].median()
-            st.metric("📊 Median Time", f"{median:.0f} min")
-    
-    # Tab 2: Agent Analytics
-    with tab2:
-        st.markdown("## Agent Performance Analysis")
-        st.markdown("")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("#### ⭐ Agent Rating Distribution")
-            fig, ax = plt.subplots(figsize=(10, 6), facecolor='none')
-            ax.set_facecolor('none')
-            ax.hist(filtered_df['Agent_Rating'], bins=20, color='#10b981', alpha=0.8, edgecolor='white', linewidth=1.5)
-            ax.set_xlabel('Agent Rating', fontsize=12, color='white', fontweight='bold')
-            ax.set_ylabel('Frequency', fontsize=12, color='white', fontweight='bold')
-            ax.tick_params(colors='white')
-            ax.spines['bottom'].set_color('white')
-            ax.spines['left'].set_color('white')
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            
-            mean_rating = filtered_df['Agent_Rating'].mean()
-            ax.axvline(mean_rating, color='#ef4444', linestyle='--', linewidth=2,
-                      label=f'Mean: {mean_rating:.2f}')
-            ax.legend(facecolor='none', edgecolor='white', labelcolor='white', fontsize=11)
-            
-            plt.tight_layout()
-            st.pyplot(fig)
-            plt.close()
-        
-        with col2:
-            st.markdown("#### 👤 Agent Age Distribution")
-            fig, ax = plt.subplots(figsize=(10, 6), facecolor='none')
-            ax.set_facecolor('none')
-            ax.hist(filtered_df['Agent_Age'], bins=20, color='#10b981', alpha=0.8, edgecolor='white', linewidth=1.5)
-            ax.set_xlabel('Agent Age (years)', fontsize=12, color='white', fontweight='bold')
-            ax.set_ylabel('Frequency', fontsize=12, color='white', fontweight='bold')
-            ax.tick_params(colors='white')
-            ax.spines['bottom'].set_color('white')
-            ax.spines['left'].set_color('white')
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            
-            mean_age = filtered_df['Agent_Age'].mean()
-            ax.axvline(mean_age, color='#ef4444', linestyle='--', linewidth=2,
-                      label=f'Mean: {mean_age:.1f}')
-            ax.legend(facecolor='none', edgecolor='white', labelcolor='white', fontsize=11)
-            
-            plt.tight_layout()
-            st.pyplot(fig)
-            plt.close()
-        
-        st.markdown("")
-        st.markdown("#### 📈 Rating vs Delivery Performance")
-        
-        rating_delivery = filtered_df.groupby('Agent_Rating')['Delivery_Time'].mean().reset_index()
-        fig, ax = plt.subplots(figsize=(14, 6), facecolor='none')
-        ax.set_facecolor('none')
-        ax.plot(rating_delivery['Agent_Rating'], rating_delivery['Delivery_Time'], 
-                marker='o', linewidth=3, markersize=10, color='#10b981', 
-                markeredgecolor='white', markeredgewidth=2)
-        ax.set_xlabel('Agent Rating', fontsize=12, color='white', fontweight='bold')
-        ax.set_ylabel('Average Delivery Time (min)', fontsize=12, color='white', fontweight='bold')
-        ax.tick_params(colors='white')
-        ax.grid(True, alpha=0.2, color='white')
-        ax.spines['bottom'].set_color('white')
-        ax.spines['left'].set_color('white')
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-        
-        # Agent performance metrics
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            high_rated = len(filtered_df[filtered_df['Agent_Rating'] >= 4.5])
-            st.metric("🌟 High Rated Agents", f"{high_rated:,}")
-        with col2:
-            avg_age = filtered_df['Agent_Age'].mean()
-            st.metric("👤 Average Age", f"{avg_age:.1f} years")
-        with col3:
-            low_rated = len(filtered_df[filtered_df['Agent_Rating'] < 4.0])
-            st.metric("⚠️ Low Rated Agents", f"{low_rated:,}")
-    
-    # Tab 3: Geographic Analysis
-    with tab3:
-        st.markdown("## Geographic & Time Analysis")
-        st.markdown("")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("#### 📍 Orders by Area")
-            area_counts = filtered_df['Area'].value_counts()
-            
-            fig, ax = plt.subplots(figsize=(10, 10), facecolor='none')
-            ax.set_facecolor('none')
-            colors = ['#10b981', '#059669', '#047857', '#065f46']
-            wedges, texts, autotexts = ax.pie(area_counts.values, labels=area_counts.index, 
-                   autopct='%1.1f%%', startangle=90, colors=colors,
-                   textprops={'color': 'white', 'fontweight': 'bold', 'fontsize': 12},
-                   wedgeprops={'edgecolor': 'white', 'linewidth': 2})
-            
-            for autotext in autotexts:
-                autotext.set_color('white')
-                autotext.set_fontweight('bold')
-            
-            plt.tight_layout()
-            st.pyplot(fig)
-            plt.close()
-        
-        with col2:
-            st.markdown("#### 📦 Top 10 Categories")
-            category_counts = filtered_df['Category'].value_counts().head(10)
-            
-            fig, ax = plt.subplots(figsize=(10, 10), facecolor='none')
-            ax.set_facecolor('none')
-            bars = ax.barh(category_counts.index, category_counts.values, color='#10b981', 
-                          edgecolor='white', linewidth=2)
-            ax.set_xlabel('Number of Orders', fontsize=12, color='white', fontweight='bold')
-            ax.set_ylabel('Category', fontsize=12, color='white', fontweight='bold')
-            ax.tick_params(colors='white')
-            ax.spines['bottom'].set_color('white')
-            ax.spines['left'].set_color('white')
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            
-            for bar in bars:
-                width = bar.get_width()
-                ax.text(width + 20, bar.get_y() + bar.get_height()/2, 
-                       f'{int(width)}', ha='left', va='center',
-                       color='white', fontweight='bold')
-            
-            plt.tight_layout()
-            st.pyplot(fig)
-            plt.close()
-        
-        st.markdown("")
-        st.markdown("#### ⏰ Hourly Order Pattern")
-        
-        hourly_orders = filtered_df.groupby('Order_Hour')['Order_ID'].count()
-        fig, ax = plt.subplots(figsize=(14, 6), facecolor='none')
-        ax.set_facecolor('none')
-        ax.plot(hourly_orders.index, hourly_orders.values, marker='o', 
-                linewidth=3, markersize=10, color='#10b981',
-                markeredgecolor='white', markeredgewidth=2)
-        ax.fill_between(hourly_orders.index, hourly_orders.values, alpha=0.3, color='#10b981')
-        ax.set_xlabel('Hour of Day', fontsize=12, color='white', fontweight='bold')
-        ax.set_ylabel('Number of Orders', fontsize=12, color='white', fontweight='bold')
-        ax.tick_params(colors='white')
-        ax.grid(True, alpha=0.2, color='white')
-        ax.spines['bottom'].set_color('white')
-        ax.spines['left'].set_color('white')
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-        
-        # Geographic metrics
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            busiest_area = area_counts.idxmax()
-            st.metric("🏆 Busiest Area", busiest_area)
-        with col2:
-            peak_hour = hourly_orders.idxmax()
-            st.metric("⏰ Peak Hour", f"{peak_hour}:00")
-        with col3:
-            top_category = filtered_df['Category'].value_counts().idxmax()
-            st.metric("📦 Top Category", top_category)
-    
-    # Tab 4: All Visualizations
-    with tab4:
-        st.markdown("## 📊 Pre-Generated Visualizations")
-        st.markdown("View all detailed analysis charts created during the analytics phase")
-        st.markdown("")
-        
-        # Create three columns for categories
-        viz_tab1, viz_tab2, viz_tab3 = st.tabs([
-            "📦 Delivery Performance",
-            "👥 Agent Performance", 
-            "🗺️ Geographic Analysis"
-        ])
-        
-        with viz_tab1:
-            delivery_path = 'reports/visualizations/delivery_performance'
-            if os.path.exists(delivery_path):
-                delivery_files = sorted([f for f in os.listdir(delivery_path) if f.endswith('.png')])
-                
-                for i in range(0, len(delivery_files), 2):
-                    cols = st.columns(2)
-                    for j, col in enumerate(cols):
-                        if i + j < len(delivery_files):
-                            img_file = delivery_files[i + j]
-                            with col:
-                                img = Image.open(os.path.join(delivery_path, img_file))
-                                st.image(img, use_container_width=True)
-                                st.caption(img_file.replace('_', ' ').replace('.png', '').title())
-            else:
-                st.warning("⚠️ Delivery performance visualizations not found!")
-        
-        with viz_tab2:
-            agent_path = 'reports/visualizations/agent_performance'
-            if os.path.exists(agent_path):
-                agent_files = sorted([f for f in os.listdir(agent_path) if f.endswith('.png')])
-                
-                for i in range(0, len(agent_files), 2):
-                    cols = st.columns(2)
-                    for j, col in enumerate(cols):
-                        if i + j < len(agent_files):
-                            img_file = agent_files[i + j]
-                            with col:
-                                img = Image.open(os.path.join(agent_path, img_file))
-                                st.image(img, use_container_width=True)
-                                st.caption(img_file.replace('_', ' ').replace('.png', '').title())
-            else:
-                st.warning("⚠️ Agent performance visualizations not found!")
-        
-        with viz_tab3:
-            geo_path = 'reports/visualizations/geographic_time_analysis'
-            if os.path.exists(geo_path):
-                geo_files = sorted([f for f in os.listdir(geo_path) if f.endswith('.png')])
-                
-                for i in range(0, len(geo_files), 2):
-                    cols = st.columns(2)
-                    for j, col in enumerate(cols):
-                        if i + j < len(geo_files):
-                            img_file = geo_files[i + j]
-                            with col:
-                                img = Image.open(os.path.join(geo_path, img_file))
-                                st.image(img, use_container_width=True)
-                                st.caption(img_file.replace('_', ' ').replace('.png', '').title())
-            else:
-                st.warning("⚠️ Geographic visualizations not found!")
+    if lazy_tabs:
+        selected_tab = st.radio("Section", list(tabs), horizontal=True, label_visibility="collapsed")
+        run_tab(selected_tab, tabs[selected_tab])
+    else:
+        for tab, (name, render_tab) in zip(st.tabs(list(tabs)), tabs.items()):
+            with tab:
+                run_tab(name, render_tab)
+    
+    # Time to first render of this server process: imports, cold loads and the first tab
+    startup = startup_timings()
+    if 'first_render_ms' not in startup:
+        startup['first_render_ms'] = (time.perf_counter() - RERUN_START) * 1000
+        print(f"⏱️ First render in {startup['first_render_ms']:.0f} ms")
+    
+    # Chart cache statistics for this server process
+    with st.sidebar.expander("🛠️ Chart Cache"):
+        cache_stats = figure_cache.stats()
+        st.caption(f"Hits: {cache_stats['hits']:,} · Misses: {cache_stats['misses']:,}")
+        st.caption(f"Cached charts: {cache_stats['entries']:,} ({cache_stats['bytes'] / 1024**2:.1f} MB)")
+        st.caption(f"Data version: {version}")
+        st.caption(f"First render: {startup['first_render_ms']:.0f} ms")
+        st.caption(f"This rerun: {chart_payload['charts']:,} "
+                   f"{'interactive' if interactive_charts else 'image'} charts, "
+                   f"{chart_payload['bytes'] / 1024:.1f} KB sent")
+    
+    # Where this rerun spent its time; only shown when SUPPLY_CHAIN_TRACE is set
+    if TRACER.enabled:
+        with st.sidebar.expander("🐞 Rerun Timings"):
+            st.dataframe(TRACER.table(), hide_index=True)
     
     # Footer in sidebar
     st.sidebar.markdown("---")
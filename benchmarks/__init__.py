@@ -0,0 +1,2 @@
+# Performance benchmarks: a synthetic order generator and per-stage timings.
+# Run from the repository root, e.g. `python -m benchmarks.run --rows 10000 1000000`.
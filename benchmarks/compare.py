@@ -0,0 +1,51 @@
+import argparse
+import json
+import sys
+
+
+def load_timings(path):
+    """{(rows, stage): seconds} and the commit of one result file."""
+    with open(path) as f:
+        result = json.load(f)
+    timings = {(run['rows'], stage): seconds
+               for run in result['runs'] for stage, seconds in run['seconds'].items()}
+    return timings, result.get('commit')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare two benchmark result files.')
+    parser.add_argument('baseline', help='result JSON of the reference commit')
+    parser.add_argument('candidate', help='result JSON of the commit under test')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='slowdown that counts as a regression (default: 0.10 = 10%%)')
+    args = parser.parse_args()
+
+    baseline, baseline_commit = load_timings(args.baseline)
+    candidate, candidate_commit = load_timings(args.candidate)
+
+    print("="*60)
+    print(f"BENCHMARK COMPARISON ({(baseline_commit or '?')[:10]} -> {(candidate_commit or '?')[:10]})")
+    print("="*60)
+    print(f"\n   {'rows':>10}  {'stage':<28} {'before':>9} {'after':>9} {'change':>8}")
+
+    regressions = 0
+    for key in sorted(baseline.keys() & candidate.keys()):
+        rows, stage = key
+        before, after = baseline[key], candidate[key]
+        change = after / before - 1 if before else 0.0
+        regressed = change > args.threshold
+        regressions += regressed
+        print(f"   {rows:>10,}  {stage:<28} {before:8.3f}s {after:8.3f}s {change:+7.1%}"
+              f"{'  ⚠️' if regressed else ''}")
+
+    print("\n" + "="*60)
+    if regressions:
+        print(f"❌ {regressions} stage(s) slower by more than {args.threshold:.0%}")
+        print("="*60)
+        sys.exit(1)
+    print("✅ No regressions")
+    print("="*60)
+
+
+if __name__ == '__main__':
+    main()
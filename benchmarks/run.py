@@ -0,0 +1,213 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(REPO_DIR, 'SCRIPTS')
+sys.path.append(SCRIPTS_DIR)
+from backends import BACKENDS
+from cube import load_cube, rollup, slice_cube
+from data_store import load_data, load_snapshot
+from filter_index import FilterIndex
+from report_aggregates import AGGREGATES_DIR, REPORT_SPECS, compute_with_backend
+
+from benchmarks.synthetic import write_orders
+
+RESULTS_DIR = os.path.join(REPO_DIR, 'benchmarks', 'results')
+
+# Relative to the benchmark workspace, as the scripts expect when run from the repo root
+RAW_FILE = os.path.join('data', 'amazon_delivery.csv')
+PROCESSED_DIR = os.path.join('data', 'processed')
+
+# Columns the dashboard keeps in memory (DASHBOARD_COLUMNS in app.py)
+DASHBOARD_COLUMNS = ['Area', 'Vehicle', 'Weather', 'Traffic', 'Order_Hour', 'Category',
+                     'Store_ID', 'Agent_ID', 'Delivery_Time', 'Agent_Rating', 'Agent_Age']
+
+ANALYTICS_SCRIPTS = ['delivery_analytics.py', 'agent_analytics.py', 'geographic_time_analytics.py']
+
+# Optional stages; cleaning and the cube/agent/snapshot builds always run, as the others read their output
+STAGES = ['load', 'aggregates', 'analytics', 'dashboard', 'charts']
+
+
+def run_script(script, workspace, *args):
+    """Wall-clock seconds to run one repository script from ``workspace``."""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, os.path.join(SCRIPTS_DIR, script), *args], cwd=workspace,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    if completed.returncode:
+        sys.exit(f"❌ {script} failed in {workspace}:\n{completed.stderr}")
+    return elapsed
+
+
+def best_of(repeat, func):
+    """Fastest of ``repeat`` timed calls to ``func``, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def dashboard_selections(index):
+    """Sidebar selections replayed against the dashboard: none, each single value, and one of each."""
+    selections = [{}]
+    for col in index.bitmaps:
+        selections.extend({col: value} for value in index.values(col))
+    selections.append({col: index.values(col)[0] for col in index.bitmaps})
+    return selections
+
+
+def dashboard_rerun(df, index, cube, selections):
+    """The filter-and-aggregate work app.py does on every rerun with a sidebar selection."""
+    positions = index.positions(selections)
+    filtered_df = df if positions is None else df.take(positions)
+    filtered_cube = slice_cube(cube, selections)
+    rollup(filtered_cube)
+    rollup(filtered_cube, 'Area')['Orders'].sort_values(ascending=False)
+    rollup(filtered_cube, 'Category')['Orders'].sort_values(ascending=False)
+    filtered_df['Delivery_Time'].median()
+    filtered_df.groupby('Agent_Rating')['Delivery_Time'].mean()
+
+
+def time_dashboard(processed_dir, repeat):
+    df = load_data(columns=DASHBOARD_COLUMNS, processed_dir=processed_dir)
+    cube = load_cube(processed_dir=processed_dir)
+    timings = {'dashboard.index': best_of(repeat, lambda: FilterIndex(df))}
+
+    index = FilterIndex(df)
+    selections = dashboard_selections(index)
+    total = best_of(repeat, lambda: [dashboard_rerun(df, index, cube, s) for s in selections])
+    timings['dashboard.rerun'] = total / len(selections)
+    return timings
+
+
+def benchmark(rows, workspace, stages, repeat=3, seed=0, backends=('pandas',)):
+    """Time every requested stage on ``rows`` synthetic orders; returns {stage: seconds}."""
+    processed_dir = os.path.join(workspace, PROCESSED_DIR)
+    os.makedirs(processed_dir, exist_ok=True)
+    timings = {}
+
+    start = time.perf_counter()
+    write_orders(os.path.join(workspace, RAW_FILE), rows, seed)
+    timings['generate'] = time.perf_counter() - start
+
+    timings['clean'] = run_script('clean_data.py', workspace)
+    timings['build.cube'] = run_script('build_cube.py', workspace)
+    timings['build.agents'] = run_script('build_agents.py', workspace)
+    timings['build.snapshot'] = run_script('build_snapshot.py', workspace)
+
+    if 'load' in stages:
+        timings['load.all'] = best_of(repeat, lambda: load_data(processed_dir=processed_dir))
+        timings['load.dashboard'] = best_of(
+            repeat, lambda: load_data(columns=DASHBOARD_COLUMNS, processed_dir=processed_dir))
+        timings['load.snapshot'] = best_of(
+            repeat, lambda: load_snapshot(columns=DASHBOARD_COLUMNS, processed_dir=processed_dir))
+
+    if 'aggregates' in stages:
+        for backend in backends:
+            timings[f'aggregates.{backend}'] = best_of(
+                repeat, lambda: compute_with_backend(REPORT_SPECS, backend, processed_dir=processed_dir))
+
+    if 'analytics' in stages:
+        for script in ANALYTICS_SCRIPTS:
+            # Drop the cached aggregate bundle so each script does its own aggregation
+            shutil.rmtree(os.path.join(processed_dir, AGGREGATES_DIR), ignore_errors=True)
+            timings[f'analytics.{script[:-len("_analytics.py")]}'] = run_script(script, workspace)
+
+    if 'dashboard' in stages:
+        timings.update(time_dashboard(processed_dir, repeat))
+
+    if 'charts' in stages:
+        timings['charts'] = run_script(os.path.join('visualizations', 'build_reports.py'),
+                                       workspace, '--force', '--workers', '1')
+    return timings
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=REPO_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    """Commit and machine details stored with every result file."""
+    return {
+        'commit': _git('rev-parse', 'HEAD'),
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time each pipeline stage on synthetic data.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000],
+                        help='row counts to benchmark (default: 10,000 100,000)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES,
+                        help='stages to time besides cleaning and building (default: all)')
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=['pandas'],
+                        help='aggregate backends to time (default: pandas)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per in-process stage; the fastest is kept (default: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='synthetic data seed (default: 0)')
+    parser.add_argument('--workdir', help='where to build the data (default: a temporary directory)')
+    parser.add_argument('--keep', action='store_true', help='keep the generated data')
+    parser.add_argument('--output', help=f'result JSON (default: {RESULTS_DIR}/<time>-<commit>.json)')
+    args = parser.parse_args()
+
+    result = environment()
+    result['repeat'] = args.repeat
+    result['seed'] = args.seed
+    result['runs'] = []
+
+    print("="*60)
+    print(f"PIPELINE BENCHMARK ({result['commit'] or 'no commit'}{', dirty' if result['dirty'] else ''})")
+    print("="*60)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='supply-chain-bench-')
+    try:
+        for rows in args.rows:
+            workspace = os.path.join(workdir, f'rows-{rows}')
+            timings = benchmark(rows, workspace, args.stages, args.repeat, args.seed, args.backends)
+            result['runs'].append({'rows': rows, 'seconds': timings})
+
+            print(f"\n   {rows:,} rows:")
+            for stage, seconds in timings.items():
+                print(f"   - {stage:<28} {seconds:10.3f}s")
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output
+    if output is None:
+        stamp = result['timestamp'].replace(':', '').replace('+0000', 'Z')
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{(result['commit'] or 'nocommit')[:10]}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+
+    print("\n" + "="*60)
+    print(f"✅ Results saved to: {output}")
+    print("="*60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'SCRIPTS'))
+from streaming_stats import Comoments, Histogram, KLLSketch, Moments
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def fold(parts, make, update):
+    """One accumulator per part, built with ``update`` and merged into the first, as the workers do."""
+    merged = None
+    for part in parts:
+        accumulator = make()
+        update(accumulator, part)
+        merged = accumulator if merged is None else merged.merge(accumulator)
+    return merged
+
+
+def roundtrip(accumulator):
+    """``accumulator`` after a trip through JSON, as the ingest state is stored."""
+    return type(accumulator).from_dict(json.loads(json.dumps(accumulator.to_dict())))
+
+
+def rank_error(values, estimate, q):
+    """Distance in ranks between ``estimate`` and the ``q`` quantile of the sorted ``values``."""
+    lo = np.searchsorted(values, estimate, side='left')
+    hi = np.searchsorted(values, estimate, side='right')
+    target = q * len(values)
+    return 0 if lo <= target <= hi else min(abs(lo - target), abs(hi - target))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the streaming accumulators against pandas.')
+    parser.add_argument('--rows', type=int, default=2_000_000, help='values to stream (default: 2,000,000)')
+    parser.add_argument('--parts', type=int, default=13, help='parts merged together (default: 13)')
+    parser.add_argument('--k', type=int, default=200, help='KLL sketch size (default: 200)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+    args = parser.parse_args()
+
+    # Delivery-time-like values: skewed, with a correlated second measure and some gaps
+    rng = np.random.default_rng(args.seed)
+    x = rng.gamma(4.0, 30.0, args.rows)
+    y = 0.5 * x + rng.normal(0, 20, args.rows)
+    x[rng.random(args.rows) < 0.01] = np.nan
+    bounds = np.sort(rng.choice(np.arange(1, args.rows), args.parts - 1, replace=False))
+    parts = list(zip(np.split(x, bounds), np.split(y, bounds)))
+    series = pd.Series(x)
+
+    print("="*60)
+    print(f"STREAMING ACCUMULATORS ({args.rows:,} values in {args.parts} merged parts)")
+    print("="*60)
+
+    # 1. Exact merges: moments and correlation
+    print("\n1. MOMENTS AND CORRELATION vs PANDAS:")
+    moments = roundtrip(fold(parts, Moments, lambda m, part: m.update(part[0])))
+    comoments = fold(parts, Comoments, lambda c, part: c.update(*part))
+    differences = {
+        'mean': (moments.mean, series.mean()),
+        'std': (moments.std, series.std()),
+        'min': (moments.min, series.min()),
+        'max': (moments.max, series.max()),
+        'corr': (comoments.corr, series.corr(pd.Series(y))),
+    }
+    worst = 0.0
+    for name, (streamed, expected) in differences.items():
+        relative = abs(streamed - expected) / abs(expected)
+        worst = max(worst, relative)
+        print(f"   {name:<5} {streamed:>14.6f}  (relative difference {relative:.1e})")
+    print(f"   Count: {moments.count:,} of {series.count():,}")
+    print(f"   Empty Moments: mean={Moments().mean}, min={Moments().min}, max={Moments().max}")
+
+    # 2. Histogram: merged counts equal a single pass
+    print("\n2. HISTOGRAM MERGE:")
+    make_histogram = lambda: Histogram.uniform(0, 600, 60)
+    merged = roundtrip(fold(parts, make_histogram, lambda h, part: h.update(part[0])))
+    single = make_histogram().update(x)
+    exact = np.array_equal(merged.counts, single.counts) and merged.count == single.count
+    print(f"   Merged counts equal one pass: {'yes' if exact else 'NO'}")
+
+    # 3. KLL sketch: observed rank error against the deterministic bound
+    print(f"\n3. KLL SKETCH (k={args.k}):")
+    sketch = roundtrip(fold(parts, lambda: KLLSketch(k=args.k, seed=args.seed),
+                            lambda s, part: s.update(part[0])))
+    values = np.sort(x[np.isfinite(x)])
+    observed = max(rank_error(values, sketch.quantile(q), q) for q in QUANTILES)
+    bound = sketch.rank_error()
+    for q in QUANTILES:
+        print(f"   q={q:<5} sketch {sketch.quantile(q):>9.3f}  exact {np.quantile(values, q):>9.3f}")
+    print(f"   Observed rank error: {observed / sketch.count:.3%} of count")
+    print(f"   Worst-case bound: {bound / sketch.count:.3%} of count")
+    print(f"   Items kept: {len(sketch):,} of {sketch.count:,}")
+    print(f"   Median of [1, 3]: {KLLSketch().update([1, 3]).quantile(0.5)} (no interpolation)")
+
+    print("\n" + "="*60)
+    if worst > 1e-12 or not exact or observed > bound:
+        print("❌ An accumulator is outside its stated accuracy")
+        print("="*60)
+        sys.exit(1)
+    print("✅ Merges exact and KLL within its bound")
+    print("="*60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Raw export layout and value sets of amazon_delivery.csv, including its
+# quirks: trailing spaces on some categoricals and 'NaN ' strings for
+# missing Traffic/Order_Time
+COLUMNS = ['Order_ID', 'Agent_Age', 'Agent_Rating', 'Store_Latitude', 'Store_Longitude',
+           'Drop_Latitude', 'Drop_Longitude', 'Order_Date', 'Order_Time', 'Pickup_Time',
+           'Weather', 'Traffic', 'Vehicle', 'Area', 'Delivery_Time', 'Category']
+
+WEATHER = ['Cloudy', 'Fog', 'Sandstorms', 'Stormy', 'Sunny', 'Windy']
+TRAFFIC = ['High ', 'Jam ', 'Low ', 'Medium ']
+VEHICLES = ['bicycle ', 'motorcycle ', 'scooter ', 'van']
+AREAS = ['Metropolitian ', 'Other', 'Semi-Urban ', 'Urban ']
+CATEGORIES = ['Apparel', 'Books', 'Clothing', 'Cosmetics', 'Electronics', 'Grocery', 'Home',
+              'Jewelry', 'Kitchen', 'Outdoors', 'Pet Supplies', 'Shoes', 'Skincare', 'Snacks',
+              'Sports', 'Toys']
+RATINGS = [1.0, 2.5, 3.5, 4.0, 4.2, 4.5, 4.6, 4.7, 4.8, 4.9, 5.0, 6.0]
+RATING_WEIGHTS = [1, 1, 2, 4, 4, 10, 14, 14, 14, 14, 10, 1]
+
+# Share of rows with a missing value, as in the source
+MISSING = {'Agent_Rating': 0.0012, 'Weather': 0.002, 'Traffic': 0.002, 'Order_Time': 0.002}
+
+# Fixed pools, so store and agent cardinalities do not grow with the row count
+STORES = 500
+AGENTS = 12_000
+FIRST_DATE = '2022-02-11'
+DAYS = 55
+
+CHUNK_ROWS = 1_000_000
+
+# Every 'HH:MM:SS' minute of the day, indexed by minutes since midnight
+CLOCK = np.array([f'{m // 60:02d}:{m % 60:02d}:00' for m in range(24 * 60)], dtype=object)
+
+
+def _pools(seed):
+    """Store locations and agents (age, rating, home store) shared by every chunk."""
+    rng = np.random.default_rng(seed)
+    stores = np.column_stack([rng.uniform(9, 31, STORES), rng.uniform(72, 89, STORES)]).round(6)
+    weights = np.asarray(RATING_WEIGHTS, dtype=float)
+    agents = pd.DataFrame({
+        'Agent_Age': rng.integers(15, 51, AGENTS),
+        'Agent_Rating': rng.choice(RATINGS, AGENTS, p=weights / weights.sum()),
+        'Store': rng.integers(0, STORES, AGENTS),
+    })
+    return stores, agents
+
+
+def generate_chunk(rows, start, rng, stores, agents):
+    """``rows`` raw orders numbered from ``start``."""
+    agent = agents.iloc[rng.integers(0, len(agents), rows)].reset_index(drop=True)
+    store = stores[agent['Store'].to_numpy()]
+    order_minute = rng.integers(8 * 60, 24 * 60, rows)
+    pickup_minute = (order_minute + rng.choice([5, 10, 15], rows)) % (24 * 60)
+    dates = pd.date_range(FIRST_DATE, periods=DAYS).strftime('%Y-%m-%d').to_numpy()
+
+    df = pd.DataFrame({
+        'Order_ID': np.char.mod('syn%010d', np.arange(start, start + rows)),
+        'Agent_Age': agent['Agent_Age'],
+        'Agent_Rating': agent['Agent_Rating'],
+        'Store_Latitude': store[:, 0],
+        'Store_Longitude': store[:, 1],
+        'Drop_Latitude': store[:, 0] + rng.uniform(-0.15, 0.15, rows),
+        'Drop_Longitude': store[:, 1] + rng.uniform(-0.15, 0.15, rows),
+        'Order_Date': dates[rng.integers(0, DAYS, rows)],
+        'Order_Time': CLOCK[order_minute],
+        'Pickup_Time': CLOCK[pickup_minute],
+        'Weather': rng.choice(WEATHER, rows),
+        'Traffic': rng.choice(TRAFFIC, rows),
+        'Vehicle': rng.choice(VEHICLES, rows),
+        'Area': rng.choice(AREAS, rows),
+        'Delivery_Time': rng.integers(10, 271, rows),
+        'Category': rng.choice(CATEGORIES, rows),
+    }, columns=COLUMNS)
+
+    for col, share in MISSING.items():
+        missing = rng.random(rows) < share
+        if col in ('Traffic', 'Order_Time'):
+            df[col] = df[col].where(~missing, 'NaN ')
+        else:
+            df.loc[missing, col] = np.nan
+    return df
+
+
+def write_orders(path, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    """
+    Write ``rows`` synthetic raw orders to ``path`` in chunks.
+
+    Memory is bounded by ``chunk_rows``; the same seed and row count always
+    give the same file.
+    """
+    stores, agents = _pools(seed)
+    rng = np.random.default_rng(seed + 1)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    for start in range(0, rows, chunk_rows):
+        chunk = generate_chunk(min(chunk_rows, rows - start), start, rng, stores, agents)
+        chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic amazon_delivery.csv.')
+    parser.add_argument('--rows', type=int, default=100_000, help='orders to generate (default: 100,000)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+    parser.add_argument('--output', default='data/amazon_delivery.csv',
+                        help='CSV to write (default: data/amazon_delivery.csv)')
+    args = parser.parse_args()
+
+    path = write_orders(args.output, args.rows, args.seed)
+    print(f"✅ {args.rows:,} synthetic orders saved to: {path}")
+
+
+if __name__ == '__main__':
+    main()